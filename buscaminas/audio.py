@@ -0,0 +1,205 @@
+# Sonido del juego: pygame y los MP3 se cargan en segundo plano y un hilo
+# reproduce los sonidos pedidos, así que los clics nunca esperan al mezclador
+import os
+import queue
+import threading
+import time
+from collections import Counter
+
+# Carpeta de los sonidos y de las copias ya decodificadas
+CARPETA_SONIDOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sonidos")
+CARPETA_CACHE = os.path.join(CARPETA_SONIDOS, "cache")
+
+# Sonido de cada evento del juego y segundos mínimos entre dos reproducciones
+SONIDOS = {
+    "mina": ("peo.mp3", 0.5),
+    "bandera": ("chiclin.mp3", 0.08),
+    "interrogacion": ("hmm.mp3", 0.2),
+}
+
+# Canales del mezclador: nunca suenan más sonidos a la vez
+CANALES = 8
+
+# Las peticiones de un mismo sonido que llegan dentro de esta ventana suenan una sola vez
+VENTANA_AGRUPAR = 0.03
+
+
+class MezcladorPygame:
+    """Reproduce los sonidos en un grupo fijo de canales de pygame."""
+
+    def __init__(self, canales=CANALES):
+        import pygame  # Se importa aquí: tarda y solo hace falta para el sonido
+        pygame.mixer.init()
+        pygame.mixer.set_num_channels(canales)
+        self.pygame = pygame
+        self.formato = pygame.mixer.get_init()
+        self.canales = [pygame.mixer.Channel(i) for i in range(canales)]
+
+    # Lee el sonido ya decodificado o lo decodifica y lo guarda para la próxima vez
+    def cargar(self, ruta, cache):
+        """Devuelve un pygame.mixer.Sound, usando la copia PCM de cache si existe."""
+        info = os.stat(ruta)
+        frecuencia, bits, canales = self.formato
+        # El nombre cambia si cambia el MP3 o el formato del mezclador
+        nombre = f"{os.path.basename(ruta)}.{info.st_size}.{int(info.st_mtime)}.{frecuencia}-{bits}-{canales}.pcm"
+        ruta_cache = os.path.join(cache, nombre)
+        try:
+            with open(ruta_cache, "rb") as copia:
+                return self.pygame.mixer.Sound(buffer=copia.read())
+        except OSError:
+            pass
+
+        sonido = self.pygame.mixer.Sound(ruta)
+        try:
+            os.makedirs(cache, exist_ok=True)
+            temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+            with open(temporal, "wb") as copia:
+                copia.write(sonido.get_raw())
+            os.replace(temporal, ruta_cache)
+        except OSError:
+            pass  # Sin caché el sonido se decodifica de nuevo en el próximo arranque
+        return sonido
+
+    # Usa el primer canal libre; si están todos ocupados el sonido se descarta
+    def reproducir(self, sonido):
+        """Reproduce un sonido y devuelve False si no queda ningún canal libre."""
+        for canal in self.canales:
+            if not canal.get_busy():
+                canal.play(sonido)
+                return True
+        return False
+
+
+class MezcladorSilencioso:
+    """Mezclador que no suena: para ejecuciones sin ventana y para pruebas.
+
+    Cuenta cuántas veces se habría reproducido cada sonido.
+    """
+
+    def __init__(self, canales=CANALES):
+        self.reproducidos = Counter()
+
+    def cargar(self, ruta, cache):
+        """Devuelve el nombre del archivo como sonido."""
+        return os.path.basename(ruta)
+
+    def reproducir(self, sonido):
+        """Cuenta el sonido como reproducido."""
+        self.reproducidos[sonido] += 1
+        return True
+
+
+# Mezcladores disponibles; "auto" usa pygame si se puede y si no se queda en silencio
+MEZCLADORES = {
+    "pygame": MezcladorPygame,
+    "silencioso": MezcladorSilencioso,
+}
+
+
+class BancoSonidos:
+    """Sonidos del juego decodificados una sola vez y reproducidos desde un hilo.
+
+    cargar_en_segundo_plano() crea el mezclador y carga los sonidos en un
+    hilo, que después se queda reproduciendo lo que se pide. reproducir()
+    solo deja el nombre en una cola, así que no añade latencia a los clics.
+    El hilo junta las peticiones de VENTANA_AGRUPAR segundos, reproduce una
+    sola vez cada sonido repetido, respeta el intervalo mínimo de cada
+    sonido y usa como mucho CANALES canales; lo que no cabe se descarta.
+    Mientras no ha terminado la carga, reproducir() no hace nada.
+    """
+
+    def __init__(self, archivos=SONIDOS, carpeta=CARPETA_SONIDOS, cache=CARPETA_CACHE,
+                 mezclador="auto", canales=CANALES):
+        self.archivos = archivos
+        self.carpeta = carpeta
+        self.cache = cache
+        self.tipo_mezclador = mezclador
+        self.canales = canales
+        self.mezclador = None
+        self.sonidos = {}  # Nombre del evento -> sonido cargado
+        self.ultima = {}  # Nombre del evento -> instante de su última reproducción
+        self.pendientes = queue.SimpleQueue()  # Nombres pedidos aún sin reproducir
+        self.cargado = threading.Event()  # Se activa al terminar la carga, haya sonidos o no
+        self.duracion = None  # Segundos que ha tardado la carga
+        self.error = None  # Motivo por el que no hay sonido
+        self.peticiones = 0  # Sonidos pedidos
+        self.reproducidos = 0  # Sonidos que han sonado
+        self.descartados = 0  # Sonidos agrupados, limitados o sin canal libre
+
+    # Arranca el hilo que carga y reproduce los sonidos
+    def cargar_en_segundo_plano(self):
+        """Carga los sonidos sin bloquear el hilo de Tk y empieza a reproducirlos."""
+        threading.Thread(target=self._hilo, daemon=True).start()
+
+    def _hilo(self):
+        self.cargar()
+        self.atender()
+
+    def cargar(self):
+        """Crea el mezclador y carga todos los sonidos."""
+        inicio = time.perf_counter()
+        try:
+            if self.tipo_mezclador == "auto":
+                try:
+                    self.mezclador = MezcladorPygame(self.canales)
+                except Exception as error:
+                    # Sin pygame o sin dispositivo de audio se juega en silencio
+                    self.error = error
+                    self.mezclador = MezcladorSilencioso(self.canales)
+            else:
+                self.mezclador = MEZCLADORES[self.tipo_mezclador](self.canales)
+            for nombre, (archivo, _) in self.archivos.items():
+                try:
+                    self.sonidos[nombre] = self.mezclador.cargar(os.path.join(self.carpeta, archivo), self.cache)
+                except Exception as error:
+                    print(f"Error: No se pudo cargar el sonido '{archivo}': {error}")
+        except Exception as error:
+            self.error = error
+        finally:
+            self.duracion = time.perf_counter() - inicio
+            self.cargado.set()
+
+    # Pide un sonido; se llama desde los manejadores de clic
+    def reproducir(self, nombre):
+        """Encola un sonido sin esperar al mezclador."""
+        if self.cargado.is_set():
+            self.peticiones += 1
+            self.pendientes.put(nombre)
+
+    # Bucle del hilo: agrupa las peticiones y las reproduce
+    def atender(self):
+        """Reproduce los sonidos pedidos hasta que se llama a detener()."""
+        while True:
+            nombre = self.pendientes.get()
+            if nombre is None:
+                return
+            # Esperar un momento para juntar las peticiones que llegan seguidas
+            time.sleep(VENTANA_AGRUPAR)
+            pedidos = [nombre]
+            while True:
+                try:
+                    pedidos.append(self.pendientes.get_nowait())
+                except queue.Empty:
+                    break
+            if None in pedidos:
+                return
+            self.descartados += len(pedidos) - len(set(pedidos))
+            for nombre in set(pedidos):
+                self._sonar(nombre)
+
+    def _sonar(self, nombre):
+        """Reproduce un sonido si ha pasado su intervalo mínimo y hay un canal libre."""
+        sonido = self.sonidos.get(nombre)
+        if sonido is None:
+            return
+        ahora = time.monotonic()
+        if ahora - self.ultima.get(nombre, -1e9) < self.archivos[nombre][1] or not self.mezclador.reproducir(sonido):
+            self.descartados += 1
+            return
+        self.ultima[nombre] = ahora
+        self.reproducidos += 1
+
+    # Para el hilo de reproducción
+    def detener(self):
+        """Termina el hilo de reproducción."""
+        self.pendientes.put(None)
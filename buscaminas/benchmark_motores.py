@@ -0,0 +1,134 @@
+# Compara los motores del tablero (diccionarios, bytes y bitboard) en las
+# operaciones que recorren todo el tablero
+import argparse
+import random
+import time
+
+from bitboard import MotorBitboard
+from motor import DESPLAZAMIENTOS, MotorBuscaminas
+
+# Lados de los tableros cuadrados que se miden por defecto
+TAMANOS = [16, 64, 256, 1024, 4096]
+
+# Lado máximo para los diccionarios: 4096x4096 celdas ocupan varios GB
+MAXIMO_DICCIONARIOS = 1024
+
+
+class TableroDiccionarios:
+    """Referencia: el tablero original, una lista de filas con un diccionario por celda."""
+
+    def __init__(self, filas, columnas, minas):
+        self.filas = filas
+        self.columnas = columnas
+        self.minas = minas
+        self.total = filas * columnas
+        self.perdido = False
+        self.tablero = [[{"mina": False, "adyacentes": 0, "revelado": False, "bandera": False}
+                         for _ in range(columnas)] for _ in range(filas)]
+
+    def colocar_minas(self, semilla):
+        """Coloca las minas con el mismo muestreo que los otros motores."""
+        for indice in random.Random(semilla).sample(range(self.total), self.minas):
+            fila, columna = divmod(indice, self.columnas)
+            self.tablero[fila][columna]["mina"] = True
+
+    def calcular_adyacencias(self):
+        """Cuenta las minas vecinas de cada celda comprobando los bordes."""
+        for fila in range(self.filas):
+            for columna in range(self.columnas):
+                if not self.tablero[fila][columna]["mina"]:
+                    self.tablero[fila][columna]["adyacentes"] = sum(
+                        1 for df, dc in DESPLAZAMIENTOS
+                        if 0 <= fila + df < self.filas and 0 <= columna + dc < self.columnas
+                        and self.tablero[fila + df][columna + dc]["mina"])
+
+    def revelar(self, fila, columna):
+        """Relleno por inundación con una pila de posiciones."""
+        reveladas = []
+        pila = [(fila, columna)]
+        while pila:
+            fila, columna = pila.pop()
+            celda = self.tablero[fila][columna]
+            if celda["revelado"] or celda["bandera"]:
+                continue
+            celda["revelado"] = True
+            reveladas.append(fila * self.columnas + columna)
+            if celda["mina"]:
+                self.perdido = True
+            elif celda["adyacentes"] == 0:
+                for df, dc in DESPLAZAMIENTOS:
+                    if 0 <= fila + df < self.filas and 0 <= columna + dc < self.columnas:
+                        pila.append((fila + df, columna + dc))
+        return reveladas
+
+    def ocultas(self):
+        """Devuelve los índices de las celdas sin revelar."""
+        return [fila * self.columnas + columna for fila in range(self.filas) for columna in range(self.columnas)
+                if not self.tablero[fila][columna]["revelado"]]
+
+    def victoria(self):
+        """Recorre todo el tablero buscando celdas seguras sin revelar."""
+        return not self.perdido and all(celda["mina"] or celda["revelado"] for fila in self.tablero for celda in fila)
+
+
+# Motores que se comparan, por nombre
+MOTORES = {
+    "diccionarios": TableroDiccionarios,
+    "bytes": MotorBuscaminas,
+    "bitboard": MotorBitboard,
+}
+
+
+# Mide una función y devuelve su resultado y los milisegundos empleados
+def medir(funcion, *args):
+    """Devuelve (resultado, milisegundos)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+# Mide las operaciones de un motor en un tablero cuadrado
+def medir_motor(clase, lado, minas, semilla, clic):
+    """Devuelve los milisegundos de cada operación y el número de celdas reveladas."""
+    tiempos = {}
+    tablero, tiempos["crear"] = medir(clase, lado, lado, minas)
+    _, tiempos["minas"] = medir(tablero.colocar_minas, semilla)
+    _, tiempos["adyacencias"] = medir(tablero.calcular_adyacencias)
+    reveladas, tiempos["revelar"] = medir(tablero.revelar, *divmod(clic, lado))
+    _, tiempos["victoria"] = medir(tablero.victoria)
+    _, tiempos["destapar"] = medir(tablero.ocultas)
+    return tiempos, len(reveladas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los motores del tablero")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS, help="Lados de los tableros")
+    parser.add_argument("--densidad", type=float, default=0.02, help="Proporción de minas")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla aleatoria")
+    parser.add_argument("--motores", nargs="+", choices=MOTORES, default=list(MOTORES), help="Motores a medir")
+    parser.add_argument("--max-diccionarios", type=int, default=MAXIMO_DICCIONARIOS,
+                        help="Lado máximo para el motor de diccionarios")
+    args = parser.parse_args()
+
+    columnas = ["crear", "minas", "adyacencias", "revelar", "victoria", "destapar"]
+    print(f"{'Tablero':>10} {'Motor':>13} {'Reveladas':>10}" + "".join(f"{nombre + ' (ms)':>17}" for nombre in columnas))
+    for lado in args.tamanos:
+        minas = int(lado * lado * args.densidad)
+        # Todos los motores colocan las mismas minas, así que se pulsa la misma celda vacía
+        referencia = MotorBuscaminas(lado, lado, minas)
+        referencia.colocar_minas(args.semilla)
+        referencia.calcular_adyacencias()
+        clic = next(i for i in range(referencia.total)
+                    if not referencia.es_mina(i) and referencia.adyacentes[i] == 0)
+        del referencia
+
+        for nombre in args.motores:
+            if nombre == "diccionarios" and lado > args.max_diccionarios:
+                continue
+            tiempos, reveladas = medir_motor(MOTORES[nombre], lado, minas, args.semilla, clic)
+            print(f"{f'{lado}x{lado}':>10} {nombre:>13} {reveladas:>10}"
+                  + "".join(f"{tiempos[columna]:>17.2f}" for columna in columnas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Compara el tiempo de construcción y la memoria de los renderizadores del tablero
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tkinter as tk
+
+from renderizado import crear_renderizador
+
+# Lados de los tableros cuadrados que se miden por defecto
+TAMANOS = [100, 300]
+RENDERIZADORES = ["botones", "canvas", "virtual"]
+
+
+# Memoria residente del proceso (incluye la que reserva Tcl/Tk)
+def memoria_residente():
+    """Devuelve los bytes residentes del proceso o None si no se pueden leer."""
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# Construye un tablero con un renderizador y mide tiempo y memoria
+def medir(tipo, lado):
+    """Mide un renderizador en el proceso actual y devuelve un diccionario."""
+    root = tk.Tk()
+    root.geometry("1000x800")
+    memoria_inicial = memoria_residente()
+    inicio = time.perf_counter()
+    frame = tk.Frame(root)
+    frame.pack()
+    crear_renderizador(tipo, frame, lado, lado, lambda f, c: None, lambda f, c: None,
+                       lambda indice: ("", "#e0e0e0", "black", False))
+    root.update()
+    segundos = time.perf_counter() - inicio
+    memoria_final = memoria_residente()
+    root.destroy()
+    memoria = memoria_final - memoria_inicial if memoria_inicial is not None else None
+    return {"renderizador": tipo, "lado": lado, "segundos": segundos, "memoria": memoria}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los renderizadores del tablero")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS, help="Lados de los tableros")
+    parser.add_argument("--renderizadores", nargs="+", default=RENDERIZADORES, choices=RENDERIZADORES)
+    parser.add_argument("--medir", nargs=2, metavar=("TIPO", "LADO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        # Cada medida se hace en un proceso nuevo para que la memoria no se acumule
+        print(json.dumps(medir(args.medir[0], int(args.medir[1]))))
+        return
+
+    print(f"{'Renderizador':>12} {'Tablero':>10} {'Tiempo (s)':>11} {'Memoria (MB)':>13}")
+    for lado in args.tamanos:
+        for tipo in args.renderizadores:
+            salida = subprocess.run([sys.executable, __file__, "--medir", tipo, str(lado)],
+                                    capture_output=True, text=True, check=True).stdout
+            resultado = json.loads(salida)
+            memoria = "n/d" if resultado["memoria"] is None else f"{resultado['memoria'] / 2 ** 20:.1f}"
+            print(f"{tipo:>12} {f'{lado}x{lado}':>10} {resultado['segundos']:>11.2f} {memoria:>13}")
+
+
+if __name__ == "__main__":
+    main()
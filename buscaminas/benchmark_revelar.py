@@ -0,0 +1,53 @@
+# Mide la latencia del relleno por inundación del motor en tableros grandes
+import argparse
+import time
+
+from motor import MotorBuscaminas
+
+# Lados de los tableros cuadrados que se miden por defecto
+TAMANOS = [100, 250, 500, 1000, 2000]
+
+
+# Crea un tablero con una densidad de minas baja para que haya zonas vacías grandes
+def crear_tablero(lado, densidad, semilla):
+    """Crea un tablero cuadrado con minas y adyacencias calculadas."""
+    tablero = MotorBuscaminas(lado, lado, int(lado * lado * densidad))
+    tablero.colocar_minas(semilla)
+    tablero.calcular_adyacencias()
+    return tablero
+
+
+# Mide cuánto tarda un clic en la primera celda vacía del tablero
+def medir_revelado(tablero):
+    """Devuelve el número de celdas reveladas y los segundos empleados, o None si no hay celdas vacías."""
+    vacia = next((i for i in range(tablero.total)
+                  if not tablero.es_mina(i) and tablero.adyacentes[i] == 0), None)
+    if vacia is None:
+        return None  # Con densidades altas puede que ninguna celda sin mina tenga 0 vecinas
+    fila, columna = tablero.posicion(vacia)
+    inicio = time.perf_counter()
+    reveladas = tablero.revelar(fila, columna)
+    tablero.victoria()  # Una única comprobación de victoria por clic
+    return len(reveladas), time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del revelado por inundación")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS, help="Lados de los tableros")
+    parser.add_argument("--densidad", type=float, default=0.01, help="Proporción de minas")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla aleatoria")
+    args = parser.parse_args()
+
+    print(f"{'Tablero':>12} {'Reveladas':>12} {'Tiempo (ms)':>12} {'µs/celda':>10}")
+    for lado in args.tamanos:
+        tablero = crear_tablero(lado, args.densidad, args.semilla)
+        medida = medir_revelado(tablero)
+        if medida is None:
+            print(f"{f'{lado}x{lado}':>12} {'sin celdas vacías con esta densidad':>36}")
+            continue
+        reveladas, segundos = medida
+        print(f"{f'{lado}x{lado}':>12} {reveladas:>12} {segundos * 1000:>12.1f} {segundos * 1e6 / reveladas:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
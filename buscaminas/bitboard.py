@@ -0,0 +1,402 @@
+# Motor del Buscaminas con tableros de bits: cada estado es un entero grande
+# con un bit por celda y las operaciones sobre todo el tablero son
+# desplazamientos, AND y OR de esos enteros
+import random
+
+from historial import Jugada
+from motor import (BANDERA, INTERROGACION, MINA, REVELADO, SIN_PROTECCION, SOLO_BANDERA, SOLO_INTERROGACION,
+                   SOLO_MINA, SOLO_REVELADO, MotorBuscaminas, elegir_destinos, tabla_vecinos)
+
+# Traducciones entre un byte 0/1 por celda y el texto binario que entiende int()
+_A_TEXTO = bytes([ord("0"), ord("1")]) + bytes(254)
+_DE_TEXTO = {valor: bytes(valor if v == ord("1") else 0 for v in range(256)) for valor in (1, 2, 4, 8)}
+
+
+# Convierte un byte 0/1 por bit en un entero (el primer byte es el bit 0)
+def bytes_a_bits(unos):
+    """Devuelve el entero cuyo bit i vale unos[i]."""
+    return int(bytes(unos).translate(_A_TEXTO)[::-1], 2) if unos else 0
+
+
+# Convierte un entero en un byte por bit con el valor dado en los bits a 1
+def bits_a_bytes(bits, longitud, valor=1):
+    """Devuelve longitud bytes: valor donde el entero tiene el bit a 1 y 0 donde no."""
+    return format(bits, f"0{longitud}b")[::-1].encode("ascii").translate(_DE_TEXTO[valor])
+
+
+class MotorBitboard:
+    """Tablero del Buscaminas guardado en enteros grandes, un bit por celda.
+
+    Tiene la misma interfaz que MotorBuscaminas. Cada fila ocupa columnas + 1
+    bits: el bit de relleno del final siempre vale 0, así que al desplazar
+    un tablero un bit a la izquierda o a la derecha ninguna celda recibe el
+    valor de otra fila. La celda (fila, columna) es el bit
+    fila * (columnas + 1) + columna.
+
+    Las adyacencias se suman con un sumador de 4 planos de bits, el relleno
+    por inundación crece toda la frontera a la vez y la victoria es un AND de
+    dos tableros. Las consultas de una celda leen estado y adyacentes, copias
+    de un byte por celda que se reconstruyen la primera vez que se piden
+    después de cada cambio.
+    """
+
+    def __init__(self, filas, columnas, minas, depurar=False, proteccion=SIN_PROTECCION):
+        if filas < 1 or columnas < 1:
+            raise ValueError(f"Tablero imposible: {filas}x{columnas}")
+        if not 0 <= minas <= filas * columnas:
+            raise ValueError(f"No caben {minas} minas en un tablero de {filas}x{columnas}")
+        self.filas = filas
+        self.columnas = columnas
+        self.minas = minas
+        self.semilla = None  # Semilla con la que se colocaron las minas
+        self.total = filas * columnas
+        self.ancho = columnas + 1  # Bits por fila, con el de relleno
+        self.bits = filas * self.ancho  # Bits de cada tablero
+        self.celdas = int(("0" + "1" * columnas) * filas, 2)  # Todas las celdas, sin el relleno
+        self.tablero_minas = 0
+        self.tablero_reveladas = 0
+        self.tablero_banderas = 0
+        self.tablero_interrogaciones = 0
+        self.seguras = self.celdas  # Celdas sin mina
+        self.vacias = 0  # Celdas sin mina ni minas adyacentes
+        self.conteo = (0, 0, 0, 0)  # Bits 1, 2, 4 y 8 del número de minas adyacentes
+        self.banderas_usadas = 0  # Número de banderas colocadas
+        self.ocultas_seguras = self.total - minas  # Celdas sin mina aún por revelar
+        self.perdido = False  # Se ha revelado una mina
+        self.depurar = depurar  # Comprobar los contadores tras cada jugada
+        self.proteccion = proteccion  # Protección del primer clic
+        self.primer_clic_pendiente = False  # Las minas están colocadas y aún no se ha revelado nada
+        self.historial = None  # Historial para deshacer jugadas, o None si no se graban
+        self.desplazamientos, self.tipos = tabla_vecinos(filas, columnas)
+        self._estado = None  # Copia de un byte por celda; None si hay que reconstruirla
+        self._adyacentes = None
+
+    # Índices, posiciones y vecinos como en MotorBuscaminas
+    indice = MotorBuscaminas.indice
+    posicion = MotorBuscaminas.posicion
+    vecinos = MotorBuscaminas.vecinos
+    contar_minas_adyacentes = MotorBuscaminas.contar_minas_adyacentes
+    zona_protegida = MotorBuscaminas.zona_protegida
+    _grabar_revelado = MotorBuscaminas._grabar_revelado
+    rehacer = MotorBuscaminas.rehacer
+
+    # Bit de una celda en los tableros con relleno
+    def bit(self, indice):
+        """Devuelve la posición del bit de un índice plano."""
+        return indice + indice // self.columnas
+
+    # Índices planos de los bits a 1 de un tablero
+    def indices(self, tablero):
+        """Devuelve la lista ordenada de índices planos de las celdas del tablero."""
+        texto = format(tablero, "b")[::-1]
+        ancho = self.ancho
+        resultado = []
+        bit = texto.find("1")
+        while bit >= 0:
+            resultado.append(bit - bit // ancho)
+            bit = texto.find("1", bit + 1)
+        return resultado
+
+    # Un byte por celda a partir de los tableros, sin los bits de relleno
+    def _a_bytes(self, planos):
+        combinado = 0
+        for tablero, valor in planos:
+            if tablero:
+                combinado |= int.from_bytes(bits_a_bytes(tablero, self.bits, valor), "little")
+        datos = bytearray(combinado.to_bytes(self.bits, "little"))
+        del datos[self.columnas::self.ancho]
+        return datos
+
+    # Tablero de bits con las celdas marcadas en un byte por celda, con los bits de relleno a 0
+    def _de_bytes(self, estado, tabla):
+        """Devuelve el tablero de las celdas cuyo byte de estado vale 1 en tabla."""
+        unos = bytes(estado).translate(tabla)
+        columnas, ancho = self.columnas, self.ancho
+        relleno = bytearray(self.bits)
+        for fila in range(self.filas):
+            relleno[fila * ancho:fila * ancho + columnas] = unos[fila * columnas:(fila + 1) * columnas]
+        return bytes_a_bits(relleno)
+
+    # Pone el estado de todas las celdas de una vez, por ejemplo al continuar una partida
+    def cargar_estado(self, estado):
+        """Sustituye los tableros de bits por los del estado de un byte por celda de MotorBuscaminas."""
+        self.tablero_minas = self._de_bytes(estado, SOLO_MINA)
+        self.tablero_reveladas = self._de_bytes(estado, SOLO_REVELADO)
+        self.tablero_banderas = self._de_bytes(estado, SOLO_BANDERA)
+        self.tablero_interrogaciones = self._de_bytes(estado, SOLO_INTERROGACION)
+        self.seguras = self.celdas & ~self.tablero_minas
+        self._estado = None
+
+    # Estado de cada celda con los mismos bits que MotorBuscaminas
+    @property
+    def estado(self):
+        """Bytearray con los bits de estado de cada celda; se reconstruye tras cada cambio."""
+        if self._estado is None:
+            self._estado = self._a_bytes([(self.tablero_minas, MINA), (self.tablero_reveladas, REVELADO),
+                                          (self.tablero_banderas, BANDERA),
+                                          (self.tablero_interrogaciones, INTERROGACION)])
+        return self._estado
+
+    @property
+    def adyacentes(self):
+        """Bytearray con las minas adyacentes de cada celda (0 en las minas)."""
+        if self._adyacentes is None:
+            self._adyacentes = self._a_bytes(list(zip(self.conteo, (1, 2, 4, 8))))
+        return self._adyacentes
+
+    # Consultas sobre el estado de una celda
+    def es_mina(self, indice):
+        """Indica si la celda contiene una mina."""
+        return bool(self.estado[indice] & MINA)
+
+    def esta_revelada(self, indice):
+        """Indica si la celda está revelada."""
+        return bool(self.estado[indice] & REVELADO)
+
+    def tiene_bandera(self, indice):
+        """Indica si la celda tiene una bandera."""
+        return bool(self.estado[indice] & BANDERA)
+
+    def tiene_interrogacion(self, indice):
+        """Indica si la celda tiene una interrogación."""
+        return bool(self.estado[indice] & INTERROGACION)
+
+    # Crece un tablero una celda en las 8 direcciones
+    def _dilatar(self, tablero):
+        """Devuelve el tablero con las celdas vecinas añadidas, sin salirse del tablero."""
+        horizontal = tablero | (tablero << 1) | (tablero >> 1)
+        return (horizontal | (horizontal << self.ancho) | (horizontal >> self.ancho)) & self.celdas
+
+    # Coloca las minas con el mismo muestreo que MotorBuscaminas
+    def colocar_minas(self, semilla=None, excluidas=()):
+        """Coloca las minas en una sola pasada; la misma semilla da el mismo tablero.
+
+        Las celdas de excluidas nunca reciben mina.
+        """
+        if semilla is None:
+            semilla = random.randrange(2 ** 63)
+        self.semilla = semilla
+        candidatas = range(self.total)
+        if excluidas:
+            excluidas = set(excluidas)
+            candidatas = [indice for indice in candidatas if indice not in excluidas]
+        if self.minas > len(candidatas):
+            raise ValueError(f"No caben {self.minas} minas fuera de las {len(excluidas)} celdas excluidas")
+        unos = bytearray(self.bits)
+        columnas = self.columnas
+        for indice in random.Random(semilla).sample(candidatas, self.minas):
+            unos[indice + indice // columnas] = 1
+        self.tablero_minas = bytes_a_bits(unos)
+        self.seguras = self.celdas & ~self.tablero_minas
+        self._estado = None
+        self.primer_clic_pendiente = True
+
+    # Suma los 8 tableros de minas desplazados con un sumador de 4 bits por celda
+    def calcular_adyacencias(self, usar_numpy=True):
+        """Calcula el número de minas adyacentes para todo el tablero de una vez."""
+        minas = self.tablero_minas
+        ancho = self.ancho
+        izquierda = minas << 1
+        derecha = minas >> 1
+        uno = dos = cuatro = ocho = 0
+        for vecinas in (izquierda, derecha, minas << ancho, minas >> ancho, izquierda << ancho,
+                        izquierda >> ancho, derecha << ancho, derecha >> ancho):
+            acarreo = uno & vecinas
+            uno ^= vecinas
+            acarreo, dos = dos & acarreo, dos ^ acarreo
+            acarreo, cuatro = cuatro & acarreo, cuatro ^ acarreo
+            ocho |= acarreo
+        seguras = self.seguras
+        self.conteo = (uno & seguras, dos & seguras, cuatro & seguras, ocho & seguras)
+        self.vacias = seguras & ~(uno | dos | cuatro | ocho)
+        self._adyacentes = None
+
+    # Revela una celda y, si no tiene minas cerca, toda su zona vacía
+    def revelar(self, fila, columna):
+        """Revela una celda y devuelve los índices revelados."""
+        if self.primer_clic_pendiente and not self.estado[self.indice(fila, columna)] & (BANDERA | REVELADO):
+            self.primer_clic_pendiente = False
+            self.despejar(self.indice(fila, columna))
+        previo = self._antes_de_revelar()
+        reveladas = self._revelar_tablero(1 << self.bit(self.indice(fila, columna)))
+        self._grabar_revelado("revelar", fila, columna, previo, reveladas)
+        if self.depurar:
+            self.comprobar_contadores()
+        return reveladas
+
+    # Aparta las minas del primer clic con los mismos destinos que MotorBuscaminas
+    def despejar(self, indice):
+        """Mueve las minas de la zona protegida de un clic y devuelve cuántas se han movido."""
+        protegidas = self.zona_protegida(indice)
+        estado = self.estado
+        origenes = [celda for celda in protegidas if estado[celda] & MINA]
+        if not origenes:
+            return 0
+        protegidas = set(protegidas)
+        destinos = elegir_destinos(self.semilla, indice, self.total, len(origenes),
+                                   lambda celda: celda in protegidas or estado[celda] & MINA)
+        for celda in origenes:
+            self.tablero_minas &= ~(1 << self.bit(celda))
+        for celda in destinos:
+            self.tablero_minas |= 1 << self.bit(celda)
+        self.seguras = self.celdas & ~self.tablero_minas
+        self._estado = None
+        # Con los tableros de bits recalcular todo cuesta unas pocas operaciones de enteros
+        self.calcular_adyacencias()
+        return len(origenes)
+
+    # Relleno por inundación de toda la frontera a la vez: en cada vuelta la
+    # zona vacía crece con sus vecinas vacías hasta que deja de cambiar
+    def _revelar_tablero(self, iniciales):
+        """Revela las celdas de un tablero expandiendo las que no tienen minas cerca."""
+        bloqueadas = self.tablero_banderas | self.tablero_reveladas
+        nuevas = iniciales & ~bloqueadas
+        if not nuevas:
+            return []
+        if nuevas & self.tablero_minas:
+            self.perdido = True
+
+        libres = self.vacias & ~bloqueadas
+        zona = nuevas & libres
+        if zona:
+            ancho = self.ancho
+            while True:
+                # Es _dilatar sin el AND con celdas: libres ya no tiene bits de relleno
+                horizontal = zona | (zona << 1) | (zona >> 1)
+                crecida = zona | ((horizontal | (horizontal << ancho) | (horizontal >> ancho)) & libres)
+                if crecida == zona:
+                    break
+                zona = crecida
+            # Las vecinas de una celda vacía nunca son minas
+            nuevas |= self._dilatar(zona) & ~bloqueadas
+
+        self.tablero_reveladas |= nuevas
+        self.tablero_interrogaciones &= ~nuevas
+        self.ocultas_seguras -= (nuevas & self.seguras).bit_count()
+        self._estado = None
+        return self.indices(nuevas)
+
+    # Revela los vecinos de un número cuando ya tiene todas sus banderas
+    def acorde(self, fila, columna):
+        """Revela los vecinos sin bandera de un número ya satisfecho."""
+        indice = self.indice(fila, columna)
+        if not self.estado[indice] & REVELADO or self.estado[indice] & MINA:
+            return []
+        vecinas = self._dilatar(1 << self.bit(indice))
+        if (vecinas & self.tablero_banderas).bit_count() != self.adyacentes[indice]:
+            return []
+        previo = self._antes_de_revelar()
+        reveladas = self._revelar_tablero(vecinas)
+        self._grabar_revelado("acorde", fila, columna, previo, reveladas)
+        if self.depurar:
+            self.comprobar_contadores()
+        return reveladas
+
+    # Coloca o quita una bandera en una celda
+    def alternar_bandera(self, fila, columna):
+        """Coloca o quita una bandera. Devuelve True si la celda ha cambiado."""
+        indice = self.indice(fila, columna)
+        celda = self.estado[indice]
+        marca = 1 << self.bit(indice)
+        if celda & REVELADO:
+            return False
+        contadores = (self.ocultas_seguras, self.banderas_usadas, self.perdido)
+        if celda & BANDERA:
+            self.tablero_banderas &= ~marca
+            self.banderas_usadas -= 1
+        elif self.banderas_usadas < self.minas:
+            self.tablero_banderas |= marca
+            self.tablero_interrogaciones &= ~marca
+            self.banderas_usadas += 1
+        else:
+            return False
+        self._estado = None
+        if self.historial is not None:
+            self.historial.grabar(Jugada("alternar_bandera", fila, columna, (), [(indice, celda)], contadores))
+        if self.depurar:
+            self.comprobar_contadores()
+        return True
+
+    # Coloca o quita una interrogación en una celda
+    def alternar_interrogacion(self, fila, columna):
+        """Coloca o quita una interrogación. Devuelve True si la celda ha cambiado."""
+        indice = self.indice(fila, columna)
+        celda = self.estado[indice]
+        marca = 1 << self.bit(indice)
+        if celda & REVELADO:
+            return False
+        if self.historial is not None:
+            self.historial.grabar(Jugada("alternar_interrogacion", fila, columna, (), [(indice, celda)],
+                                         (self.ocultas_seguras, self.banderas_usadas, self.perdido)))
+        if celda & BANDERA:
+            # La interrogación sustituye a la bandera
+            self.tablero_banderas &= ~marca
+            self.banderas_usadas -= 1
+        self.tablero_interrogaciones ^= marca
+        self._estado = None
+        if self.depurar:
+            self.comprobar_contadores()
+        return True
+
+    # Lo que necesita el historial de antes de un revelado
+    def _antes_de_revelar(self):
+        """Devuelve (contadores, [(celda, estado)] de las interrogaciones) o None si no se graba."""
+        if self.historial is None:
+            return None
+        estado = self.estado
+        interrogadas = [(indice, estado[indice]) for indice in self.indices(self.tablero_interrogaciones)]
+        return (self.ocultas_seguras, self.banderas_usadas, self.perdido), interrogadas
+
+    # Deshace la última jugada: las celdas reveladas se quitan con una sola máscara
+    def deshacer(self):
+        """Deshace la última jugada y devuelve los índices que han cambiado."""
+        jugada = self.historial.deshacer() if self.historial is not None else None
+        if jugada is None:
+            return []
+        if jugada.reveladas:
+            unos = bytearray(self.bits)
+            columnas = self.columnas
+            for indice in jugada.reveladas:
+                unos[indice + indice // columnas] = 1
+            self.tablero_reveladas &= ~bytes_a_bits(unos)
+        for indice, celda in jugada.anteriores:
+            marca = 1 << self.bit(indice)
+            self.tablero_reveladas = self.tablero_reveladas | marca if celda & REVELADO else self.tablero_reveladas & ~marca
+            self.tablero_banderas = self.tablero_banderas | marca if celda & BANDERA else self.tablero_banderas & ~marca
+            self.tablero_interrogaciones = (self.tablero_interrogaciones | marca if celda & INTERROGACION
+                                            else self.tablero_interrogaciones & ~marca)
+        self.ocultas_seguras, self.banderas_usadas, self.perdido = jugada.contadores
+        self._estado = None
+        if self.depurar:
+            self.comprobar_contadores()
+        return list(jugada.reveladas) + [indice for indice, _ in jugada.anteriores]
+
+    # Verifica si el jugador ha ganado
+    def victoria(self):
+        """Indica si todas las celdas sin mina están reveladas."""
+        return not self.perdido and not self.seguras & ~self.tablero_reveladas
+
+    # Celdas que cambian de aspecto al destapar el tablero
+    def ocultas(self):
+        """Devuelve los índices de las celdas sin revelar."""
+        return self.indices(self.celdas & ~self.tablero_reveladas)
+
+    # Recuenta todo el tablero: celdas seguras ocultas y banderas
+    def contar(self):
+        """Devuelve (celdas seguras ocultas, banderas) contando los bits de los tableros."""
+        return (self.seguras & ~self.tablero_reveladas).bit_count(), self.tablero_banderas.bit_count()
+
+    # Pone los contadores de acuerdo con los tableros
+    def recalcular_contadores(self):
+        """Recalcula los contadores a partir de los tableros."""
+        self.ocultas_seguras, self.banderas_usadas = self.contar()
+        self.perdido = bool(self.tablero_minas & self.tablero_reveladas)
+
+    comprobar_contadores = MotorBuscaminas.comprobar_contadores
+
+
+# Motores con la misma interfaz, por nombre
+MOTORES = {
+    "bytes": MotorBuscaminas,
+    "bitboard": MotorBitboard,
+}
@@ -1,32 +1,68 @@
 # Importaciones necesarias para el funcionamiento del juego
-import tkinter as tk
-from tkinter import messagebox, ttk  # Para ventanas emergentes y widgets mejorados
-import random  # Para generar posiciones aleatorias de minas
 import time  # Para medir el tiempo transcurrido durante el juego
-import json  # Para guardar y cargar récords
-import pygame 
-
-# Configuración inicial del juego
-DIFICULTADES = {
-    "Fácil": {"filas": 6, "columnas": 6, "minas": 6},
-    "Medio": {"filas": 12, "columnas": 12, "minas": 15},
-    "Difícil": {"filas": 16, "columnas": 16, "minas": 50}
-}
-
-# Paleta de colores para el fondo de los números
-COLORES_FONDO = {
-    1: "#e7f3fe",  # Azul claro
-    2: "#c8e6c9",  # Verde claro
-    3: "#ffcdd2",  # Rojo claro
-    4: "#e1bee7",  # Púrpura claro
-    5: "#ffe0b2",  # Naranja claro
-    6: "#b2ebf2",  # Cian claro
-    7: "#d7ccc8",  # Gris claro
-    8: "#f5f5f5"   # Blanco grisáceo
-}
-
-# Archivo para guardar los récords
-RECORDS_FILE = "records.json"
+INICIO_ARRANQUE = time.perf_counter()  # Para medir el arranque con --profile-startup
+import argparse  # Opciones de la línea de órdenes
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk  # Para ventanas emergentes y widgets mejorados
+import os  # Para las rutas de las repeticiones
+from motor import CON_MARCAS, DIFICULTADES, PROTEGER_CELDA, PROTEGER_ZONA, indices_marcados  # Lógica del juego sin Tk
+from bitboard import MOTORES  # Motores con la misma interfaz
+from renderizado import ASPECTOS, PlanificadorRender, codigo_celda, crear_renderizador  # Dibujo del tablero
+from solucionador import Solucionador  # Deducciones para las pistas
+from generador import ReservaTableros, zona_inicial  # Tableros sin adivinar
+import repeticion  # Grabación y reproducción de partidas
+from guardado import cargar_partida, guardar_partida  # Guardar y continuar partidas
+from historial import Historial  # Deshacer y rehacer jugadas
+from metricas import calcular_metricas  # 3BV del tablero para los récords
+from records import AlmacenRecords, jugador_actual  # Récords de todas las partidas
+from infinito import MotorInfinito, VistaInfinita  # Tablero infinito generado por trozos
+from audio import BancoSonidos  # Sonidos cargados en segundo plano
+from reloj import Reloj  # Tiempo de la partida con un reloj monótono
+from instrumentacion import INSTRUMENTACION, medido, tramo  # Medición de los caminos calientes
+
+# Carpeta donde se guardan las repeticiones de las partidas terminadas
+CARPETA_REPETICIONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "repeticiones")
+
+# Partida en curso que se guarda al cerrar la ventana
+ARCHIVO_PARTIDA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "partida_guardada.bmg")
+
+# Renderizador del tablero: "botones", "canvas", "virtual" o "auto" (virtual en tableros grandes)
+RENDERIZADOR = "auto"
+
+# Comprueba los contadores del motor contra el tablero completo tras cada jugada
+DEPURAR = False
+
+# Motor del tablero: "bytes" (un byte por celda) o "bitboard" (un bit por celda en enteros grandes)
+MOTOR = "bytes"
+
+# Sonido: "pygame", "silencioso" o "auto" (pygame si está instalado y hay audio)
+SONIDO = "auto"
+
+# Milisegundos entre actualizaciones del panel de rendimiento (F3)
+INTERVALO_RENDIMIENTO = 250
+
+# Medidas que muestra el panel de rendimiento
+MEDIDAS_PANEL = ["bucle_eventos", "volcar", "revelar_celda", "relleno", "crear_tablero", "calcular_adyacencias"]
+
+# Teclas que mueven la zona visible del modo infinito y celdas que avanza cada pulsación
+TECLAS_INFINITO = {"<Up>": (-1, 0), "<Down>": (1, 0), "<Left>": (0, -1), "<Right>": (0, 1)}
+PASO_INFINITO = 5
+
+# Segundos que se espera a la reserva de tableros sin adivinar antes de jugar uno normal
+ESPERA_SIN_ADIVINAR = 5.0
+
+# Milisegundos entre consultas a la reserva mientras se espera
+CONSULTA_SIN_ADIVINAR = 100
+
+
+# Texto del 3BV de una partida de los récords (las partidas antiguas no lo tienen)
+def texto_3bv(tbv, tbv_por_segundo):
+    """Devuelve "3BV n (x/s)" o un guion si la partida no tiene 3BV."""
+    if tbv is None:
+        return "-"
+    if tbv_por_segundo is None:
+        return f"3BV {tbv}"
+    return f"3BV {tbv} ({tbv_por_segundo:.2f}/s)"
 
 class Buscaminas:
     def __init__(self, root):
@@ -34,46 +70,54 @@ class Buscaminas:
         self.root.title("Buscaminas")  # Título de la ventana principal
         self.dificultad_seleccionada = None  # Dificultad seleccionada por el usuario
         self.tablero = None  # Representación interna del tablero
-        self.botones = []  # Lista de botones que representan el tablero visual
-        self.inicio_tiempo = None  # Marca el inicio del temporizador
+        self.renderizador = None  # Dibuja el tablero visual (botones o Canvas)
+        self.planificador = None  # Agrupa los cambios del tablero visual
+        self.solucionador = None  # Calcula las pistas; se crea con la primera pista de cada partida
+        self.pista_label = None  # Etiqueta que muestra la última pista
+        self.pista_programada = None  # Quita el resaltado de la última pista
+        self.sin_adivinar = tk.BooleanVar(value=False)  # Jugar tableros que no obligan a adivinar
+        self.reserva = ReservaTableros(DIFICULTADES)  # Prepara tableros sin adivinar en segundo plano
+        self.semilla_sin_adivinar = None  # Semilla del tablero sin adivinar de la partida actual
+        self.semilla_partida = None  # Semilla fija de la partida actual (None para una al azar)
+        self.zona_libre = tk.BooleanVar(value=False)  # El primer clic abre también sus 8 vecinas
+        self.proteccion = PROTEGER_CELDA  # Protección del primer clic de la partida actual
+        self.practica = tk.BooleanVar(value=False)  # Al pisar una mina se ofrece deshacer la jugada
+        self.modo_practica = False  # La partida actual es de práctica
+        self.muertes_deshechas = 0  # Minas pisadas y deshechas en la partida actual
+        self.siguiente_deshace = False  # En una repetición, la próxima jugada deshace la actual
+        self.repeticion = None  # Grabación de la partida actual
+        self.reproduciendo = False  # La partida actual es una repetición
+        self.infinito = False  # La partida actual es del modo infinito
+        self.panel_rendimiento = None  # Panel con los tiempos medidos (F3)
+        self.rendimiento_programado = None  # Próxima actualización del panel
+        self.medicion_previa = False  # Estado de la medición antes de abrir el panel
+        self.ultima_actualizacion = None  # Instante de la última actualización del panel
+        self.jugada_programada = None  # Siguiente jugada de la repetición en curso
+        self.reloj = Reloj(self.root, self.mostrar_tiempo)  # Tiempo jugado; reloj.activo indica si hay partida
         self.tiempo_label = None  # Etiqueta que muestra el tiempo transcurrido
         self.banderas_usadas = 0  # Número de banderas colocadas
         self.banderas_totales = 0  # Número total de banderas disponibles
         self.banderas_label = None  # Etiqueta que muestra el estado de las banderas
-        self.records = self.cargar_records()  # Carga los récords desde el archivo
+        self.records = AlmacenRecords()  # Base de datos con todas las partidas terminadas
+        self.sonidos = BancoSonidos(mezclador=SONIDO)  # Sonidos de las minas, banderas e interrogaciones
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar_ventana)  # Guardar la partida al cerrar
+        self.root.bind("<F3>", self.alternar_rendimiento)  # Mostrar u ocultar el panel de rendimiento
+        self.root.bind("<Control-z>", self.deshacer)  # Deshacer la última jugada
+        self.root.bind("<Control-y>", self.rehacer)  # Rehacer la última jugada deshecha
+        self.root.bind("<Unmap>", self.pausar_minimizada)  # El tiempo no corre con la ventana minimizada
+        self.root.bind("<Map>", self.reanudar_restaurada)
         self.crear_menu_dificultad()  # Muestra el menú de selección de dificultad
+        # Decodificar los sonidos cuando el menú ya está dibujado
+        self.root.after_idle(self.sonidos.cargar_en_segundo_plano)
 
 
-    # Carga los récords desde el archivo JSON
-    def cargar_records(self):
-        """Carga los récords desde el archivo JSON."""
-        try:
-            with open(RECORDS_FILE, "r") as file:
-                return json.load(file)
-        except FileNotFoundError:
-            return {"Fácil": None, "Medio": None, "Difícil": None}
-
-    def guardar_records(self):
-        """Guarda los récords en el archivo JSON."""
-        with open(RECORDS_FILE, "w") as file:
-            json.dump(self.records, file)
-    
-    # Guarda los récords en el archivo JSON
-    def guardar_record(self, tiempo):
-        """Guarda el récord si es el mejor tiempo para la dificultad actual."""
-        dificultad = self.combobox_dificultad.get()
-        if self.records[dificultad] is None or tiempo < self.records[dificultad]:
-            self.records[dificultad] = tiempo
-            self.guardar_records()  # Llama al método correcto
-            messagebox.showinfo("Récord", f"¡Nuevo récord para {dificultad}: {tiempo} segundos!")
-
-    # Muestra una ventana con los récords actuales
+    # Muestra una ventana con las mejores partidas de cada dificultad y el historial del jugador
     def mostrar_ventana_records(self):
         """Muestra una ventana con la tabla de récords."""
         # Crear una nueva ventana
         ventana_records = tk.Toplevel(self.root)
         ventana_records.title("Tabla de Récords")
-        ventana_records.geometry("400x300")
+        ventana_records.geometry("560x420")
         ventana_records.resizable(False, False)
 
         # Frame principal
@@ -82,25 +126,43 @@ class Buscaminas:
 
         # Título de la ventana
         titulo = tk.Label(frame, text="Tabla de Récords", font=("Arial", 18, "bold"), bg="#f0f0f0", fg="#333333")
-        titulo.grid(row=0, column=0, columnspan=2, pady=10)  # Usar grid para el título
-
-        # Mostrar los récords en una tabla
-        for i, dificultad in enumerate(DIFICULTADES.keys()):
-            tiempo = self.records[dificultad]
-            tiempo_texto = f"{tiempo} segundos" if tiempo is not None else "Sin récord"
-
-            # Etiqueta para la dificultad
-            etiqueta_dificultad = tk.Label(frame, text=f"{dificultad}:", font=("Arial", 14), bg="#f0f0f0", fg="#333333")
-            etiqueta_dificultad.grid(row=i + 1, column=0, sticky="w", pady=5)  # Usar grid para las etiquetas
-
-            # Etiqueta para el tiempo
-            etiqueta_tiempo = tk.Label(frame, text=tiempo_texto, font=("Arial", 14), bg="#f0f0f0", fg="#333333")
-            etiqueta_tiempo.grid(row=i + 1, column=1, sticky="w", pady=5)  # Usar grid para las etiquetas
+        titulo.pack(pady=10)
+
+        # Una pestaña por dificultad con las mejores victorias y otra con el historial;
+        # cada consulta usa un índice, así que la ventana se abre al momento aunque haya muchas partidas
+        pestanas = ttk.Notebook(frame)
+        pestanas.pack(expand=True, fill="both")
+        for dificultad, config in DIFICULTADES.items():
+            if config.get("infinito"):
+                continue  # En el modo infinito no se gana, así que no hay tiempos que comparar
+            filas = [(f"{posicion}.", jugador, f"{milisegundos / 1000:.3f} s", texto_3bv(tbv, tbv_por_segundo),
+                      time.strftime("%d/%m/%Y", time.localtime(fecha)))
+                     for posicion, (jugador, milisegundos, fecha, tbv, tbv_por_segundo)
+                     in enumerate(self.records.mejores(dificultad), 1)]
+            self.crear_tabla_records(pestanas, dificultad, filas or [("Sin récord",)])
+        # El 3BV por segundo no depende del tablero, así que se clasifican juntas todas las dificultades
+        filas = [(f"{posicion}.", jugador, dificultad, f"{milisegundos / 1000:.3f} s", texto_3bv(tbv, tbv_por_segundo))
+                 for posicion, (jugador, dificultad, milisegundos, tbv, tbv_por_segundo)
+                 in enumerate(self.records.mejores_eficiencia(), 1)]
+        self.crear_tabla_records(pestanas, "3BV/s", filas or [("Sin récord",)])
+        filas = [(dificultad, "Victoria" if victoria else "Derrota", f"{milisegundos / 1000:.1f} s",
+                  time.strftime("%d/%m/%Y %H:%M", time.localtime(fecha)))
+                 for dificultad, milisegundos, victoria, fecha in self.records.historial()]
+        self.crear_tabla_records(pestanas, "Historial", filas or [("Sin partidas",)])
 
         # Botón para cerrar la ventana
         boton_cerrar = tk.Button(frame, text="Cerrar", font=("Arial", 14), bg="#f44336", fg="white", command=ventana_records.destroy)
-        boton_cerrar.grid(row=len(DIFICULTADES) + 1, column=0, columnspan=2, pady=20)  # Usar grid para el botón
-
+        boton_cerrar.pack(pady=10)
+
+    # Añade una pestaña con una tabla de texto
+    def crear_tabla_records(self, pestanas, nombre, filas):
+        """Crea una pestaña con una fila de etiquetas por partida."""
+        pestana = tk.Frame(pestanas, bg="#f0f0f0")
+        pestanas.add(pestana, text=nombre)
+        for i, fila in enumerate(filas):
+            for j, texto in enumerate(fila):
+                etiqueta = tk.Label(pestana, text=texto, font=("Arial", 11), bg="#f0f0f0", fg="#333333")
+                etiqueta.grid(row=i, column=j, sticky="w", padx=5, pady=1)
 
     # Crea el menú inicial donde el usuario selecciona la dificultad
     def crear_menu_dificultad(self):
@@ -112,7 +174,7 @@ class Buscaminas:
         # Frame principal
         frame = tk.Frame(self.root, bg="#f0f0f0")
         frame.pack(expand=True, fill="both", padx=20, pady=20)
-        self.root.geometry("400x400")  # Tamaño del menú inicial
+        self.root.geometry("400x660")  # Tamaño del menú inicial
         
         # Título del menú
         titulo = tk.Label(frame, text="Bienvenido al Buscaminas\nmasón de Héctor", font=("Arial", 20, "bold"), bg="#f0f0f0", fg="#333333")
@@ -127,9 +189,37 @@ class Buscaminas:
         self.combobox_dificultad.set("Fácil")  # Valor predeterminado
         self.combobox_dificultad.pack(pady=10)
 
+        # Casilla para jugar tableros que se resuelven sin adivinar
+        casilla_sin_adivinar = tk.Checkbutton(frame, text="Sin adivinar", variable=self.sin_adivinar, font=("Arial", 12),
+                                              bg="#f0f0f0", fg="#333333", command=self.cambiar_sin_adivinar)
+        casilla_sin_adivinar.pack(pady=5)
+
+        # Aviso mientras se espera un tablero sin adivinar
+        self.aviso_sin_adivinar = tk.Label(frame, text="", font=("Arial", 11, "italic"), bg="#f0f0f0", fg="#666666")
+        self.aviso_sin_adivinar.pack()
+
+        # Casilla para que el primer clic abra una zona de 3x3 sin minas
+        casilla_zona_libre = tk.Checkbutton(frame, text="Primer clic con zona 3x3 libre", variable=self.zona_libre,
+                                            font=("Arial", 12), bg="#f0f0f0", fg="#333333")
+        casilla_zona_libre.pack(pady=5)
+
+        # Casilla para practicar: al pisar una mina se puede deshacer la jugada
+        casilla_practica = tk.Checkbutton(frame, text="Práctica (deshacer al pisar una mina)", variable=self.practica,
+                                          font=("Arial", 12), bg="#f0f0f0", fg="#333333")
+        casilla_practica.pack(pady=5)
+
         # Botón para jugar
-        boton_jugar = tk.Button(frame, text="Jugar", font=("Arial", 14), bg="#4CAF50", fg="white", command=self.iniciar_juego)
-        boton_jugar.pack(pady=10)
+        self.boton_jugar = tk.Button(frame, text="Jugar", font=("Arial", 14), bg="#4CAF50", fg="white", command=self.iniciar_juego)
+        self.boton_jugar.pack(pady=10)
+
+        # Botón para continuar la partida guardada al cerrar
+        if os.path.exists(ARCHIVO_PARTIDA):
+            boton_continuar = tk.Button(frame, text="Continuar partida", font=("Arial", 14), bg="#FF9800", fg="white", command=self.continuar_partida)
+            boton_continuar.pack(pady=10)
+
+        # Botón para ver una repetición
+        boton_repeticion = tk.Button(frame, text="Ver repetición", font=("Arial", 14), bg="#9C27B0", fg="white", command=self.ver_repeticion)
+        boton_repeticion.pack(pady=10)
 
         # Botón para ver los récords
         boton_records = tk.Button(frame, text="Récords", font=("Arial", 14), bg="#2196F3", fg="white", command=self.mostrar_ventana_records)
@@ -139,263 +229,667 @@ class Buscaminas:
         boton_salir = tk.Button(frame, text="Salir", font=("Arial", 14), bg="#f44336", fg="white", command=self.root.quit)
         boton_salir.pack(pady=10)
 
+    # Empieza a preparar tableros sin adivinar la primera vez que se marca la casilla;
+    # los procesos no se arrancan si el jugador nunca usa el modo
+    def cambiar_sin_adivinar(self):
+        """Arranca la reserva de tableros sin adivinar si se ha activado el modo."""
+        if self.sin_adivinar.get():
+            self.reserva.iniciar()
+
+    # Si la reserva está vacía espera un poco a que salga un tablero sin adivinar
+    def esperar_sin_adivinar(self, dificultad, limite_espera):
+        """Devuelve True si hay que jugar ya un tablero normal o False si la partida se reintentará sola."""
+        if not self.reserva.prepara(dificultad):
+            messagebox.showinfo("Sin adivinar", f"En {dificultad} no se preparan tableros sin adivinar: "
+                                                "este tablero puede obligar a adivinar.")
+            return True
+        ahora = time.monotonic()
+        if limite_espera is None:
+            limite_espera = ahora + ESPERA_SIN_ADIVINAR
+        if ahora < limite_espera:
+            self.aviso_sin_adivinar.config(text="Generando tablero sin adivinar…")
+            self.boton_jugar.config(state="disabled")
+            self.root.after(CONSULTA_SIN_ADIVINAR, self.reintentar_sin_adivinar, limite_espera)
+            return False
+        self.aviso_sin_adivinar.config(text="")
+        self.boton_jugar.config(state="normal")
+        messagebox.showinfo("Sin adivinar", "Todavía no hay ningún tablero sin adivinar listo: "
+                                            "este tablero puede obligar a adivinar.")
+        return True
+
+    # Vuelve a intentar empezar la partida si el menú sigue abierto
+    def reintentar_sin_adivinar(self, limite_espera):
+        """Llama otra vez a iniciar_juego con el mismo límite de espera."""
+        if self.boton_jugar.winfo_exists():
+            self.iniciar_juego(limite_espera=limite_espera)
+
     # Inicia el juego con la dificultad seleccionada
-    def iniciar_juego(self):
-        """Inicia el juego con la dificultad seleccionada."""
-        dificultad = self.combobox_dificultad.get()
+    def iniciar_juego(self, repeticion_guardada=None, limite_espera=None):
+        """Inicia el juego con la dificultad seleccionada o el tablero de una repetición.
+
+        limite_espera es el instante (time.monotonic) hasta el que se espera a
+        la reserva de tableros sin adivinar; None empieza una espera nueva.
+        """
+        if repeticion_guardada:
+            dificultad = repeticion_guardada.dificultad
+        else:
+            dificultad = self.combobox_dificultad.get()
         if not dificultad:
             messagebox.showwarning("Advertencia", "Por favor, selecciona una dificultad.")
             return
 
         # Almacenar la dificultad seleccionada
         self.dificultad_seleccionada = dificultad
+        self.reproduciendo = repeticion_guardada is not None
 
         # Obtener configuración de la dificultad
-        config = DIFICULTADES[dificultad]
+        if repeticion_guardada:
+            config = {"filas": repeticion_guardada.filas, "columnas": repeticion_guardada.columnas, "minas": repeticion_guardada.minas}
+        else:
+            config = DIFICULTADES[dificultad]
+        self.infinito = bool(config.get("infinito"))
+        # Sin práctica por defecto: el modo infinito no tiene deshacer y las
+        # repeticiones ya traen las jugadas deshechas. Se pone antes de la
+        # salida del modo infinito para que no herede la partida anterior
+        self.modo_practica = False
+        self.muertes_deshechas = 0
+        if self.infinito:
+            self.iniciar_infinito(config)
+            return
         self.filas, self.columnas, self.minas = config["filas"], config["columnas"], config["minas"]
         self.banderas_totales = self.minas
         self.banderas_usadas = 0
 
-        # Limpiar la ventana actual
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        # Usar un tablero sin adivinar ya preparado; si no hay ninguno listo se
+        # espera un poco y después se juega uno normal avisando al jugador
+        if repeticion_guardada:
+            self.semilla_partida = repeticion_guardada.semilla
+            self.semilla_sin_adivinar = repeticion_guardada.semilla if repeticion_guardada.sin_adivinar else None
+            self.proteccion = repeticion_guardada.proteccion
+        else:
+            self.semilla_partida = config.get("semilla")
+            if self.sin_adivinar.get():
+                self.reserva.iniciar()  # Por si la casilla venía marcada sin pasar por cambiar_sin_adivinar
+            self.semilla_sin_adivinar = self.reserva.obtener(dificultad) if self.sin_adivinar.get() else None
+            if (self.sin_adivinar.get() and self.semilla_sin_adivinar is None
+                    and not self.esperar_sin_adivinar(dificultad, limite_espera)):
+                return
+            # El primer clic nunca pisa una mina; con la casilla marcada tampoco sus vecinas
+            self.proteccion = PROTEGER_ZONA if self.zona_libre.get() else PROTEGER_CELDA
+            self.modo_practica = self.practica.get()
+
+        # Generar el tablero antes de limpiar el menú por si la configuración es imposible
+        try:
+            self.generar_tablero()
+        except ValueError as error:
+            messagebox.showwarning("Advertencia", str(error))
+            return
 
-        # Ajustar el tamaño de la ventana según la dificultad
-        self.root.geometry(f"{self.columnas * 35}x{self.filas * 35 + 150}")
+        self.preparar_ventana()
 
         # Inicializar variables del juego
-        self.generar_tablero()
         self.colocar_minas()
         self.calcular_adyacencias()
+        self.solucionador = None  # Se crea con la primera pista
+        self.repeticion = repeticion.Repeticion(dificultad, self.filas, self.columnas, self.minas,
+                                                self.tablero.semilla, self.semilla_sin_adivinar is not None,
+                                                self.proteccion)
 
         # Crear el tablero gráfico
         self.crear_tablero()
 
         # Contador de tiempo
-        self.inicio_tiempo = time.time()
-        self.actualizar_tiempo()
+        self.reloj.iniciar()
+        self.repeticion.empezar()
         
         # Para detectar doble clic derecho
         self.ultimo_clic_derecho = None  
 
-    # Genera una matriz vacía para representar el tablero
+        # Las repeticiones se reproducen a velocidad real; los tableros sin
+        # adivinar empiezan con la zona inicial abierta
+        if repeticion_guardada:
+            self.programar_jugada(repeticion_guardada.jugadas, 0)
+        elif self.semilla_sin_adivinar is not None:
+            inicio, _ = zona_inicial(self.filas, self.columnas)
+            self.revelar_celda(*self.tablero.posicion(inicio))
+
+    # Empieza una partida en el tablero infinito
+    def iniciar_infinito(self, config):
+        """Inicia una partida del modo infinito con la zona visible de la configuración."""
+        self.filas, self.columnas = config["filas"], config["columnas"]
+        self.tablero = VistaInfinita(MotorInfinito(config.get("semilla"), config["densidad"]), self.filas, self.columnas)
+        self.banderas_totales = None  # Sin límite de banderas
+        self.banderas_usadas = 0
+        self.solucionador = None  # El solucionador necesita el tablero completo
+        self.repeticion = None  # Las jugadas del modo infinito no se graban
+        self.preparar_ventana()
+        self.crear_tablero()
+
+        # Las flechas mueven la zona visible por el mundo
+        for tecla, (filas, columnas) in TECLAS_INFINITO.items():
+            self.root.bind(tecla, lambda evento, f=filas, c=columnas: self.mover_vista(f * PASO_INFINITO, c * PASO_INFINITO))
+
+        self.reloj.iniciar()
+        self.ultimo_clic_derecho = None
+
+        # La celda (0, 0) del mundo y sus vecinas no tienen minas
+        self.revelar_celda(self.filas // 2, self.columnas // 2)
+
+    # Desplaza la zona visible del modo infinito
+    def mover_vista(self, filas, columnas):
+        """Mueve la zona visible y repinta las celdas que cambian."""
+        if self.reloj.activo:
+            self.planificador.marcar(self.tablero.mover(filas, columnas))
+
+    # Limpia el menú y ajusta la ventana al tablero
+    def preparar_ventana(self):
+        """Limpia la ventana y la ajusta al tamaño del tablero."""
+        # Limpiar la ventana actual
+        for widget in self.root.winfo_children():
+            widget.destroy()
+
+        # Ajustar el tamaño de la ventana según la dificultad sin salirse de la pantalla;
+        # los tableros más grandes se desplazan dentro de la ventana
+        ancho = min(self.columnas * 35, self.root.winfo_screenwidth() - 100)
+        alto = min(self.filas * 35, self.root.winfo_screenheight() - 250)
+        self.root.geometry(f"{ancho}x{alto + 190}")
+
+    # Continúa la partida que se guardó al cerrar la ventana
+    def continuar_partida(self):
+        """Carga la partida guardada y la continúa donde se dejó."""
+        try:
+            tablero, milisegundos, repeticion_guardada = cargar_partida(ARCHIVO_PARTIDA, self.crear_motor)
+        except (OSError, ValueError) as error:
+            messagebox.showwarning("Advertencia", f"No se pudo cargar la partida: {error}")
+            return
+        os.remove(ARCHIVO_PARTIDA)
+
+        self.tablero = tablero
+        self.repeticion = repeticion_guardada
+        self.dificultad_seleccionada = repeticion_guardada.dificultad
+        self.reproduciendo = False
+        self.infinito = False
+        self.filas, self.columnas, self.minas = tablero.filas, tablero.columnas, tablero.minas
+        self.banderas_totales = self.minas
+        self.banderas_usadas = tablero.banderas_usadas
+        self.semilla_sin_adivinar = tablero.semilla if repeticion_guardada.sin_adivinar else None
+        self.proteccion = repeticion_guardada.proteccion
+        self.modo_practica = self.practica.get()
+        self.muertes_deshechas = 0
+        tablero.historial = Historial()  # Las jugadas de antes de guardar ya no se pueden deshacer
+        self.preparar_ventana()
+
+        self.solucionador = None  # Se crea con la primera pista: continuar no espera a recorrer el tablero
+        self.crear_tablero()
+        # Pintar solo las celdas que no están tapadas
+        self.planificador.marcar(indices_marcados(tablero.estado, CON_MARCAS))
+
+        # El tiempo sigue desde donde se quedó
+        self.reloj.iniciar(milisegundos)
+        self.repeticion.empezar()
+        self.ultimo_clic_derecho = None
+
+    # Guarda la partida en curso antes de cerrar la ventana
+    def cerrar_ventana(self):
+        """Guarda la partida en curso, si la hay, y cierra la aplicación."""
+        if self.reloj.activo and not self.reproduciendo and not self.infinito:
+            milisegundos = self.reloj.detener()
+            guardar_partida(ARCHIVO_PARTIDA, self.tablero, milisegundos, self.repeticion)
+        self.root.destroy()
+
+    # Genera el motor que representa el tablero
+    @medido
     def generar_tablero(self):
-        """Genera una matriz para representar el tablero."""
-        self.tablero = [[{"mina": False, "adyacentes": 0, "revelado": False, "bandera": False} for _ in range(self.columnas)] for _ in range(self.filas)]
+        """Genera el motor que guarda el estado del tablero."""
+        self.tablero = self.crear_motor(self.filas, self.columnas, self.minas)
+        self.tablero.historial = Historial()
+
+    # Motor vacío según MOTOR y DEPURAR, igual para partidas nuevas y continuadas
+    def crear_motor(self, filas, columnas, minas):
+        """Devuelve un motor sin minas con la protección del primer clic de la partida."""
+        return MOTORES[MOTOR](filas, columnas, minas, depurar=DEPURAR, proteccion=self.proteccion)
 
     # Coloca las minas aleatoriamente en el tablero
+    @medido
     def colocar_minas(self):
         """Coloca las minas aleatoriamente en el tablero."""
-        minas_colocadas = 0
-        while minas_colocadas < self.minas:
-            fila = random.randint(0, self.filas - 1)
-            columna = random.randint(0, self.columnas - 1)
-            if not self.tablero[fila][columna]["mina"]:
-                self.tablero[fila][columna]["mina"] = True
-                minas_colocadas += 1
+        if self.semilla_sin_adivinar is not None:
+            _, excluidas = zona_inicial(self.filas, self.columnas)
+            self.tablero.colocar_minas(self.semilla_sin_adivinar, excluidas)
+        else:
+            self.tablero.colocar_minas(self.semilla_partida)
 
     # Calcula el número de minas adyacentes para cada celda
+    @medido
     def calcular_adyacencias(self):
         """Calcula el número de minas adyacentes para cada celda."""
-        for fila in range(self.filas):
-            for columna in range(self.columnas):
-                if not self.tablero[fila][columna]["mina"]:
-                    self.tablero[fila][columna]["adyacentes"] = self.contar_minas_adyacentes(fila, columna)
-
-    # Cuenta las minas adyacentes a una celda específica
-    def contar_minas_adyacentes(self, fila, columna):
-        """Cuenta las minas adyacentes a una celda específica."""
-        minas = 0
-        for df in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if df == 0 and dc == 0:
-                    continue
-                f, c = fila + df, columna + dc
-                if 0 <= f < self.filas and 0 <= c < self.columnas and self.tablero[f][c]["mina"]:
-                    minas += 1
-        return minas
+        self.tablero.calcular_adyacencias()
 
     # Crea la interfaz gráfica del tablero
+    @medido
     def crear_tablero(self):
         """Crea la interfaz gráfica del tablero."""
         frame = tk.Frame(self.root, bg="#2c3e50")
         frame.pack(pady=10)
 
-        self.botones = []
-        for fila in range(self.filas):
-            fila_botones = []
-            for columna in range(self.columnas):
-                boton = tk.Button(frame, width=2, height=1,
-                                bg="#e0e0e0", relief="raised", bd=2, font=("Arial", 10, "bold"))
-                boton.grid(row=fila, column=columna)
-                boton.bind("<Button-1>", lambda event, f=fila, c=columna: self.revelar_celda(f, c))  # Clic izquierdo
-                boton.bind("<Button-3>", lambda event, f=fila, c=columna: self.manejar_clic_derecho(f, c))  # Clic derecho
-                fila_botones.append(boton)
-            self.botones.append(fila_botones)
+        # La zona visible del modo infinito cabe en la ventana y se mueve con las flechas
+        tipo = "canvas" if self.infinito else RENDERIZADOR
+        self.renderizador = crear_renderizador(tipo, frame, self.filas, self.columnas,
+                                               self.revelar_celda, self.manejar_clic_derecho,
+                                               lambda indice: ASPECTOS[self.codigo_celda(indice)])
+        self.planificador = PlanificadorRender(self.root, self.renderizador, self.codigo_celda, self.tablero.total)
 
         # Etiqueta de tiempo
         self.tiempo_label = tk.Label(self.root, text="Tiempo: 0 segundos", font=("Arial", 12), bg="#2c3e50", fg="#ecf0f1")
         self.tiempo_label.pack(pady=10)
 
         # Etiqueta de banderas
-        self.banderas_label = tk.Label(self.root, text=f"Banderas: {self.banderas_usadas}/{self.banderas_totales}", font=("Arial", 12), bg="#2c3e50", fg="#ecf0f1")
+        self.banderas_label = tk.Label(self.root, text="", font=("Arial", 12), bg="#2c3e50", fg="#ecf0f1")
         self.banderas_label.pack(pady=10)
+        self.actualizar_banderas()
+
+        if self.infinito:
+            ayuda = tk.Label(self.root, text="Usa las flechas para moverte", font=("Arial", 12), bg="#2c3e50", fg="#ecf0f1")
+            ayuda.pack(pady=5)
+            return
 
-    # Actualiza el contador de tiempo cada segundo
-    def actualizar_tiempo(self):
+        # Botón y etiqueta de pistas
+        boton_pista = tk.Button(self.root, text="Pista", font=("Arial", 12), bg="#2196F3", fg="white", command=self.mostrar_pista)
+        boton_pista.pack(pady=5)
+
+        # Botones para deshacer y rehacer (también con Ctrl+Z y Ctrl+Y)
+        frame_historial = tk.Frame(self.root, bg="#2c3e50")
+        frame_historial.pack(pady=5)
+        boton_deshacer = tk.Button(frame_historial, text="Deshacer", font=("Arial", 12), bg="#607D8B", fg="white", command=self.deshacer)
+        boton_deshacer.pack(side="left", padx=5)
+        boton_rehacer = tk.Button(frame_historial, text="Rehacer", font=("Arial", 12), bg="#607D8B", fg="white", command=self.rehacer)
+        boton_rehacer.pack(side="left", padx=5)
+        self.pista_label = tk.Label(self.root, text="", font=("Arial", 12), bg="#2c3e50", fg="#ecf0f1")
+        self.pista_label.pack(pady=5)
+
+    # El reloj avisa una vez por segundo, justo al cambiar de segundo
+    def mostrar_tiempo(self, segundos):
         """Actualiza el contador de tiempo."""
-        if self.inicio_tiempo:
-            tiempo_transcurrido = int(time.time() - self.inicio_tiempo)
-            self.tiempo_label.config(text=f"Tiempo: {tiempo_transcurrido} segundos")
-            self.root.after(1000, self.actualizar_tiempo)
+        self.tiempo_label.config(text=f"Tiempo: {segundos} segundos")
+
+    # Pausa el reloj al minimizar la ventana y lo reanuda al restaurarla
+    def pausar_minimizada(self, evento):
+        """Pausa el reloj si se ha ocultado la ventana principal."""
+        if evento.widget is self.root:
+            self.reloj.pausar()
+
+    def reanudar_restaurada(self, evento):
+        """Reanuda el reloj si vuelve a verse la ventana principal."""
+        if evento.widget is self.root:
+            self.reloj.reanudar()
             
+    # Código de aspecto de una celda; al perder se destapa todo el tablero
+    def codigo_celda(self, indice):
+        """Devuelve el código de aspecto actual de una celda."""
+        return codigo_celda(self.tablero, indice, self.tablero.perdido)
+
     # Revela el contenido de una celda
     def revelar_celda(self, fila, columna):
-        """Revela el contenido de una celda."""
-        celda = self.tablero[fila][columna]
+        """Revela el contenido de una celda y de su zona vacía.
+
+        Sobre un número ya revelado hace un acorde: si tiene todas sus
+        banderas, revela el resto de sus vecinos.
+        """
+        # El mensaje final espera al jugador, así que se mide solo la jugada
+        with tramo("revelar_celda"):
+            with tramo("relleno"):
+                if self.tablero.esta_revelada(self.tablero.indice(fila, columna)):
+                    reveladas = self.tablero.acorde(fila, columna)
+                    accion = repeticion.ACORDE
+                else:
+                    reveladas = self.tablero.revelar(fila, columna)
+                    accion = repeticion.REVELAR
+            if reveladas:
+                self.grabar_jugada(fila, columna, accion)
+            self.planificador.marcar(reveladas)
+            if self.solucionador:
+                self.solucionador.actualizar(reveladas)
+        self.comprobar_final()
+
+    # Termina la partida si se ha pisado una mina o se han revelado todas las celdas seguras
+    def comprobar_final(self):
+        """Muestra el mensaje final si la partida ha terminado."""
+        if self.tablero.perdido:
+            self.sonidos.reproducir("mina")
+            self.destapar_tablero_perdido()  # Destapar el tablero antes de mostrar el mensaje
+            if self.ofrecer_deshacer_muerte():
+                return
+            if self.infinito:
+                self.mostrar_mensaje_final(f"¡Has perdido! Celdas reveladas: {self.tablero.motor.reveladas}")
+            else:
+                self.mostrar_mensaje_final("¡Has perdido!")
+        elif self.verificar_victoria():
+            self.mostrar_mensaje_final("¡Has ganado!")
+
+    # Modo práctica: la jugada que ha pisado la mina se puede deshacer
+    def ofrecer_deshacer_muerte(self):
+        """Pregunta si se deshace la mina pisada; devuelve True si la partida sigue."""
+        if self.reproduciendo:
+            return self.siguiente_deshace  # La repetición ya trae la jugada que deshace la mina
+        if not self.modo_practica or self.infinito:
+            return False
+        self.planificador.volcar(todo=True)  # Enseñar la mina antes de preguntar
+        if not messagebox.askyesno("Práctica", "Has pisado una mina. ¿Deshacer la jugada?"):
+            return False
+        self.muertes_deshechas += 1
+        return self.aplicar_historial(repeticion.DESHACER)
+
+    # Deshace la última jugada de la partida en curso
+    def deshacer(self, evento=None):
+        """Deshace la última jugada (botón Deshacer o Ctrl+Z)."""
+        if self.reloj.activo and not self.reproduciendo and not self.infinito:
+            self.aplicar_historial(repeticion.DESHACER)
+
+    def rehacer(self, evento=None):
+        """Rehace la última jugada deshecha (botón Rehacer o Ctrl+Y)."""
+        if self.reloj.activo and not self.reproduciendo and not self.infinito:
+            self.aplicar_historial(repeticion.REHACER)
+
+    # Deshace o rehace en el motor y repinta solo las celdas que han cambiado
+    def aplicar_historial(self, accion):
+        """Aplica DESHACER o REHACER y devuelve True si el tablero ha cambiado."""
+        perdido = self.tablero.perdido
+        cambiadas = self.tablero.deshacer() if accion == repeticion.DESHACER else self.tablero.rehacer()
+        if not cambiadas:
+            return False
+        # Se graba junto a la última celda grabada para que ocupe un solo byte
+        jugadas = self.repeticion.jugadas if self.repeticion else []
+        self.grabar_jugada(*self.tablero.posicion(jugadas[-1][0] if jugadas else 0), accion)
+        # Al perder se destapa todo el tablero y al deshacer la mina hay que volver a taparlo
+        self.planificador.marcar(self.tablero.ocultas() if perdido != self.tablero.perdido else cambiadas)
+        if self.solucionador:
+            self.solucionador.actualizar(cambiadas)  # Solo se revisan los números de alrededor
+        self.actualizar_banderas()
+        if accion == repeticion.REHACER:
+            self.comprobar_final()
+        return True
 
-        if celda["bandera"] or celda["revelado"]:
+    # Resalta la jugada más segura que conoce el solucionador
+    def mostrar_pista(self):
+        """Muestra una pista en el tablero y en la etiqueta de pistas."""
+        if self.infinito:
+            return  # El solucionador necesita el tablero completo
+        if self.solucionador is None:
+            self.solucionador = Solucionador(self.tablero)
+        pista = self.solucionador.pista()
+        if pista is None:
             return
+        tipo, indice, probabilidad = pista
+        fila, columna = self.tablero.posicion(indice)
+        if tipo == "segura":
+            texto, color = f"Pista: ({fila + 1}, {columna + 1}) es segura", "#2ecc71"
+        elif tipo == "mina":
+            texto, color = f"Pista: ({fila + 1}, {columna + 1}) tiene una mina", "#e67e22"
+        else:
+            texto, color = f"Pista: ({fila + 1}, {columna + 1}) tiene un {probabilidad:.0%} de mina", "#f9e79f"
+        self.pista_label.config(text=texto)
+        self.renderizador.resaltar(indice, color)
 
-        celda["revelado"] = True
-        boton = self.botones[fila][columna]
+        # Quitar el resaltado pasado un momento
+        if self.pista_programada:
+            self.root.after_cancel(self.pista_programada)
+        self.pista_programada = self.root.after(1500, self.quitar_resaltado, indice)
 
-        if celda["mina"]:
-            boton.config(text="💣", bg="#e74c3c", relief="sunken", state="disabled")
-            self.destapar_tablero_perdido()  # Destapar el tablero antes de mostrar el mensaje
-            self.mostrar_mensaje_final("¡Has perdido!")
-        else:
-            color_texto = COLORES_FONDO.get(celda["adyacentes"], "black")  # Color del texto
-            color_fondo = COLORES_FONDO.get(celda["adyacentes"], "#b0b0b0")  # Color del fondo
-            texto = str(celda["adyacentes"]) if celda["adyacentes"] > 0 else ""
-            boton.config(text=texto, bg=color_fondo, fg=color_texto, relief="sunken", state="disabled")
-            if celda["adyacentes"] == 0:
-                self.revelar_celdas_adyacentes(fila, columna)
-
-        if self.verificar_victoria():
-            tiempo = int(time.time() - self.inicio_tiempo)
-            self.guardar_record(tiempo)
-            self.mostrar_mensaje_final("¡Has ganado!")
+    def quitar_resaltado(self, indice):
+        """Vuelve a pintar una celda resaltada con su aspecto normal."""
+        self.pista_programada = None
+        self.planificador.repintar(indice)
 
-    # Revela recursivamente las celdas adyacentes sin minas
-    def revelar_celdas_adyacentes(self, fila, columna):
-        """Revela recursivamente las celdas adyacentes si no hay minas cercanas."""
-        for df in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if df == 0 and dc == 0:
-                    continue
-                f, c = fila + df, columna + dc
-                if 0 <= f < self.filas and 0 <= c < self.columnas:
-                    self.revelar_celda(f, c)
-                    
     # Verifica si el jugador ha ganado
+    @medido
     def verificar_victoria(self):
         """Verifica si el jugador ha ganado."""
-        for fila in range(self.filas):
-            for columna in range(self.columnas):
-                celda = self.tablero[fila][columna]
-                if not celda["mina"] and not celda["revelado"]:
-                    return False
-        return True
+        return self.tablero.victoria()
 
     # Coloca o quita una bandera en una celda
     def colocar_bandera(self, fila, columna):
-        """Coloca o quita una bandera en una celda."""
-        celda = self.tablero[fila][columna]
-        boton = self.botones[fila][columna]
-
-        if celda["revelado"]:
-            return
-
-        if celda["bandera"]:
-            # Quitar bandera
-            celda["bandera"] = False
-            boton.config(text="", bg="#e0e0e0", relief="raised", state="normal")
-            self.banderas_usadas -= 1
+        """Coloca o quita una bandera en una celda. Devuelve True si la celda ha cambiado."""
+        cambiada = self.tablero.alternar_bandera(fila, columna)
+        if cambiada:
+            indice = self.tablero.indice(fila, columna)
+            if self.tablero.tiene_bandera(indice):
+                self.sonidos.reproducir("bandera")
+            self.planificador.marcar([indice])
+        self.actualizar_banderas()
+        return cambiada
+
+    # Actualiza la etiqueta de banderas con el contador del motor
+    def actualizar_banderas(self):
+        """Actualiza la etiqueta de banderas."""
+        self.banderas_usadas = self.tablero.banderas_usadas
+        if self.banderas_totales is None:
+            self.banderas_label.config(text=f"Banderas: {self.banderas_usadas}")
         else:
-            if self.banderas_usadas < self.banderas_totales:
-                # Colocar bandera
-                 # Reproducir el sonido del peo si está disponible
-                celda["bandera"] = True
-                boton.config(text="🚩", bg="#f1c40f", relief="raised", state="normal")
-                self.banderas_usadas += 1
-
-        # Actualizar etiqueta de banderas
-        self.banderas_label.config(text=f"Banderas: {self.banderas_usadas}/{self.banderas_totales}")
+            self.banderas_label.config(text=f"Banderas: {self.banderas_usadas}/{self.banderas_totales}")
 
     # Muestra un mensaje al final del juego
     def mostrar_mensaje_final(self, mensaje):
         """Muestra un mensaje al final del juego."""
-        self.inicio_tiempo = None  # Detener el contador de tiempo
+        milisegundos = self.reloj.detener()  # Detener el contador de tiempo
+        self.planificador.volcar(todo=True)  # Mostrar el tablero final antes del mensaje
+        if not self.reproduciendo:
+            if self.repeticion:
+                self.guardar_repeticion()
+            # Las partidas de práctica con minas deshechas no cuentan para los récords
+            if not self.muertes_deshechas:
+                self.guardar_record(milisegundos)
         messagebox.showinfo("Fin del juego", mensaje)
         self.volver_al_menu()
 
     # Destapa todo el tablero cuando el jugador pierde
+    @medido
     def destapar_tablero_perdido(self):
         """Destapa todo el tablero cuando el jugador pierde."""
-        for fila in range(self.filas):
-            for columna in range(self.columnas):
-                celda = self.tablero[fila][columna]
-                boton = self.botones[fila][columna]
-
-                if celda["mina"]:
-                    boton.config(text="💣", bg="#e74c3c", relief="sunken", state="disabled")
-                elif celda["adyacentes"] > 0:
-                    color_texto = COLORES_FONDO.get(celda["adyacentes"], "black")
-                    color_fondo = COLORES_FONDO.get(celda["adyacentes"], "#b0b0b0")
-                    texto = str(celda["adyacentes"])
-                    boton.config(text=texto, bg=color_fondo, fg=color_texto, relief="sunken", state="disabled")
-                else:
-                    boton.config(bg="#b0b0b0", relief="sunken", state="disabled")
+        # Las celdas ya reveladas no cambian de aspecto
+        self.planificador.marcar(self.tablero.ocultas())
 
-    def guardar_record(self, tiempo):
-        """Guarda el récord si es el mejor tiempo para la dificultad actual."""
+    # Guarda la partida terminada y avisa si es el mejor tiempo de la dificultad
+    def guardar_record(self, milisegundos):
+        """Guarda la partida en los récords."""
         # Usar la dificultad almacenada en la variable de instancia
         dificultad = self.dificultad_seleccionada
-
-        if self.records[dificultad] is None or tiempo < self.records[dificultad]:
-            self.records[dificultad] = tiempo
-            self.guardar_records()
-            messagebox.showinfo("Récord", f"¡Nuevo récord para {dificultad}: {tiempo} segundos!")
+        victoria = self.verificar_victoria()
+        # Las minas ya no se mueven, así que el 3BV es el del tablero jugado; el
+        # tablero infinito no tiene 3BV y en los récords queda como NULL
+        tbv = None if self.infinito else calcular_metricas(self.tablero)["3bv"]
+        mejor = self.records.mejor_tiempo(dificultad)
+        mejor_eficiencia = self.records.mejor_eficiencia()
+        self.records.registrar(dificultad, milisegundos, victoria, jugador_actual(), self.tablero.semilla, tbv)
+        if not victoria:  # El tablero infinito nunca se gana, así que aquí tbv ya tiene valor
+            return
+        eficiencia = tbv * 1000 / max(milisegundos, 1)
+        if mejor is None or milisegundos < mejor:
+            messagebox.showinfo("Récord", f"¡Nuevo récord para {dificultad}: {milisegundos / 1000:.3f} segundos!\n"
+                                          f"3BV {tbv} ({eficiencia:.2f} 3BV/s)")
+        elif mejor_eficiencia is None or eficiencia > mejor_eficiencia:
+            messagebox.showinfo("Récord", f"¡Nuevo récord de 3BV/s: {eficiencia:.2f}! (3BV {tbv})")
 
     def volver_al_menu(self):
         """Vuelve al menú principal."""
+        if self.planificador:
+            self.planificador.cancelar()
+        if self.jugada_programada:
+            self.root.after_cancel(self.jugada_programada)
+            self.jugada_programada = None
+        if self.pista_programada:
+            self.root.after_cancel(self.pista_programada)
+            self.pista_programada = None
+        self.reloj.detener()  # La partida abandonada no se guarda al cerrar
+        for tecla in TECLAS_INFINITO:
+            self.root.unbind(tecla)
         for widget in self.root.winfo_children():
             widget.destroy()
         self.crear_menu_dificultad()
         
     def colocar_interrogacion(self, fila, columna):
-        """Coloca o quita una interrogación en una celda."""
-        celda = self.tablero[fila][columna]
-        boton = self.botones[fila][columna]
-
-        if celda["revelado"]:
-            return
-
-        if not celda.get("interrogacion", False):
-            # Colocar interrogación
-            celda["interrogacion"] = True
-            boton.config(text="❔", bg="#d3d3d3", relief="raised", state="normal")
-        else:
-            # Limpiar la celda
-            celda["interrogacion"] = False
-            boton.config(text="", bg="#e0e0e0", relief="raised", state="normal")
+        """Coloca o quita una interrogación en una celda. Devuelve True si la celda ha cambiado."""
+        cambiada = self.tablero.alternar_interrogacion(fila, columna)
+        if cambiada:
+            indice = self.tablero.indice(fila, columna)
+            if self.tablero.tiene_interrogacion(indice):
+                self.sonidos.reproducir("interrogacion")
+            self.planificador.marcar([indice])
+        self.actualizar_banderas()
+        return cambiada
 
     def manejar_clic_derecho(self, fila, columna):
         """Maneja el clic derecho para colocar/quitar banderas o interrogaciones."""
-        tiempo_actual = time.time()
+        tiempo_actual = time.monotonic()
 
         if self.ultimo_clic_derecho is not None and tiempo_actual - self.ultimo_clic_derecho < 0.3:
-            # Doble clic derecho detectado
-            self.colocar_interrogacion(fila, columna)
+            # Doble clic derecho detectado; solo se graban los clics que cambian la celda
+            if self.colocar_interrogacion(fila, columna):
+                self.grabar_jugada(fila, columna, repeticion.INTERROGACION)
             self.ultimo_clic_derecho = None  # Reiniciar el temporizador
         else:
             # Solo un clic derecho
-            self.colocar_bandera(fila, columna)
+            if self.colocar_bandera(fila, columna):
+                self.grabar_jugada(fila, columna, repeticion.BANDERA)
             self.ultimo_clic_derecho = tiempo_actual  # Registrar el tiempo del clic
+
+    # Añade una jugada a la grabación de la partida
+    def grabar_jugada(self, fila, columna, accion):
+        """Graba una jugada si la partida no es una repetición."""
+        if not self.reproduciendo and self.repeticion:
+            self.repeticion.grabar(self.tablero.indice(fila, columna), accion)
+
+    # Guarda la grabación de la partida terminada
+    def guardar_repeticion(self):
+        """Guarda la repetición de la partida en la carpeta de repeticiones."""
+        os.makedirs(CARPETA_REPETICIONES, exist_ok=True)
+        ahora = time.time()
+        base = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(ahora))}-{int(ahora * 1000) % 1000:03d}_{self.dificultad_seleccionada}"
+        # Dos partidas terminadas en el mismo milisegundo no se pisan
+        ruta = os.path.join(CARPETA_REPETICIONES, f"{base}.bmr")
+        numero = 2
+        while os.path.exists(ruta):
+            ruta = os.path.join(CARPETA_REPETICIONES, f"{base}_{numero}.bmr")
+            numero += 1
+        self.repeticion.guardar(ruta)
+
+    # Elige un archivo de repetición y lo reproduce
+    def ver_repeticion(self):
+        """Abre una repetición y la reproduce a velocidad real."""
+        ruta = filedialog.askopenfilename(title="Ver repetición", initialdir=CARPETA_REPETICIONES,
+                                          filetypes=[("Repeticiones", "*.bmr")])
+        if not ruta:
+            return
+        try:
+            repeticion_guardada = repeticion.Repeticion.cargar(ruta)
+        except (OSError, ValueError) as error:
+            messagebox.showwarning("Advertencia", f"No se pudo abrir la repetición: {error}")
+            return
+        self.iniciar_juego(repeticion_guardada)
+
+    # Programa la siguiente jugada de la repetición con su retraso original
+    def programar_jugada(self, jugadas, numero):
+        """Programa la jugada número numero de una repetición."""
+        self.jugada_programada = None
+        if numero < len(jugadas):
+            self.jugada_programada = self.root.after(jugadas[numero][2], self.reproducir_jugada, jugadas, numero)
+
+    def reproducir_jugada(self, jugadas, numero):
+        """Aplica una jugada de la repetición y programa la siguiente."""
+        indice, accion, _ = jugadas[numero]
+        fila, columna = self.tablero.posicion(indice)
+        self.programar_jugada(jugadas, numero + 1)
+        self.siguiente_deshace = numero + 1 < len(jugadas) and jugadas[numero + 1][1] == repeticion.DESHACER
+        if accion in (repeticion.DESHACER, repeticion.REHACER):
+            self.aplicar_historial(accion)
+        elif accion in (repeticion.REVELAR, repeticion.ACORDE):
+            self.revelar_celda(fila, columna)
+        elif accion == repeticion.BANDERA:
+            self.colocar_bandera(fila, columna)
+        elif accion == repeticion.INTERROGACION:
+            self.colocar_interrogacion(fila, columna)
             
+    # Muestra u oculta el panel con los tiempos medidos
+    def alternar_rendimiento(self, evento=None):
+        """Enciende la medición y muestra el panel de rendimiento, o lo oculta."""
+        if self.panel_rendimiento is not None:
+            if self.rendimiento_programado:
+                self.root.after_cancel(self.rendimiento_programado)
+                self.rendimiento_programado = None
+            if self.panel_rendimiento.winfo_exists():
+                self.panel_rendimiento.destroy()
+            self.panel_rendimiento = None
+            # Sin panel la medición solo sigue si ya estaba activa (--instrumentar)
+            INSTRUMENTACION.activa = self.medicion_previa
+            return
+        self.medicion_previa = INSTRUMENTACION.activa
+        INSTRUMENTACION.activa = True
+        self.panel_rendimiento = self.crear_panel_rendimiento()
+        self.ultima_actualizacion = None
+        self.actualizar_rendimiento()
+
+    def crear_panel_rendimiento(self):
+        """Crea la etiqueta del panel encima de la ventana."""
+        panel = tk.Label(self.root, text="", font=("Courier", 9), justify="left", anchor="nw", bg="#000000", fg="#00ff00")
+        panel.place(x=5, y=5)
+        panel.lift()
+        return panel
+
+    # Refresca el panel y mide el retraso del bucle de eventos de Tk
+    def actualizar_rendimiento(self):
+        """Actualiza el panel de rendimiento."""
+        ahora = time.perf_counter()
+        if self.ultima_actualizacion is not None:
+            # Lo que se pasa del intervalo es el tiempo que Tk ha tardado en atender el temporizador
+            INSTRUMENTACION.registrar("bucle_eventos", max(0.0, ahora - self.ultima_actualizacion - INTERVALO_RENDIMIENTO / 1000))
+        self.ultima_actualizacion = ahora
+
+        # Cambiar de pantalla destruye los widgets de la ventana, también el panel
+        if not self.panel_rendimiento.winfo_exists():
+            self.panel_rendimiento = self.crear_panel_rendimiento()
+        lineas = [f"{'medida (ms)':<22}{'último':>7}{'p95':>7}{'máx':>7}{'llamadas':>9}"]
+        for nombre in MEDIDAS_PANEL:
+            medidor = INSTRUMENTACION.medidores.get(nombre)
+            if medidor:
+                lineas.append(f"{nombre:<22}{medidor.ultimo:>7.2f}{medidor.percentil(95):>7.2f}{medidor.maximo:>7.1f}{medidor.llamadas:>9}")
+        self.panel_rendimiento.config(text="\n".join(lineas))
+        self.panel_rendimiento.lift()
+        self.rendimiento_programado = self.root.after(INTERVALO_RENDIMIENTO, self.actualizar_rendimiento)
+
+
+# Muestra los tiempos del arranque
+def medir_arranque(root, app, importaciones):
+    """Imprime lo que tardan las importaciones, el primer dibujo del menú y la carga de los sonidos."""
+    root.update()  # Dibujar el menú antes de tomar el tiempo
+    print(f"Importaciones: {importaciones * 1000:.1f} ms")
+    print(f"Menú dibujado: {(time.perf_counter() - INICIO_ARRANQUE) * 1000:.1f} ms")
+
+    def esperar_sonidos():
+        if not app.sonidos.cargado.is_set():
+            root.after(20, esperar_sonidos)
+        elif app.sonidos.error:
+            print(f"Sin sonido ({app.sonidos.error}); carga en {app.sonidos.duracion * 1000:.1f} ms")
+        else:
+            print(f"Sonidos cargados en segundo plano: {app.sonidos.duracion * 1000:.1f} ms")
+    esperar_sonidos()
+
+
 # Iniciar la aplicación
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buscaminas")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Muestra cuánto tardan las importaciones, el primer dibujo del menú y los sonidos")
+    parser.add_argument("--instrumentar", action="store_true", help="Mide los caminos calientes desde el arranque")
+    parser.add_argument("--json-rendimiento", metavar="RUTA", help="Guarda las medidas en un JSON al salir (activa --instrumentar)")
+    args = parser.parse_args()
+    INSTRUMENTACION.activa = args.instrumentar or args.json_rendimiento is not None
+    importaciones = time.perf_counter() - INICIO_ARRANQUE
+
     root = tk.Tk()
     app = Buscaminas(root)
-    root.mainloop()
\ No newline at end of file
+    if args.profile_startup:
+        medir_arranque(root, app, importaciones)
+    root.mainloop()
+    app.reserva.detener()
+    app.sonidos.detener()
+    if args.json_rendimiento:
+        INSTRUMENTACION.volcar_json(args.json_rendimiento)
\ No newline at end of file
@@ -4,7 +4,7 @@ from tkinter import messagebox, ttk  # Para ventanas emergentes y widgets mejora
 import random  # Para generar posiciones aleatorias de minas
 import time  # Para medir el tiempo transcurrido durante el juego
 import json  # Para guardar y cargar récords
-import pygame 
+from audio import BancoSonidos  # Sonidos cargados en segundo plano
 
 # Configuración inicial del juego
 DIFICULTADES = {
@@ -42,18 +42,9 @@ class Buscaminas:
         self.banderas_label = None  # Etiqueta que muestra el estado de las banderas
         self.records = self.cargar_records()  # Carga los récords desde el archivo
         self.crear_menu_dificultad()  # Muestra el menú de selección de dificultad
-        self.sonido_mina = ""
-        self.sonido_bandera = ""
-        # Inicializar pygame para manejar el sonido
-        pygame.mixer.init()
-
-        # Cargar el archivo de sonido para cuando se pulse una mina
-        try:
-            self.sonido_mina = pygame.mixer.Sound("sonidos/peo.mp3")
-            self.sonido_bandera = pygame.mixer.Sound("sonidos/chiclin.mp3")
-        except FileNotFoundError:
-            print("Error: No se encontró el archivo de sonido 'peo.mp3'.")
-            self.sonido_mina = None
+        # pygame y los sonidos se cargan en un hilo cuando el menú ya está dibujado
+        self.sonidos = BancoSonidos()
+        self.root.after_idle(self.sonidos.cargar_en_segundo_plano)
 
     # Carga los récords desde el archivo JSON
     def cargar_records(self):
@@ -275,8 +266,7 @@ class Buscaminas:
         if celda["mina"]:
             boton.config(text="💣", bg="#e74c3c", relief="sunken", state="disabled")
             # Reproducir el sonido del peo si está disponible
-            if self.sonido_mina:
-                self.sonido_mina.play()
+            self.sonidos.reproducir("mina")
             self.destapar_tablero_perdido()  # Destapar el tablero antes de mostrar el mensaje
             self.mostrar_mensaje_final("¡Has perdido!")
         else:
@@ -331,8 +321,7 @@ class Buscaminas:
             if self.banderas_usadas < self.banderas_totales:
                 # Colocar bandera
                  # Reproducir el sonido del peo si está disponible
-                if self.sonido_bandera:
-                    self.sonido_bandera.play()
+                self.sonidos.reproducir("bandera")
                 celda["bandera"] = True
                 boton.config(text="🚩", bg="#f1c40f", relief="raised", state="normal")
                 self.banderas_usadas += 1
@@ -0,0 +1,165 @@
+# Generador de carga para servidor.py: muchas partidas a la vez por la
+# interfaz local, midiendo peticiones por segundo y latencias
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from bitboard import MOTORES
+from motor import DIFICULTADES
+from servidor import HOST, PUERTO
+from simulacion import percentil
+
+# Proporción de jugadas que son banderas y acordes; el resto son revelados
+BANDERAS = 0.1
+ACORDES = 0.1
+
+
+class PartidaCliente:
+    """Lo que sabe el cliente de una partida: solo las celdas que le ha contado el servidor."""
+
+    def __init__(self, filas, columnas, minas, rng):
+        self.filas = filas
+        self.columnas = columnas
+        self.minas = minas
+        self.rng = rng
+        self.sesion = None
+        self.conocidas = bytearray(filas * columnas)  # 1 en las celdas ya reveladas
+        self.numeros = []  # Celdas reveladas con número, candidatas a acorde
+
+    # Próxima petición de esta partida
+    def peticion(self):
+        """Devuelve la línea de la siguiente jugada o de una partida nueva."""
+        if self.sesion is None:
+            return b"N %d %d %d\n" % (self.filas, self.columnas, self.minas)
+        azar = self.rng.random()
+        if azar < ACORDES and self.numeros:
+            orden, indice = b"A", self.rng.choice(self.numeros)
+        else:
+            orden, indice = b"B" if azar < ACORDES + BANDERAS else b"R", self.celda_oculta()
+        return b"%s %d %d %d\n" % ((orden, self.sesion) + divmod(indice, self.columnas))
+
+    def celda_oculta(self):
+        """Devuelve una celda que el cliente no ha visto revelada."""
+        for _ in range(64):
+            indice = self.rng.randrange(len(self.conocidas))
+            if not self.conocidas[indice]:
+                return indice
+        return self.conocidas.index(0)
+
+    # Aplica la respuesta del servidor; devuelve "P" o "G" al terminar la partida
+    def respuesta(self, linea):
+        """Actualiza la partida con una respuesta y devuelve su estado."""
+        campos = linea.split()
+        if campos[0] == b"S":
+            self.sesion = int(campos[1])
+            self.conocidas = bytearray(len(self.conocidas))
+            self.numeros = []
+            return "J"
+        if campos[0] != b"D":
+            raise ValueError(linea.decode(errors="replace").strip())
+        for campo in campos[3:]:
+            indice, valor = campo.split(b":")
+            if valor not in b"F.":
+                indice = int(indice)
+                self.conocidas[indice] = 1
+                if valor not in (b"0", b"*"):
+                    self.numeros.append(indice)
+        estado = campos[1].decode()
+        if estado != "J":
+            self.sesion = None  # El servidor ya ha cerrado la sesión
+        return estado
+
+
+class Estadisticas:
+    """Resultados de todas las conexiones."""
+
+    def __init__(self):
+        self.latencias = []
+        self.errores = 0
+        self.partidas = {"P": 0, "G": 0}
+
+
+# Una conexión con varias partidas: envía una jugada de cada una de golpe y lee
+# las respuestas, que llegan en el mismo orden
+async def conexion(puerto, partidas, fin, estadisticas):
+    """Juega hasta la hora fin (time.perf_counter) y cierra la conexión."""
+    lector, escritor = await asyncio.open_connection(HOST, puerto)
+    try:
+        while time.perf_counter() < fin:
+            envio = time.perf_counter()
+            escritor.write(b"".join(partida.peticion() for partida in partidas))
+            await escritor.drain()
+            for partida in partidas:
+                linea = await lector.readline()
+                estadisticas.latencias.append(time.perf_counter() - envio)
+                try:
+                    estado = partida.respuesta(linea)
+                except ValueError:
+                    estadisticas.errores += 1
+                    partida.sesion = None
+                    continue
+                if estado != "J":
+                    estadisticas.partidas[estado] += 1
+    finally:
+        escritor.close()
+
+
+# Arranca servidor.py en otro proceso y espera a que escuche
+async def lanzar_servidor(puerto, motor):
+    """Devuelve el proceso del servidor ya listo para recibir conexiones."""
+    proceso = await asyncio.create_subprocess_exec(
+        sys.executable, "servidor.py", "--puerto", str(puerto), "--motor", motor,
+        cwd=sys.path[0], stdout=asyncio.subprocess.PIPE)
+    linea = await proceso.stdout.readline()
+    if not linea:
+        raise RuntimeError("El servidor no ha arrancado")
+    print(linea.decode().strip())
+    return proceso
+
+
+async def ejecutar(args):
+    config = DIFICULTADES[args.dificultad]
+    proceso = await lanzar_servidor(args.puerto, args.motor) if args.lanzar else None
+    estadisticas = Estadisticas()
+    rng = random.Random(args.semilla)
+    try:
+        inicio = time.perf_counter()
+        fin = inicio + args.duracion
+        await asyncio.gather(*(
+            conexion(args.puerto, [PartidaCliente(config["filas"], config["columnas"], config["minas"],
+                                                  random.Random(rng.random()))
+                                   for _ in range(args.partidas)], fin, estadisticas)
+            for _ in range(args.conexiones)))
+        duracion = time.perf_counter() - inicio
+    finally:
+        if proceso:
+            proceso.terminate()
+            await proceso.wait()
+
+    latencias = sorted(estadisticas.latencias)
+    print(f"{args.conexiones} conexiones x {args.partidas} partidas ({args.dificultad}) durante {duracion:.1f} s")
+    print(f"Peticiones: {len(latencias)} ({len(latencias) / duracion:.0f}/s), errores: {estadisticas.errores}")
+    print(f"Partidas terminadas: {estadisticas.partidas['G']} ganadas, {estadisticas.partidas['P']} perdidas")
+    print("Latencia: " + ", ".join(f"p{p} {percentil(latencias, p) * 1000:.2f} ms" for p in (50, 90, 99, 99.9))
+          + f", máx {latencias[-1] * 1000 if latencias else 0:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para el servidor de Buscaminas")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="Puerto del servidor en 127.0.0.1")
+    parser.add_argument("--conexiones", type=int, default=100, help="Conexiones simultáneas")
+    parser.add_argument("--partidas", type=int, default=10, help="Partidas simultáneas por conexión")
+    parser.add_argument("--duracion", type=float, default=10.0, help="Segundos de carga")
+    parser.add_argument("--dificultad", choices=[nombre for nombre, config in DIFICULTADES.items() if not config.get("infinito")],
+                        default="Difícil")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de las jugadas")
+    parser.add_argument("--lanzar", action="store_true", help="Arrancar servidor.py en otro proceso durante la prueba")
+    parser.add_argument("--motor", choices=MOTORES, default="bytes", help="Motor del servidor arrancado con --lanzar")
+    args = parser.parse_args()
+    asyncio.run(ejecutar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Generador de tableros "sin adivinar": se pueden resolver desde el primer clic sin jugársela
+import math
+import os
+import queue
+import random
+import threading
+import time
+
+from motor import MotorBuscaminas
+from solucionador import Solucionador
+
+# Candidatos que prueba cada proceso en una tarea
+CANDIDATOS_POR_TAREA = 20
+
+# Tiempo máximo para enumerar la frontera de un candidato, en segundos
+PRESUPUESTO_CANDIDATO = 0.5
+
+# Tableros ya resueltos que se guardan por dificultad
+TAMANO_RESERVA = 2
+
+# Las dificultades con más celdas no se preparan: casi nunca salen sin adivinar
+MAXIMO_CELDAS = 10000
+
+# Procesos de la reserva: para tener TAMANO_RESERVA tableros listos bastan
+# unos pocos, y así el juego no ocupa todos los núcleos
+PROCESOS_RESERVA = 2
+
+
+# Celda del primer clic y celdas que deben quedar sin minas a su alrededor
+def zona_inicial(filas, columnas):
+    """Devuelve (celda inicial, celdas sin mina) con la celda central y sus vecinas."""
+    fila, columna = filas // 2, columnas // 2
+    excluidas = [f * columnas + c
+                 for f in range(max(0, fila - 1), min(filas, fila + 2))
+                 for c in range(max(0, columna - 1), min(columnas, columna + 2))]
+    return fila * columnas + columna, excluidas
+
+
+# Construye el tablero de una semilla con la zona inicial libre de minas
+def crear_tablero(filas, columnas, minas, semilla):
+    """Devuelve (tablero, celda inicial) para una semilla."""
+    inicio, excluidas = zona_inicial(filas, columnas)
+    tablero = MotorBuscaminas(filas, columnas, minas)
+    tablero.colocar_minas(semilla, excluidas)
+    tablero.calcular_adyacencias()
+    return tablero, inicio
+
+
+# Juega el tablero solo con deducciones ciertas, sin mirar las minas
+def es_resoluble(tablero, inicio, presupuesto=PRESUPUESTO_CANDIDATO):
+    """Indica si el tablero se gana desde la celda inicial sin adivinar nunca."""
+    solucionador = Solucionador(tablero)
+    solucionador.actualizar(tablero.revelar(*tablero.posicion(inicio)))
+    while not tablero.victoria():
+        solucionador.deducir(math.inf)
+        if not solucionador.seguras:
+            _, probabilidad_interior, _ = solucionador.probabilidades(presupuesto)
+            if solucionador.aproximado:
+                return False
+            if not solucionador.seguras:
+                # Si ya no quedan minas fuera de la frontera, cualquier celda del interior es segura
+                if probabilidad_interior != 0:
+                    return False
+                celda = solucionador.celda_interior(())
+                solucionador.seguras.add(celda)
+        for celda in list(solucionador.seguras):
+            solucionador.actualizar(tablero.revelar(*tablero.posicion(celda)))
+        if tablero.perdido:
+            return False
+    return True
+
+
+# Tarea de un proceso: prueba semillas hasta encontrar un tablero resoluble
+def buscar_semilla(filas, columnas, minas, semillas):
+    """Devuelve la primera semilla resoluble de la lista o None."""
+    for semilla in semillas:
+        if es_resoluble(*crear_tablero(filas, columnas, minas, semilla)):
+            return semilla
+    return None
+
+
+class ReservaTableros:
+    """Mantiene tableros sin adivinar listos para cada dificultad.
+
+    Un hilo en segundo plano reparte la búsqueda de semillas entre un
+    ProcessPoolExecutor y guarda las encontradas en una cola por dificultad,
+    así que obtener() nunca espera: si la cola está vacía devuelve None.
+    """
+
+    def __init__(self, dificultades, procesos=PROCESOS_RESERVA):
+        self.dificultades = {nombre: config for nombre, config in dificultades.items()
+                             if not config.get("infinito") and config["filas"] * config["columnas"] <= MAXIMO_CELDAS}
+        self.colas = {nombre: queue.Queue(TAMANO_RESERVA) for nombre in self.dificultades}
+        self.procesos = min(procesos, os.cpu_count() or 1)
+        self.ejecutor = None
+        self.activa = False
+
+    # Arranca los procesos y el hilo que rellena las colas
+    def iniciar(self):
+        """Empieza a preparar tableros en segundo plano."""
+        if self.activa:
+            return
+        # concurrent.futures.process tarda en importarse y solo hace falta en el modo sin adivinar
+        from concurrent.futures import ProcessPoolExecutor
+        self.activa = True
+        self.ejecutor = ProcessPoolExecutor(self.procesos)
+        threading.Thread(target=self._rellenar, daemon=True).start()
+
+    def _rellenar(self):
+        """Busca semillas para las dificultades cuya cola no está llena."""
+        from concurrent.futures import as_completed
+        ejecutor = self.ejecutor
+        while self.activa:
+            for nombre, config in self.dificultades.items():
+                cola = self.colas[nombre]
+                if cola.full() or not self.activa:
+                    continue
+                try:
+                    tareas = [ejecutor.submit(buscar_semilla, config["filas"], config["columnas"], config["minas"],
+                                              [random.randrange(2 ** 63) for _ in range(CANDIDATOS_POR_TAREA)])
+                              for _ in range(self.procesos)]
+                except RuntimeError:
+                    return  # El ejecutor se ha cerrado
+                for tarea in as_completed(tareas):
+                    if tarea.cancelled() or tarea.exception():
+                        continue
+                    semilla = tarea.result()
+                    if semilla is not None and not cola.full():
+                        cola.put(semilla)
+            if all(cola.full() for cola in self.colas.values()):
+                time.sleep(0.5)
+
+    # Las dificultades infinitas o demasiado grandes no tienen reserva
+    def prepara(self, nombre):
+        """Indica si se preparan tableros sin adivinar para la dificultad."""
+        return nombre in self.dificultades
+
+    # Devuelve la semilla de un tablero sin adivinar, si hay alguno listo
+    def obtener(self, nombre):
+        """Devuelve una semilla preparada para la dificultad o None."""
+        try:
+            return self.colas[nombre].get_nowait()
+        except (KeyError, queue.Empty):
+            return None
+
+    # Para el hilo y los procesos
+    def detener(self):
+        """Deja de preparar tableros y cierra los procesos."""
+        self.activa = False
+        if self.ejecutor:
+            self.ejecutor.shutdown(cancel_futures=True)
+            self.ejecutor = None
@@ -0,0 +1,110 @@
+# Guardado y reanudación de partidas en curso con el tablero empaquetado en bits
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+
+from motor import BANDERA, INTERROGACION, MINA, REVELADO, MotorBuscaminas, cargar_numpy
+from repeticion import Repeticion
+
+# Cabecera: magia, filas, columnas, minas, semilla y milisegundos jugados
+MAGIA = b"BMG1"
+CABECERA = struct.Struct("<4sIIIQQ")
+LONGITUD = struct.Struct("<I")
+
+# Cada bit de estado se guarda en su propio plano de un bit por celda
+PLANOS = (MINA, REVELADO, BANDERA, INTERROGACION)
+
+# Tablas para pasar de un byte por celda a un bit por celda y al revés
+_SOLO_BIT = {bit: bytes(1 if v & bit else 0 for v in range(256)) for bit in PLANOS}
+_EMPAQUETAR = {bytes((v >> i) & 1 for i in range(8)): v for v in range(256)}
+_DESEMPAQUETAR = {bit: [bytes(((v >> i) & 1) * bit for i in range(8)) for v in range(256)] for bit in PLANOS}
+
+
+# Convierte un bit de estado de todas las celdas en un plano de bits
+def empaquetar_plano(estado, bit):
+    """Devuelve un bit por celda (orden little-endian dentro de cada byte)."""
+    unos = bytes(estado.translate(_SOLO_BIT[bit]))
+    np = cargar_numpy()  # Opcional: empaqueta los bits más rápido
+    if np is not None:
+        return np.packbits(np.frombuffer(unos, dtype=np.uint8), bitorder="little").tobytes()
+    unos += bytes(-len(unos) % 8)
+    return bytes(_EMPAQUETAR[unos[i:i + 8]] for i in range(0, len(unos), 8))
+
+
+# Convierte un plano de bits en un byte por celda con el bit de estado puesto
+def desempaquetar_plano(plano, bit, total):
+    """Devuelve total bytes con el valor bit en las celdas marcadas en el plano."""
+    np = cargar_numpy()
+    if np is not None:
+        bits = np.unpackbits(np.frombuffer(plano, dtype=np.uint8), count=total, bitorder="little")
+        return (bits * np.uint8(bit)).tobytes()
+    tabla = _DESEMPAQUETAR[bit]
+    return b"".join([tabla[v] for v in plano])[:total]
+
+
+# Guarda la partida en un archivo temporal y lo renombra al final
+def guardar_partida(ruta, tablero, milisegundos, repeticion):
+    """Guarda una partida en curso de forma atómica."""
+    datos_repeticion = repeticion.a_bytes()
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(CABECERA.pack(MAGIA, tablero.filas, tablero.columnas, tablero.minas,
+                                        tablero.semilla or 0, milisegundos))
+            for bit in PLANOS:
+                archivo.write(empaquetar_plano(tablero.estado, bit))
+            archivo.write(LONGITUD.pack(len(datos_repeticion)))
+            archivo.write(datos_repeticion)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.remove(temporal)
+        raise
+
+
+# Carga la partida leyendo los planos directamente del archivo mapeado en memoria
+def cargar_partida(ruta, crear_motor=MotorBuscaminas):
+    """Devuelve (tablero, milisegundos jugados, repetición) de una partida guardada.
+
+    crear_motor(filas, columnas, minas) construye el motor vacío, así que la
+    partida continúa con el mismo motor que una partida nueva.
+    Lanza ValueError si el archivo no es una partida guardada o está dañado.
+    """
+    try:
+        return _cargar_partida(ruta, crear_motor)
+    except (struct.error, zlib.error, IndexError) as error:
+        raise ValueError(f"Partida guardada dañada: {error}") from error
+
+
+def _cargar_partida(ruta, crear_motor):
+    with open(ruta, "rb") as archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+        magia, filas, columnas, minas, semilla, milisegundos = CABECERA.unpack_from(datos, 0)
+        if magia != MAGIA:
+            raise ValueError("No es una partida guardada del Buscaminas")
+        tablero = crear_motor(filas, columnas, minas)
+        tablero.semilla = semilla
+        tamano = (tablero.total + 7) // 8
+        posicion = CABECERA.size
+
+        # Los planos desempaquetados no se solapan, así que se combinan con un OR de enteros grandes
+        combinado = 0
+        for bit in PLANOS:
+            plano = desempaquetar_plano(datos[posicion:posicion + tamano], bit, tablero.total)
+            combinado |= int.from_bytes(plano, "little")
+            posicion += tamano
+        tablero.cargar_estado(combinado.to_bytes(tablero.total, "little"))
+
+        longitud, = LONGITUD.unpack_from(datos, posicion)
+        posicion += LONGITUD.size
+        repeticion = Repeticion.desde_bytes(datos[posicion:posicion + longitud])
+
+    tablero.calcular_adyacencias()
+    tablero.recalcular_contadores()
+    # Si aún no se había revelado nada, el primer clic sigue protegido
+    tablero.proteccion = repeticion.proteccion
+    tablero.primer_clic_pendiente = tablero.ocultas_seguras == tablero.total - tablero.minas and not tablero.perdido
+    return tablero, milisegundos, repeticion
@@ -0,0 +1,73 @@
+# Historial de jugadas para deshacer y rehacer: cada jugada guarda solo las
+# celdas que ha tocado, nunca una copia del tablero
+import sys
+from array import array
+
+# Jugadas que se pueden deshacer; las más antiguas se olvidan
+LIMITE = 1000
+
+
+class Jugada:
+    """Cambios de una jugada: lo justo para dejar el tablero como estaba.
+
+    reveladas son las celdas que la jugada ha revelado (basta con quitarles
+    el bit REVELADO), anteriores son pares (celda, estado anterior) de las
+    demás celdas cambiadas y contadores guarda (ocultas_seguras,
+    banderas_usadas, perdido) de antes de la jugada.
+    """
+
+    __slots__ = ("accion", "fila", "columna", "reveladas", "anteriores", "contadores")
+
+    def __init__(self, accion, fila, columna, reveladas, anteriores, contadores):
+        self.accion = accion  # Nombre del método del motor que hizo la jugada
+        self.fila = fila
+        self.columna = columna
+        self.reveladas = array("I", reveladas)  # 4 bytes por celda revelada
+        self.anteriores = tuple(anteriores)
+        self.contadores = contadores
+
+    def memoria(self):
+        """Devuelve los bytes aproximados que ocupa la jugada."""
+        return sys.getsizeof(self.reveladas) + sys.getsizeof(self.anteriores) + 32 * len(self.anteriores)
+
+
+class Historial:
+    """Pilas de jugadas hechas y deshechas de un motor.
+
+    Deshacer una jugada cuesta lo mismo que el número de celdas que tocó.
+    Rehacer vuelve a ejecutar la jugada sobre el tablero restaurado, que da
+    el mismo resultado, así que no hace falta guardar nada más.
+    """
+
+    def __init__(self, limite=LIMITE):
+        self.limite = limite
+        self.hechas = []
+        self.deshechas = []
+        self.rehaciendo = False  # La próxima jugada grabada viene de rehacer()
+
+    # Apunta una jugada nueva; una jugada normal borra lo que se podía rehacer
+    def grabar(self, jugada):
+        """Añade una jugada al historial."""
+        self.hechas.append(jugada)
+        if len(self.hechas) > self.limite:
+            del self.hechas[0]
+        if not self.rehaciendo:
+            self.deshechas.clear()
+
+    def deshacer(self):
+        """Saca la última jugada hecha y la devuelve, o None si no hay ninguna."""
+        if not self.hechas:
+            return None
+        jugada = self.hechas.pop()
+        self.deshechas.append(jugada)
+        return jugada
+
+    def rehacer(self):
+        """Saca la última jugada deshecha y la devuelve, o None si no hay ninguna."""
+        if not self.deshechas:
+            return None
+        return self.deshechas.pop()
+
+    def memoria(self):
+        """Devuelve los bytes aproximados que ocupan las jugadas guardadas."""
+        return sum(jugada.memoria() for jugada in self.hechas) + sum(jugada.memoria() for jugada in self.deshechas)
@@ -0,0 +1,456 @@
+# Modo infinito: tablero sin bordes que se genera por trozos solo cuando hace falta
+import hashlib
+import random
+import sqlite3
+import struct
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+from motor import BANDERA, DESPLAZAMIENTOS, INTERROGACION, MINA, REVELADO, MotorBuscaminas
+
+# Lado de cada trozo, en celdas
+TAMANO_TROZO = 32
+
+# Proporción de celdas con mina. Con pocas minas las zonas vacías se unen
+# en una sola zona sin fin (percolación) y el primer relleno no terminaría:
+# con 0.08 o menos no acaba, con 0.12 ya sí
+DENSIDAD = 0.17
+DENSIDAD_MINIMA = 0.12
+
+# Un relleno no se expande más allá de este número de trozos alrededor del
+# trozo pulsado (9x9 trozos caben en memoria sin descartar ninguno). Las
+# celdas vacías del borde quedan reveladas con el bit PENDIENTE y el relleno
+# sigue desde ellas cuando la zona visible se acerca
+RADIO_RELLENO = 4
+
+# Trozos alrededor de la zona visible en los que se continúan los rellenos pendientes
+MARGEN_PENDIENTES = 1
+
+# Celda vacía revelada cuyo relleno aún no ha llegado a sus vecinas; es un
+# bit propio del modo infinito y se guarda con lo que ha hecho el jugador
+PENDIENTE = 16
+
+# Trozos con estado y adyacencias que se mantienen en memoria (unos 2 KB cada uno)
+TROZOS_EN_MEMORIA = 256
+
+# Disposiciones de minas que se guardan para no volver a generarlas (1 KB cada una)
+MINAS_EN_MEMORIA = 1024
+
+# Trozos descartados cuyo estado comprimido se queda en memoria; los más
+# antiguos pasan a una base de datos temporal en disco
+GUARDADOS_EN_MEMORIA = 4096
+
+# Quita el bit de mina y deja solo lo que ha hecho el jugador
+SIN_MINA = bytes(v & ~MINA & 0xFF for v in range(256))
+
+# 1 en las celdas con un relleno pendiente
+SOLO_PENDIENTE = bytes(1 if v & PENDIENTE else 0 for v in range(256))
+
+
+# Semilla de un trozo a partir de la semilla de la partida y sus coordenadas
+def semilla_trozo(semilla, fila_trozo, columna_trozo):
+    """Devuelve una semilla de 64 bits distinta para cada trozo."""
+    datos = struct.pack("<Qqq", semilla, fila_trozo, columna_trozo)
+    return int.from_bytes(hashlib.blake2b(datos, digest_size=8).digest(), "little")
+
+
+# Minas de un trozo; siempre salen las mismas para la misma semilla
+@lru_cache(maxsize=MINAS_EN_MEMORIA)
+def minas_trozo(semilla, densidad, fila_trozo, columna_trozo):
+    """Devuelve un byte por celda del trozo con el bit MINA en las celdas con mina.
+
+    La celda (0, 0) del mundo y sus vecinas nunca tienen mina: la partida
+    empieza revelando esa zona.
+    """
+    base_fila = fila_trozo * TAMANO_TROZO
+    base_columna = columna_trozo * TAMANO_TROZO
+    candidatas = range(TAMANO_TROZO * TAMANO_TROZO)
+    if -TAMANO_TROZO <= base_fila <= 1 and -TAMANO_TROZO <= base_columna <= 1:
+        candidatas = [f * TAMANO_TROZO + c for f in range(TAMANO_TROZO) for c in range(TAMANO_TROZO)
+                      if abs(base_fila + f) > 1 or abs(base_columna + c) > 1]
+    celdas = bytearray(TAMANO_TROZO * TAMANO_TROZO)
+    minas = min(len(candidatas), round(TAMANO_TROZO * TAMANO_TROZO * densidad))
+    for indice in random.Random(semilla_trozo(semilla, fila_trozo, columna_trozo)).sample(candidatas, minas):
+        celdas[indice] = MINA
+    return bytes(celdas)
+
+
+class MotorInfinito:
+    """Tablero infinito dividido en trozos de TAMANO_TROZO x TAMANO_TROZO.
+
+    Las minas de cada trozo salen de un hash de (semilla, coordenadas del
+    trozo), así que un trozo solo se genera cuando el relleno o la zona
+    visible llegan a él y se puede descartar y volver a generar. Se mantienen
+    como mucho TROZOS_EN_MEMORIA trozos completos; al descartar uno, lo que
+    ha hecho el jugador en él (celdas reveladas, banderas e interrogaciones)
+    se guarda comprimido, y los trozos que nadie ha tocado no ocupan nada.
+    De esos guardados solo los GUARDADOS_EN_MEMORIA más recientes se quedan
+    en memoria; el resto va a una base de datos SQLite temporal, así que la
+    memoria no crece al explorar y lo que crece es ese archivo en disco,
+    que SQLite borra al cerrar la partida.
+    Las filas y columnas son coordenadas del mundo y pueden ser negativas.
+    """
+
+    def __init__(self, semilla=None, densidad=DENSIDAD):
+        if not DENSIDAD_MINIMA <= densidad < 1:
+            raise ValueError(f"Densidad de minas imposible: {densidad} (mínimo {DENSIDAD_MINIMA})")
+        if semilla is None:
+            semilla = random.randrange(2 ** 63)
+        self.semilla = semilla
+        self.densidad = densidad
+        self.trozos = OrderedDict()  # (fila, columna) del trozo -> (estado, adyacentes), del menos al más usado
+        self.guardados = OrderedDict()  # (fila, columna) del trozo -> estado del jugador comprimido
+        self.archivo = None  # Base de datos temporal con los guardados más antiguos
+        self.reveladas = 0  # Celdas reveladas en toda la partida
+        self.banderas_usadas = 0  # Número de banderas colocadas
+        self.perdido = False  # Se ha revelado una mina
+
+    # Devuelve un trozo, generándolo o recuperándolo si no está en memoria
+    def _trozo(self, fila_trozo, columna_trozo):
+        """Devuelve (estado, adyacentes) de un trozo."""
+        clave = (fila_trozo, columna_trozo)
+        trozo = self.trozos.get(clave)
+        if trozo is not None:
+            self.trozos.move_to_end(clave)
+            return trozo
+
+        estado = bytearray(minas_trozo(self.semilla, self.densidad, fila_trozo, columna_trozo))
+        guardado = self.guardados.pop(clave, None)
+        if guardado is None and self.archivo is not None:
+            guardado = self._desarchivar(clave)
+        if guardado is not None:
+            # Los bits del jugador y el de mina no se solapan: basta un OR de enteros grandes
+            jugador = int.from_bytes(zlib.decompress(guardado), "little")
+            estado[:] = (int.from_bytes(estado, "little") | jugador).to_bytes(len(estado), "little")
+        trozo = (estado, self._adyacencias(fila_trozo, columna_trozo))
+        self.trozos[clave] = trozo
+
+        if len(self.trozos) > TROZOS_EN_MEMORIA:
+            clave_vieja, (estado_viejo, _) = self.trozos.popitem(last=False)
+            jugador = estado_viejo.translate(SIN_MINA)
+            if jugador.count(0) != len(jugador):
+                self.guardados[clave_vieja] = zlib.compress(bytes(jugador))
+                if len(self.guardados) > GUARDADOS_EN_MEMORIA:
+                    self._archivar(*self.guardados.popitem(last=False))
+        return trozo
+
+    # Pasa a disco el estado comprimido de un trozo descartado hace tiempo
+    def _archivar(self, clave, guardado):
+        """Guarda el estado de un trozo en la base de datos temporal."""
+        if self.archivo is None:
+            # Con un nombre vacío SQLite crea una base de datos privada en disco
+            # que se borra al cerrar la conexión; no hace falta diario ni fsync
+            self.archivo = sqlite3.connect("", isolation_level=None)
+            self.archivo.execute("PRAGMA journal_mode=OFF")
+            self.archivo.execute("PRAGMA synchronous=OFF")
+            self.archivo.execute("CREATE TABLE trozos (fila INTEGER, columna INTEGER, estado BLOB, "
+                                 "PRIMARY KEY (fila, columna))")
+        self.archivo.execute("INSERT OR REPLACE INTO trozos VALUES (?, ?, ?)", (*clave, guardado))
+
+    def _desarchivar(self, clave):
+        """Saca de la base de datos temporal el estado de un trozo, o devuelve None."""
+        fila = self.archivo.execute("SELECT estado FROM trozos WHERE fila = ? AND columna = ?", clave).fetchone()
+        if fila is None:
+            return None
+        self.archivo.execute("DELETE FROM trozos WHERE fila = ? AND columna = ?", clave)
+        return fila[0]
+
+    # Adyacencias de un trozo usando las minas del borde de los trozos vecinos
+    def _adyacencias(self, fila_trozo, columna_trozo):
+        """Calcula las minas adyacentes de cada celda de un trozo."""
+        lado = TAMANO_TROZO
+        minas = {(df, dc): minas_trozo(self.semilla, self.densidad, fila_trozo + df, columna_trozo + dc)
+                 for df in (-1, 0, 1) for dc in (-1, 0, 1)}
+
+        # Tablero de (lado + 2) x (lado + 2) con el trozo y un marco de celdas vecinas
+        filas = []
+        for fila in range(-1, lado + 1):
+            df, local = divmod(fila, lado)
+            inicio = local * lado
+            filas.append(minas[(df, -1)][inicio + lado - 1:inicio + lado])
+            filas.append(minas[(df, 0)][inicio:inicio + lado])
+            filas.append(minas[(df, 1)][inicio:inicio + 1])
+        marco = MotorBuscaminas(lado + 2, lado + 2, 0)
+        marco.estado[:] = b"".join(filas)
+        marco.calcular_adyacencias()
+
+        ancho = lado + 2
+        return b"".join(marco.adyacentes[(f + 1) * ancho + 1:(f + 1) * ancho + 1 + lado] for f in range(lado))
+
+    # Localiza una celda del mundo en su trozo
+    def _celda(self, fila, columna):
+        """Devuelve (estado, adyacentes, índice dentro del trozo) de una celda."""
+        fila_trozo, fila_local = divmod(fila, TAMANO_TROZO)
+        columna_trozo, columna_local = divmod(columna, TAMANO_TROZO)
+        estado, adyacentes = self._trozo(fila_trozo, columna_trozo)
+        return estado, adyacentes, fila_local * TAMANO_TROZO + columna_local
+
+    # Copia el estado de una zona rectangular del mundo
+    def copiar_zona(self, fila, columna, filas, columnas, estado, adyacentes):
+        """Rellena estado y adyacentes (filas * columnas bytes) con la zona que empieza en (fila, columna)."""
+        destino = 0
+        for f in range(fila, fila + filas):
+            fila_trozo, fila_local = divmod(f, TAMANO_TROZO)
+            c = columna
+            restantes = columnas
+            while restantes:
+                columna_trozo, columna_local = divmod(c, TAMANO_TROZO)
+                ancho = min(TAMANO_TROZO - columna_local, restantes)
+                estado_trozo, adyacentes_trozo = self._trozo(fila_trozo, columna_trozo)
+                origen = fila_local * TAMANO_TROZO + columna_local
+                estado[destino:destino + ancho] = estado_trozo[origen:origen + ancho]
+                adyacentes[destino:destino + ancho] = adyacentes_trozo[origen:origen + ancho]
+                destino += ancho
+                c += ancho
+                restantes -= ancho
+
+    # Revela una celda y, si no tiene minas cerca, toda su zona vacía
+    def revelar(self, fila, columna):
+        """Revela una celda y devuelve las posiciones (fila, columna) reveladas."""
+        estado, adyacentes, indice = self._celda(fila, columna)
+        celda = estado[indice]
+        if celda & (BANDERA | REVELADO):
+            return []
+        estado[indice] = (celda | REVELADO) & ~INTERROGACION
+        reveladas = [(fila, columna)]
+        if celda & MINA:
+            self.perdido = True
+            return reveladas
+        if adyacentes[indice] == 0:
+            self._rellenar(fila, columna, reveladas)
+        self.reveladas += len(reveladas)
+        return reveladas
+
+    # Relleno iterativo limitado a RADIO_RELLENO trozos alrededor de la celda
+    # de partida: los vecinos de una celda vacía nunca son minas
+    def _rellenar(self, fila, columna, reveladas):
+        """Revela la zona vacía de una celda vacía ya revelada y añade las posiciones a reveladas.
+
+        Las celdas vacías que quedan fuera del límite se marcan con PENDIENTE.
+        """
+        primera_fila = (fila // TAMANO_TROZO - RADIO_RELLENO) * TAMANO_TROZO
+        ultima_fila = primera_fila + (2 * RADIO_RELLENO + 1) * TAMANO_TROZO
+        primera_columna = (columna // TAMANO_TROZO - RADIO_RELLENO) * TAMANO_TROZO
+        ultima_columna = primera_columna + (2 * RADIO_RELLENO + 1) * TAMANO_TROZO
+        pila = [(fila, columna)]
+        while pila:
+            fila, columna = pila.pop()
+            for df, dc in DESPLAZAMIENTOS:
+                vecina = (fila + df, columna + dc)
+                estado, adyacentes, indice = self._celda(*vecina)
+                celda = estado[indice]
+                if celda & (BANDERA | REVELADO):
+                    continue
+                estado[indice] = (celda | REVELADO) & ~INTERROGACION
+                reveladas.append(vecina)
+                if adyacentes[indice] == 0:
+                    if primera_fila <= vecina[0] < ultima_fila and primera_columna <= vecina[1] < ultima_columna:
+                        pila.append(vecina)
+                    else:
+                        estado[indice] |= PENDIENTE
+
+    # Sigue los rellenos que se cortaron en el límite cerca de una zona del mundo
+    def continuar_rellenos(self, fila, columna, filas, columnas):
+        """Continúa los rellenos pendientes de la zona y su margen y devuelve las posiciones reveladas."""
+        margen = MARGEN_PENDIENTES * TAMANO_TROZO
+        primera_fila = (fila - margen) // TAMANO_TROZO
+        ultima_fila = (fila + filas + margen - 1) // TAMANO_TROZO
+        primera_columna = (columna - margen) // TAMANO_TROZO
+        ultima_columna = (columna + columnas + margen - 1) // TAMANO_TROZO
+        reveladas = []
+        # Un relleno puede dejar nuevas celdas pendientes en la zona: se repite hasta que no quede ninguna
+        continuar = True
+        while continuar:
+            continuar = False
+            for fila_trozo in range(primera_fila, ultima_fila + 1):
+                for columna_trozo in range(primera_columna, ultima_columna + 1):
+                    estado, _ = self._trozo(fila_trozo, columna_trozo)
+                    pendientes = estado.translate(SOLO_PENDIENTE)
+                    local = pendientes.find(1)
+                    while local != -1:
+                        estado[local] &= ~PENDIENTE
+                        fila_local, columna_local = divmod(local, TAMANO_TROZO)
+                        self._rellenar(fila_trozo * TAMANO_TROZO + fila_local,
+                                       columna_trozo * TAMANO_TROZO + columna_local, reveladas)
+                        continuar = True
+                        local = pendientes.find(1, local + 1)
+        self.reveladas += len(reveladas)
+        return reveladas
+
+    # Revela los vecinos de un número cuando ya tiene todas sus banderas
+    def acorde(self, fila, columna):
+        """Revela los vecinos sin bandera de un número ya satisfecho."""
+        estado, adyacentes, indice = self._celda(fila, columna)
+        if not estado[indice] & REVELADO or estado[indice] & MINA:
+            return []
+        numero = adyacentes[indice]
+        vecinas = [(fila + df, columna + dc) for df, dc in DESPLAZAMIENTOS]
+        banderas = 0
+        for vecina in vecinas:
+            estado, _, indice = self._celda(*vecina)
+            banderas += bool(estado[indice] & BANDERA)
+        if banderas != numero:
+            return []
+        reveladas = []
+        for vecina in vecinas:
+            reveladas += self.revelar(*vecina)
+        return reveladas
+
+    # Coloca o quita una bandera en una celda; en el modo infinito no hay límite de banderas
+    def alternar_bandera(self, fila, columna):
+        """Coloca o quita una bandera. Devuelve True si la celda ha cambiado."""
+        estado, _, indice = self._celda(fila, columna)
+        celda = estado[indice]
+        if celda & REVELADO:
+            return False
+        if celda & BANDERA:
+            estado[indice] = celda & ~BANDERA
+            self.banderas_usadas -= 1
+        else:
+            estado[indice] = (celda | BANDERA) & ~INTERROGACION
+            self.banderas_usadas += 1
+        return True
+
+    # Coloca o quita una interrogación en una celda
+    def alternar_interrogacion(self, fila, columna):
+        """Coloca o quita una interrogación. Devuelve True si la celda ha cambiado."""
+        estado, _, indice = self._celda(fila, columna)
+        celda = estado[indice]
+        if celda & REVELADO:
+            return False
+        if celda & BANDERA:
+            celda &= ~BANDERA
+            self.banderas_usadas -= 1
+        estado[indice] = celda ^ INTERROGACION
+        return True
+
+
+class VistaInfinita:
+    """Zona visible del tablero infinito con la interfaz de índices de MotorBuscaminas.
+
+    Guarda una copia del estado y las adyacencias de la zona visible en
+    arrays planos, así que la vista, el planificador y codigo_celda la usan
+    igual que un tablero normal; mover() desplaza la zona por el mundo.
+    """
+
+    def __init__(self, motor, filas, columnas):
+        self.motor = motor
+        self.filas = filas
+        self.columnas = columnas
+        self.total = filas * columnas
+        self.estado = bytearray(self.total)
+        self.adyacentes = bytearray(self.total)
+        # La celda (0, 0) del mundo queda en el centro de la zona visible
+        self.origen_fila = -(filas // 2)
+        self.origen_columna = -(columnas // 2)
+        self.refrescar()
+
+    @property
+    def semilla(self):
+        return self.motor.semilla
+
+    @property
+    def perdido(self):
+        return self.motor.perdido
+
+    @property
+    def banderas_usadas(self):
+        return self.motor.banderas_usadas
+
+    # Índice plano dentro de la zona visible
+    def indice(self, fila, columna):
+        """Devuelve el índice plano de una celda visible."""
+        return fila * self.columnas + columna
+
+    def posicion(self, indice):
+        """Devuelve la fila y la columna visibles de un índice plano."""
+        return divmod(indice, self.columnas)
+
+    # Consultas sobre el estado de una celda visible
+    def es_mina(self, indice):
+        """Indica si la celda contiene una mina."""
+        return bool(self.estado[indice] & MINA)
+
+    def esta_revelada(self, indice):
+        """Indica si la celda está revelada."""
+        return bool(self.estado[indice] & REVELADO)
+
+    def tiene_bandera(self, indice):
+        """Indica si la celda tiene una bandera."""
+        return bool(self.estado[indice] & BANDERA)
+
+    def tiene_interrogacion(self, indice):
+        """Indica si la celda tiene una interrogación."""
+        return bool(self.estado[indice] & INTERROGACION)
+
+    # Vuelve a copiar la zona visible desde el mundo
+    def refrescar(self):
+        """Actualiza la copia de la zona visible."""
+        self.motor.copiar_zona(self.origen_fila, self.origen_columna, self.filas, self.columnas,
+                               self.estado, self.adyacentes)
+
+    # Desplaza la zona visible por el mundo
+    def mover(self, filas, columnas):
+        """Mueve la zona visible y devuelve todos sus índices para repintarlos."""
+        self.origen_fila += filas
+        self.origen_columna += columnas
+        self._continuar_rellenos()
+        self.refrescar()
+        return range(self.total)
+
+    # Los rellenos cortados en el límite siguen cuando la zona visible se acerca
+    def _continuar_rellenos(self):
+        """Continúa los rellenos pendientes alrededor de la zona visible y devuelve las posiciones reveladas."""
+        return self.motor.continuar_rellenos(self.origen_fila, self.origen_columna, self.filas, self.columnas)
+
+    # Revela una celda visible
+    def revelar(self, fila, columna):
+        """Revela una celda y devuelve los índices visibles que se han revelado."""
+        reveladas = self.motor.revelar(self.origen_fila + fila, self.origen_columna + columna)
+        return self._visibles(reveladas + self._continuar_rellenos() if reveladas else reveladas)
+
+    # Revela los vecinos de un número visible ya satisfecho
+    def acorde(self, fila, columna):
+        """Hace un acorde y devuelve los índices visibles que se han revelado."""
+        reveladas = self.motor.acorde(self.origen_fila + fila, self.origen_columna + columna)
+        return self._visibles(reveladas + self._continuar_rellenos() if reveladas else reveladas)
+
+    def _visibles(self, reveladas):
+        """Refresca la zona visible y devuelve los índices visibles de las posiciones reveladas."""
+        if not reveladas:
+            return []
+        self.refrescar()
+        visibles = []
+        for f, c in reveladas:
+            f -= self.origen_fila
+            c -= self.origen_columna
+            if 0 <= f < self.filas and 0 <= c < self.columnas:
+                visibles.append(f * self.columnas + c)
+        return visibles
+
+    # Coloca o quita una bandera en una celda visible
+    def alternar_bandera(self, fila, columna):
+        """Coloca o quita una bandera. Devuelve True si la celda ha cambiado."""
+        if not self.motor.alternar_bandera(self.origen_fila + fila, self.origen_columna + columna):
+            return False
+        self.refrescar()
+        return True
+
+    # Coloca o quita una interrogación en una celda visible
+    def alternar_interrogacion(self, fila, columna):
+        """Coloca o quita una interrogación. Devuelve True si la celda ha cambiado."""
+        if not self.motor.alternar_interrogacion(self.origen_fila + fila, self.origen_columna + columna):
+            return False
+        self.refrescar()
+        return True
+
+    # Celdas visibles que cambian de aspecto al destapar la zona visible
+    def ocultas(self):
+        """Devuelve los índices visibles de las celdas sin revelar."""
+        return [indice for indice, celda in enumerate(self.estado) if not celda & REVELADO]
+
+    # En el modo infinito no se gana: se juega hasta pisar una mina
+    def victoria(self):
+        """El tablero infinito nunca se completa."""
+        return False
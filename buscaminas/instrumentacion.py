@@ -0,0 +1,186 @@
+# Medición opcional de los caminos calientes del juego
+import argparse
+import functools
+import json
+import platform
+import sys
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# Límite superior en milisegundos de cada cubo del histograma; el último cubo recoge el resto
+CUBOS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+# Contexto que no hace nada, para los tramos con la medición apagada
+_NULO = nullcontext()
+
+
+class Medidor:
+    """Llamadas, tiempo total, máximo, último tiempo e histograma de una medida."""
+
+    __slots__ = ("llamadas", "total", "maximo", "ultimo", "cubos")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.ultimo = 0.0
+        self.cubos = [0] * (len(CUBOS_MS) + 1)
+
+    # Añade una medida en segundos
+    def registrar(self, segundos):
+        """Suma una medida a los contadores y al histograma."""
+        milisegundos = segundos * 1000
+        self.llamadas += 1
+        self.total += milisegundos
+        self.ultimo = milisegundos
+        if milisegundos > self.maximo:
+            self.maximo = milisegundos
+        self.cubos[bisect_left(CUBOS_MS, milisegundos)] += 1
+
+    # Percentil aproximado: el límite del cubo donde cae
+    def percentil(self, p):
+        """Devuelve el límite superior en ms del cubo que contiene el percentil p."""
+        if not self.llamadas:
+            return 0.0
+        objetivo = self.llamadas * p / 100
+        acumulado = 0
+        for limite, cantidad in zip(CUBOS_MS, self.cubos):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return limite
+        return self.maximo
+
+    def a_dict(self):
+        """Devuelve la medida como diccionario para el volcado JSON."""
+        return {
+            "llamadas": self.llamadas,
+            "total_ms": self.total,
+            "media_ms": self.total / self.llamadas if self.llamadas else 0.0,
+            "max_ms": self.maximo,
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "histograma": {f"<={limite}": cantidad for limite, cantidad in zip(CUBOS_MS, self.cubos)}
+                          | {f">{CUBOS_MS[-1]}": self.cubos[-1]},
+        }
+
+
+class Instrumentacion:
+    """Medidores de tiempo por nombre que se pueden encender y apagar.
+
+    Con la medición apagada, una función decorada con medido() solo
+    comprueba un atributo antes de llamar a la original, y tramo() devuelve
+    un contexto vacío, así que el coste es despreciable.
+    """
+
+    def __init__(self):
+        self.activa = False
+        self.medidores = {}
+
+    def medidor(self, nombre):
+        """Devuelve el medidor de un nombre, creándolo si no existe."""
+        medidor = self.medidores.get(nombre)
+        if medidor is None:
+            medidor = self.medidores[nombre] = Medidor()
+        return medidor
+
+    # Apunta una medida tomada fuera de medido() y tramo()
+    def registrar(self, nombre, segundos):
+        """Suma una medida en segundos si la medición está encendida."""
+        if self.activa:
+            self.medidor(nombre).registrar(segundos)
+
+    # Decorador para medir cada llamada a una función
+    def medido(self, funcion):
+        """Envuelve una función para medir sus llamadas con su nombre."""
+        nombre = funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltorio(*args, **kwargs):
+            if not self.activa:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                self.medidor(nombre).registrar(time.perf_counter() - inicio)
+        return envoltorio
+
+    # Contexto para medir solo una parte de una función
+    def tramo(self, nombre):
+        """Devuelve un contexto que mide el bloque con el nombre dado."""
+        if not self.activa:
+            return _NULO
+        return _Tramo(self.medidor(nombre))
+
+    def reiniciar(self):
+        """Borra todas las medidas."""
+        self.medidores.clear()
+
+    # Volcado para comparar ejecuciones o versiones
+    def a_dict(self):
+        """Devuelve todas las medidas y los datos de la máquina."""
+        return {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "medidas": {nombre: medidor.a_dict() for nombre, medidor in sorted(self.medidores.items())},
+        }
+
+    def volcar_json(self, ruta):
+        """Guarda las medidas en un archivo JSON."""
+        with open(ruta, "w") as archivo:
+            json.dump(self.a_dict(), archivo, indent=2)
+
+
+class _Tramo:
+    __slots__ = ("medidor", "inicio")
+
+    def __init__(self, medidor):
+        self.medidor = medidor
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *error):
+        self.medidor.registrar(time.perf_counter() - self.inicio)
+
+
+# Instancia compartida por todo el juego
+INSTRUMENTACION = Instrumentacion()
+medido = INSTRUMENTACION.medido
+tramo = INSTRUMENTACION.tramo
+
+
+# Compara dos volcados JSON medida a medida
+def comparar(antes, despues):
+    """Devuelve las líneas de una tabla con la media y el p95 de cada medida en los dos volcados."""
+    lineas = [f"{'medida':<26}{'llamadas':>10}{'media antes':>13}{'media después':>15}{'cambio':>9}{'p95 después':>13}"]
+    for nombre in sorted(set(antes["medidas"]) | set(despues["medidas"])):
+        a = antes["medidas"].get(nombre)
+        d = despues["medidas"].get(nombre)
+        if a is None or d is None:
+            lineas.append(f"{nombre:<26}{'solo en ' + ('después' if a is None else 'antes'):>10}")
+            continue
+        cambio = f"{(d['media_ms'] / a['media_ms'] - 1) * 100:+.0f}%" if a["media_ms"] else "-"
+        lineas.append(f"{nombre:<26}{d['llamadas']:>10}{a['media_ms']:>11.3f}ms{d['media_ms']:>13.3f}ms"
+                      f"{cambio:>9}{d['p95_ms']:>11.3f}ms")
+    return lineas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos volcados de rendimiento del Buscaminas")
+    parser.add_argument("antes", help="Volcado JSON de referencia")
+    parser.add_argument("despues", help="Volcado JSON a comparar")
+    args = parser.parse_args()
+
+    with open(args.antes) as archivo:
+        antes = json.load(archivo)
+    with open(args.despues) as archivo:
+        despues = json.load(archivo)
+    for linea in comparar(antes, despues):
+        print(linea)
+
+
+if __name__ == "__main__":
+    main()
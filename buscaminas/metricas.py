@@ -0,0 +1,106 @@
+# Métricas de dificultad de un tablero: 3BV, aperturas e islas
+#
+# El 3BV es el número mínimo de clics para despejar el tablero sin acordes:
+# un clic por apertura (zona conexa de celdas sin minas cerca, que se revela
+# entera junto con su borde de números) más un clic por cada celda segura que
+# no toca ninguna apertura (las islas).
+from motor import CELDAS_NUMPY, MINA, SOLO_MINA, cargar_numpy, tabla_vecinos
+
+
+# Calcula las métricas de un tablero con las minas y las adyacencias ya puestas
+def calcular_metricas(tablero, usar_numpy=True):
+    """Devuelve un diccionario con "3bv", "aperturas" e "islas".
+
+    Sirve para cualquier motor con filas, columnas, estado y adyacentes.
+    Los dos caminos cuestan tiempo lineal en el número de celdas.
+    """
+    if usar_numpy and tablero.total >= CELDAS_NUMPY and cargar_numpy() is not None:
+        aperturas, islas = _metricas_numpy(tablero)
+    else:
+        aperturas, islas = _metricas_bucle(tablero)
+    return {"3bv": aperturas + islas, "aperturas": aperturas, "islas": islas}
+
+
+# Sin NumPy: un relleno por inundación por apertura, como el de revelar,
+# con una marca por celda para no visitar ninguna dos veces
+def _metricas_bucle(tablero):
+    """Devuelve (aperturas, islas) recorriendo cada apertura una sola vez."""
+    desplazamientos, tipos = tabla_vecinos(tablero.filas, tablero.columnas)
+    adyacentes = tablero.adyacentes
+    visitadas = bytearray(tablero.estado.translate(SOLO_MINA))  # Las minas cuentan como visitadas
+    seguras = tablero.total - visitadas.count(1)
+    aperturas = 0
+    cubiertas = 0  # Celdas seguras que revela alguna apertura
+
+    # Las minas también tienen 0 en adyacentes, pero ya están marcadas
+    inicio = adyacentes.find(0)
+    while inicio != -1:
+        if not visitadas[inicio]:
+            aperturas += 1
+            visitadas[inicio] = 1
+            cubiertas += 1
+            pila = [inicio]
+            while pila:
+                indice = pila.pop()
+                for d in desplazamientos[tipos[indice]]:
+                    vecino = indice + d
+                    if not visitadas[vecino]:
+                        visitadas[vecino] = 1
+                        cubiertas += 1
+                        if not adyacentes[vecino]:
+                            pila.append(vecino)
+        inicio = adyacentes.find(0, inicio + 1)
+    return aperturas, seguras - cubiertas
+
+
+# Con NumPy las celdas vacías de cada fila se agrupan en tramos y solo se
+# unen tramos (union-find), que son muchos menos que celdas. Dos tramos de
+# filas consecutivas se tocan, también en diagonal, si sus intervalos
+# ampliados una columna se solapan.
+def _metricas_numpy(tablero):
+    """Devuelve (aperturas, islas) con etiquetado de componentes por tramos."""
+    np = cargar_numpy()
+    filas, columnas = tablero.filas, tablero.columnas
+    minas = (np.frombuffer(tablero.estado, dtype=np.uint8) & MINA).astype(bool).reshape(filas, columnas)
+    vacias = (np.frombuffer(tablero.adyacentes, dtype=np.uint8) == 0).reshape(filas, columnas) & ~minas
+
+    # Islas: celdas seguras que no están en ninguna apertura ni en su borde
+    borde = np.pad(vacias, 1)
+    cubiertas = np.zeros_like(vacias)
+    for df in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            cubiertas |= borde[1 + df:1 + df + filas, 1 + dc:1 + dc + columnas]
+    islas = int(np.count_nonzero(~cubiertas & ~minas))
+
+    # Tramos [inicio, fin) de celdas vacías de cada fila, en orden de fila
+    relleno = np.zeros((filas, columnas + 2), dtype=np.int8)
+    relleno[:, 1:-1] = vacias
+    cambios = np.diff(relleno, axis=1)
+    fila, inicio = np.nonzero(cambios == 1)
+    fin = np.nonzero(cambios == -1)[1]
+    tramos = len(inicio)
+    if not tramos:
+        return 0, islas
+
+    # Con claves fila * ancho + columna, los tramos de la fila anterior que
+    # tocan a cada tramo forman un intervalo que se encuentra con searchsorted
+    ancho = columnas + 2
+    claves_inicio = fila * ancho + inicio
+    claves_fin = fila * ancho + fin
+    desde = np.searchsorted(claves_fin, (fila - 1) * ancho + inicio, "left")
+    hasta = np.searchsorted(claves_inicio, (fila - 1) * ancho + fin, "right")
+    cuantos = hasta - desde
+    abajo = np.repeat(np.arange(tramos), cuantos)
+    arriba = np.repeat(desde - np.cumsum(cuantos) + cuantos, cuantos) + np.arange(int(cuantos.sum()))
+
+    padre = list(range(tramos))
+    uniones = 0
+    for a, b in zip(arriba.tolist(), abajo.tolist()):
+        while padre[a] != a:
+            padre[a] = a = padre[padre[a]]
+        while padre[b] != b:
+            padre[b] = b = padre[padre[b]]
+        if a != b:
+            padre[b] = a
+            uniones += 1
+    return tramos - uniones, islas
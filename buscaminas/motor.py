@@ -0,0 +1,526 @@
+# Motor del Buscaminas: lógica del juego sin dependencias de Tk
+import random  # Para generar posiciones aleatorias de minas
+from functools import lru_cache  # Tablas de vecinos compartidas por tamaño de tablero
+
+from historial import Jugada  # Cambios de cada jugada para deshacer
+
+# NumPy es opcional (acelera los cálculos sobre todo el tablero) y tarda en
+# importarse, así que se carga la primera vez que hace falta
+_numpy = None
+
+# Por debajo de este número de celdas los enteros grandes son más rápidos que NumPy
+CELDAS_NUMPY = 10000
+
+# Configuración inicial del juego
+# Cada dificultad puede llevar una "semilla" opcional para repetir siempre el mismo tablero.
+# En las dificultades con "infinito" las filas y columnas son la zona visible y
+# "densidad" es la proporción de celdas con mina
+DIFICULTADES = {
+    "Fácil": {"filas": 6, "columnas": 6, "minas": 6},
+    "Medio": {"filas": 12, "columnas": 12, "minas": 15},
+    "Difícil": {"filas": 16, "columnas": 16, "minas": 50},
+    "Enorme": {"filas": 300, "columnas": 300, "minas": 14000},
+    "Infinito": {"filas": 20, "columnas": 30, "densidad": 0.17, "infinito": True}
+}
+
+# Bits de estado de cada celda (se combinan en un único byte)
+MINA = 1
+REVELADO = 2
+BANDERA = 4
+INTERROGACION = 8
+
+# Protección del primer clic: ninguna, la celda pulsada o la celda y sus 8 vecinas
+SIN_PROTECCION = 0
+PROTEGER_CELDA = 1
+PROTEGER_ZONA = 2
+
+# Desplazamientos de las 8 celdas vecinas
+DESPLAZAMIENTOS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# Tablas de traducción de bytes: extraer el bit de mina y anular el conteo de las minas
+SOLO_MINA = bytes(v & MINA for v in range(256))
+CONTEO_SIN_MINA = bytes(v if v < 16 else 0 for v in range(256))
+SEGURA_OCULTA = bytes(0 if v & (MINA | REVELADO) else 1 for v in range(256))
+SOLO_BANDERA = bytes(1 if v & BANDERA else 0 for v in range(256))
+SOLO_INTERROGACION = bytes(1 if v & INTERROGACION else 0 for v in range(256))
+MINA_REVELADA = bytes(1 if v & MINA and v & REVELADO else 0 for v in range(256))
+SOLO_REVELADO = bytes(1 if v & REVELADO else 0 for v in range(256))
+OCULTA = bytes(0 if v & REVELADO else 1 for v in range(256))
+CON_MARCAS = bytes(1 if v & ~MINA else 0 for v in range(256))  # Reveladas, banderas o interrogaciones
+
+
+# Tipo de una fila o columna según los bordes que toca
+_CENTRO, _PRIMERA, _ULTIMA, _UNICA = 0, 1, 2, 3
+
+
+# Tablas de vecinos de un tamaño de tablero, construidas una sola vez
+@lru_cache(maxsize=16)
+def tabla_vecinos(filas, columnas):
+    """Devuelve (desplazamientos, tipos) para recorrer vecinos sin comprobar bordes.
+
+    Cada celda tiene un tipo (tipo de su fila * 4 + tipo de su columna) y
+    los vecinos de la celda i son i + d para cada d de desplazamientos[tipos[i]].
+    tipos ocupa un byte por celda y se monta repitiendo filas de bytes.
+    """
+    desplazamientos = []
+    for tipo in range(16):
+        tipo_fila, tipo_columna = divmod(tipo, 4)
+        desplazamientos.append(tuple(
+            df * columnas + dc for df, dc in DESPLAZAMIENTOS
+            if not (df < 0 and tipo_fila in (_PRIMERA, _UNICA)) and not (df > 0 and tipo_fila in (_ULTIMA, _UNICA))
+            and not (dc < 0 and tipo_columna in (_PRIMERA, _UNICA)) and not (dc > 0 and tipo_columna in (_ULTIMA, _UNICA))))
+
+    def fila(tipo_fila):
+        if columnas == 1:
+            return bytes([tipo_fila * 4 + _UNICA])
+        return bytes([tipo_fila * 4 + _PRIMERA]) + bytes([tipo_fila * 4 + _CENTRO]) * (columnas - 2) + bytes([tipo_fila * 4 + _ULTIMA])
+
+    if filas == 1:
+        tipos = fila(_UNICA)
+    else:
+        tipos = fila(_PRIMERA) + fila(_CENTRO) * (filas - 2) + fila(_ULTIMA)
+    return tuple(desplazamientos), tipos
+
+
+# Destinos de las minas que se apartan del primer clic
+def elegir_destinos(semilla, indice, total, cantidad, ocupada):
+    """Devuelve cantidad celdas distintas al azar en las que ocupada(celda) es falso.
+
+    El azar depende solo de la semilla del tablero y de la celda pulsada,
+    así que una repetición vuelve a mover las minas a las mismas celdas.
+    """
+    rng = random.Random(f"{semilla}:{indice}")
+    destinos = []
+    elegidas = set()
+    while len(destinos) < cantidad:
+        celda = rng.randrange(total)
+        if celda not in elegidas and not ocupada(celda):
+            elegidas.add(celda)
+            destinos.append(celda)
+    return destinos
+
+
+# Importa NumPy solo la primera vez
+def cargar_numpy():
+    """Devuelve el módulo numpy o None si no está instalado."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+# Índices de las celdas que cumplen una condición, sin un bucle de Python por celda
+def indices_marcados(estado, tabla):
+    """Devuelve la lista ordenada de índices i con tabla[estado[i]] == 1.
+
+    translate recorre el tablero en C; después los índices salen de
+    flatnonzero con NumPy o, sin él, de find saltando de marca en marca.
+    """
+    marcas = estado.translate(tabla)
+    if len(marcas) >= CELDAS_NUMPY and cargar_numpy() is not None:
+        np = cargar_numpy()
+        return np.flatnonzero(np.frombuffer(marcas, dtype=np.uint8)).tolist()
+    indices = []
+    indice = marcas.find(1)
+    while indice >= 0:
+        indices.append(indice)
+        indice = marcas.find(1, indice + 1)
+    return indices
+
+
+class MotorBuscaminas:
+    """Tablero del Buscaminas guardado en arrays planos de bytes.
+
+    Cada celda ocupa un byte de estado (bits MINA, REVELADO, BANDERA e
+    INTERROGACION) y un byte con el número de minas adyacentes. La celda
+    (fila, columna) está en el índice fila * columnas + columna.
+
+    Las celdas seguras ocultas y las banderas se llevan en contadores que se
+    actualizan con cada jugada, así que comprobar la victoria cuesta O(1).
+    Con depurar=True los contadores se contrastan con un recorrido completo
+    del tablero después de cada jugada.
+
+    Con proteccion distinta de SIN_PROTECCION el primer revelado nunca pisa
+    una mina: las minas de la celda pulsada (y de sus vecinas con
+    PROTEGER_ZONA) se mueven a otras celdas y solo se recalculan las
+    adyacencias de alrededor de las celdas que han cambiado.
+
+    Con un Historial en historial, cada jugada guarda las celdas que ha
+    tocado y se puede deshacer y rehacer.
+    """
+
+    def __init__(self, filas, columnas, minas, depurar=False, proteccion=SIN_PROTECCION):
+        if filas < 1 or columnas < 1:
+            raise ValueError(f"Tablero imposible: {filas}x{columnas}")
+        if not 0 <= minas <= filas * columnas:
+            raise ValueError(f"No caben {minas} minas en un tablero de {filas}x{columnas}")
+        self.filas = filas
+        self.columnas = columnas
+        self.minas = minas
+        self.semilla = None  # Semilla con la que se colocaron las minas
+        self.total = filas * columnas
+        self.estado = bytearray(self.total)  # Bits de estado de cada celda
+        self.adyacentes = bytearray(self.total)  # Minas adyacentes de cada celda
+        self.banderas_usadas = 0  # Número de banderas colocadas
+        self.ocultas_seguras = self.total - minas  # Celdas sin mina aún por revelar
+        self.perdido = False  # Se ha revelado una mina
+        self.depurar = depurar  # Comprobar los contadores tras cada jugada
+        self.proteccion = proteccion  # Protección del primer clic
+        self.primer_clic_pendiente = False  # Las minas están colocadas y aún no se ha revelado nada
+        self.historial = None  # Historial para deshacer jugadas, o None si no se graban
+        self.interrogadas = set()  # Celdas con interrogación, para grabar revelados sin recorrer el tablero
+        # Vecinos de cada celda sin comprobar bordes, compartidos entre tableros del mismo tamaño
+        self.desplazamientos, self.tipos = tabla_vecinos(filas, columnas)
+
+    # Convierte una posición (fila, columna) en un índice plano
+    def indice(self, fila, columna):
+        """Devuelve el índice plano de una celda."""
+        return fila * self.columnas + columna
+
+    # Convierte un índice plano en una posición (fila, columna)
+    def posicion(self, indice):
+        """Devuelve la fila y la columna de un índice plano."""
+        return divmod(indice, self.columnas)
+
+    # Recorre los índices de las celdas vecinas dentro del tablero
+    def vecinos(self, indice):
+        """Devuelve los índices de las celdas vecinas de una celda."""
+        return [indice + d for d in self.desplazamientos[self.tipos[indice]]]
+
+    # Consultas sobre el estado de una celda
+    def es_mina(self, indice):
+        """Indica si la celda contiene una mina."""
+        return bool(self.estado[indice] & MINA)
+
+    def esta_revelada(self, indice):
+        """Indica si la celda está revelada."""
+        return bool(self.estado[indice] & REVELADO)
+
+    def tiene_bandera(self, indice):
+        """Indica si la celda tiene una bandera."""
+        return bool(self.estado[indice] & BANDERA)
+
+    def tiene_interrogacion(self, indice):
+        """Indica si la celda tiene una interrogación."""
+        return bool(self.estado[indice] & INTERROGACION)
+
+    # Coloca las minas aleatoriamente en el tablero
+    def colocar_minas(self, semilla=None, excluidas=()):
+        """Coloca las minas en una sola pasada; la misma semilla da el mismo tablero.
+
+        Las celdas de excluidas nunca reciben mina.
+        """
+        if semilla is None:
+            semilla = random.randrange(2 ** 63)
+        self.semilla = semilla
+        candidatas = range(self.total)
+        if excluidas:
+            excluidas = set(excluidas)
+            candidatas = [indice for indice in candidatas if indice not in excluidas]
+        if self.minas > len(candidatas):
+            raise ValueError(f"No caben {self.minas} minas fuera de las {len(excluidas)} celdas excluidas")
+        # Muestreo sin reemplazo sobre índices planos: sin reintentos por colisión
+        estado = self.estado
+        for indice in random.Random(semilla).sample(candidatas, self.minas):
+            estado[indice] |= MINA
+        self.primer_clic_pendiente = True
+
+    # Pone el estado de todas las celdas de una vez, por ejemplo al continuar una partida
+    def cargar_estado(self, estado):
+        """Sustituye el estado de todas las celdas, minas incluidas, por los bytes de estado."""
+        self.estado[:] = estado
+
+    # Calcula el número de minas adyacentes para cada celda
+    def calcular_adyacencias(self, usar_numpy=True):
+        """Calcula el número de minas adyacentes para todo el tablero de una vez."""
+        if usar_numpy and self.total >= CELDAS_NUMPY and cargar_numpy() is not None:
+            self._calcular_adyacencias_numpy()
+        else:
+            self._calcular_adyacencias_enteros()
+
+    def _calcular_adyacencias_numpy(self):
+        """Suma las 8 vistas desplazadas de la matriz de minas con bordes a cero."""
+        np = cargar_numpy()
+        minas = np.frombuffer(self.estado, dtype=np.uint8).reshape(self.filas, self.columnas) & MINA
+        borde = np.pad(minas, 1)
+        suma = np.zeros_like(minas)
+        for df, dc in DESPLAZAMIENTOS:
+            suma += borde[1 + df:1 + df + self.filas, 1 + dc:1 + dc + self.columnas]
+        suma[minas == MINA] = 0
+        self.adyacentes[:] = suma.tobytes()
+
+    # Sin NumPy: cada byte del tablero es un dígito en base 256 de un entero
+    # grande y los vecinos se suman desplazando el entero entero. Cada fila
+    # lleva un byte de relleno a la derecha para que los desplazamientos
+    # horizontales no mezclen filas, y como una suma nunca pasa de 9 no hay
+    # acarreo entre bytes.
+    def _calcular_adyacencias_enteros(self):
+        """Calcula las adyacencias con sumas de enteros grandes, sin bucles por celda."""
+        columnas = self.columnas
+        ancho = columnas + 1
+        minas = self.estado.translate(SOLO_MINA)
+        con_relleno = b"\0".join(minas[f * columnas:(f + 1) * columnas] for f in range(self.filas)) + b"\0"
+
+        m = int.from_bytes(con_relleno, "little")
+        horizontal = m + (m << 8) + (m >> 8)
+        vertical = horizontal + (horizontal << (8 * ancho)) + (horizontal >> (8 * ancho))
+        # Se resta la propia celda y se marcan las minas con 16 para anular su conteo
+        resultado = vertical - m + (m << 4)
+
+        conteos = bytearray(resultado.to_bytes(len(con_relleno) + ancho + 1, "little")[:len(con_relleno)])
+        del conteos[columnas::ancho]  # Quitar el byte de relleno de cada fila
+        self.adyacentes[:] = conteos.translate(CONTEO_SIN_MINA)
+
+    # Cuenta las minas adyacentes a una celda específica
+    def contar_minas_adyacentes(self, indice):
+        """Cuenta las minas adyacentes a una celda específica."""
+        estado = self.estado
+        return sum(estado[indice + d] & MINA for d in self.desplazamientos[self.tipos[indice]])
+
+    # Revela una celda y, si no tiene minas cerca, toda su zona vacía
+    def revelar(self, fila, columna):
+        """Revela una celda y devuelve en un solo lote los índices revelados."""
+        if self.primer_clic_pendiente and not self.estado[self.indice(fila, columna)] & (BANDERA | REVELADO):
+            self.primer_clic_pendiente = False
+            self.despejar(self.indice(fila, columna))
+        previo = self._antes_de_revelar()
+        reveladas = self._revelar_indices([self.indice(fila, columna)])
+        self._grabar_revelado("revelar", fila, columna, previo, reveladas)
+        if self.depurar:
+            self.comprobar_contadores()
+        return reveladas
+
+    # Celdas que el primer clic deja sin minas según la protección
+    def zona_protegida(self, indice):
+        """Devuelve las celdas a despejar, o solo la pulsada si fuera no caben las minas."""
+        if self.proteccion == SIN_PROTECCION:
+            return []
+        protegidas = [indice]
+        if self.proteccion == PROTEGER_ZONA:
+            protegidas += self.vecinos(indice)
+            if self.total - len(protegidas) < self.minas:
+                protegidas = [indice]
+        if self.total - len(protegidas) < self.minas:
+            return []
+        return protegidas
+
+    # Aparta las minas del primer clic y repara las adyacencias de alrededor
+    def despejar(self, indice):
+        """Mueve las minas de la zona protegida de un clic y devuelve cuántas se han movido."""
+        protegidas = self.zona_protegida(indice)
+        estado = self.estado
+        origenes = [celda for celda in protegidas if estado[celda] & MINA]
+        if not origenes:
+            return 0
+        protegidas = set(protegidas)
+        destinos = elegir_destinos(self.semilla, indice, self.total, len(origenes),
+                                   lambda celda: celda in protegidas or estado[celda] & MINA)
+        for celda in origenes:
+            estado[celda] &= ~MINA
+        for celda in destinos:
+            estado[celda] |= MINA
+
+        # Solo cambian los conteos de las celdas movidas y de sus vecinas
+        adyacentes = self.adyacentes
+        afectadas = set(origenes + destinos)
+        for celda in origenes + destinos:
+            afectadas.update(self.vecinos(celda))
+        for celda in afectadas:
+            adyacentes[celda] = 0 if estado[celda] & MINA else self.contar_minas_adyacentes(celda)
+        return len(origenes)
+
+    # Relleno por inundación iterativo: cada celda se marca al encolarla,
+    # así que se visita una sola vez y no hay recursión
+    def _revelar_indices(self, iniciales):
+        """Revela las celdas indicadas expandiendo las que no tienen minas cerca."""
+        estado = self.estado
+        adyacentes = self.adyacentes
+        desplazamientos = self.desplazamientos
+        tipos = self.tipos
+        reveladas = []
+        pila = []
+        seguras = 0
+
+        for indice in iniciales:
+            celda = estado[indice]
+            if celda & (BANDERA | REVELADO):
+                continue
+            estado[indice] = (celda | REVELADO) & ~INTERROGACION
+            reveladas.append(indice)
+            if celda & MINA:
+                self.perdido = True
+                continue
+            seguras += 1
+            if adyacentes[indice] == 0:
+                pila.append(indice)
+
+        # Los vecinos de una celda vacía nunca son minas
+        while pila:
+            indice = pila.pop()
+            for d in desplazamientos[tipos[indice]]:
+                vecino = indice + d
+                celda = estado[vecino]
+                if celda & (BANDERA | REVELADO):
+                    continue
+                estado[vecino] = (celda | REVELADO) & ~INTERROGACION
+                reveladas.append(vecino)
+                seguras += 1
+                if adyacentes[vecino] == 0:
+                    pila.append(vecino)
+        self.ocultas_seguras -= seguras
+        if self.interrogadas:
+            self.interrogadas = {indice for indice in self.interrogadas if not estado[indice] & REVELADO}
+        return reveladas
+
+    # Revela los vecinos de un número cuando ya tiene todas sus banderas
+    def acorde(self, fila, columna):
+        """Revela los vecinos sin bandera de un número ya satisfecho."""
+        indice = self.indice(fila, columna)
+        if not self.estado[indice] & REVELADO or self.estado[indice] & MINA:
+            return []
+        vecinos = self.vecinos(indice)
+        banderas = sum(1 for v in vecinos if self.estado[v] & BANDERA)
+        if banderas != self.adyacentes[indice]:
+            return []
+        previo = self._antes_de_revelar()
+        reveladas = self._revelar_indices(vecinos)
+        self._grabar_revelado("acorde", fila, columna, previo, reveladas)
+        if self.depurar:
+            self.comprobar_contadores()
+        return reveladas
+
+    # Coloca o quita una bandera en una celda
+    def alternar_bandera(self, fila, columna):
+        """Coloca o quita una bandera. Devuelve True si la celda ha cambiado."""
+        indice = self.indice(fila, columna)
+        celda = self.estado[indice]
+        if celda & REVELADO:
+            return False
+        contadores = (self.ocultas_seguras, self.banderas_usadas, self.perdido)
+        if celda & BANDERA:
+            self.estado[indice] = celda & ~BANDERA
+            self.banderas_usadas -= 1
+        elif self.banderas_usadas < self.minas:
+            self.estado[indice] = (celda | BANDERA) & ~INTERROGACION
+            self.interrogadas.discard(indice)
+            self.banderas_usadas += 1
+        else:
+            return False
+        if self.historial is not None:
+            self.historial.grabar(Jugada("alternar_bandera", fila, columna, (), [(indice, celda)], contadores))
+        if self.depurar:
+            self.comprobar_contadores()
+        return True
+
+    # Coloca o quita una interrogación en una celda
+    def alternar_interrogacion(self, fila, columna):
+        """Coloca o quita una interrogación. Devuelve True si la celda ha cambiado."""
+        indice = self.indice(fila, columna)
+        celda = self.estado[indice]
+        if celda & REVELADO:
+            return False
+        if self.historial is not None:
+            self.historial.grabar(Jugada("alternar_interrogacion", fila, columna, (), [(indice, celda)],
+                                         (self.ocultas_seguras, self.banderas_usadas, self.perdido)))
+        if celda & BANDERA:
+            # La interrogación sustituye a la bandera
+            celda &= ~BANDERA
+            self.banderas_usadas -= 1
+        self.estado[indice] = celda ^ INTERROGACION
+        if celda & INTERROGACION:
+            self.interrogadas.discard(indice)
+        else:
+            self.interrogadas.add(indice)
+        if self.depurar:
+            self.comprobar_contadores()
+        return True
+
+    # Un revelado solo borra el bit REVELADO y las interrogaciones, así que
+    # basta con apuntar las pocas celdas con interrogación antes de revelar
+    def _antes_de_revelar(self):
+        """Devuelve (contadores, [(celda, estado)] de las interrogaciones) o None si no se graba."""
+        if self.historial is None:
+            return None
+        estado = self.estado
+        interrogadas = [(indice, estado[indice]) for indice in self.interrogadas]
+        return (self.ocultas_seguras, self.banderas_usadas, self.perdido), interrogadas
+
+    def _grabar_revelado(self, accion, fila, columna, previo, reveladas):
+        """Añade un revelado al historial."""
+        if previo is None or not reveladas:
+            return
+        contadores, interrogadas = previo
+        estado = self.estado
+        anteriores = [(indice, celda) for indice, celda in interrogadas if estado[indice] & REVELADO]
+        self.historial.grabar(Jugada(accion, fila, columna, reveladas, anteriores, contadores))
+
+    # Deshace la última jugada tocando solo sus celdas
+    def deshacer(self):
+        """Deshace la última jugada y devuelve los índices que han cambiado."""
+        jugada = self.historial.deshacer() if self.historial is not None else None
+        if jugada is None:
+            return []
+        estado = self.estado
+        for indice in jugada.reveladas:
+            estado[indice] &= ~REVELADO
+        for indice, celda in jugada.anteriores:
+            # Las minas solo se mueven en el primer clic y ese cambio no se deshace
+            estado[indice] = celda & ~MINA | estado[indice] & MINA
+            if celda & INTERROGACION:
+                self.interrogadas.add(indice)
+            else:
+                self.interrogadas.discard(indice)
+        self.ocultas_seguras, self.banderas_usadas, self.perdido = jugada.contadores
+        if self.depurar:
+            self.comprobar_contadores()
+        return list(jugada.reveladas) + [indice for indice, _ in jugada.anteriores]
+
+    # Vuelve a hacer la última jugada deshecha
+    def rehacer(self):
+        """Rehace la última jugada deshecha y devuelve los índices que han cambiado."""
+        jugada = self.historial.rehacer() if self.historial is not None else None
+        if jugada is None:
+            return []
+        self.historial.rehaciendo = True
+        try:
+            resultado = getattr(self, jugada.accion)(jugada.fila, jugada.columna)
+        finally:
+            self.historial.rehaciendo = False
+        if isinstance(resultado, list):
+            return resultado
+        return [self.indice(jugada.fila, jugada.columna)]
+
+    # Verifica si el jugador ha ganado
+    def victoria(self):
+        """Indica si todas las celdas sin mina están reveladas."""
+        return not self.perdido and self.ocultas_seguras == 0
+
+    # Celdas que cambian de aspecto al destapar el tablero
+    def ocultas(self):
+        """Devuelve los índices de las celdas sin revelar."""
+        return indices_marcados(self.estado, OCULTA)
+
+    # Recuenta todo el tablero: celdas seguras ocultas y banderas
+    def contar(self):
+        """Devuelve (celdas seguras ocultas, banderas) recorriendo el tablero."""
+        return self.estado.translate(SEGURA_OCULTA).count(1), self.estado.translate(SOLO_BANDERA).count(1)
+
+    # Pone los contadores de acuerdo con un estado cargado desde fuera
+    def recalcular_contadores(self):
+        """Recalcula los contadores a partir del estado del tablero."""
+        self.ocultas_seguras, self.banderas_usadas = self.contar()
+        self.perdido = self.estado.translate(MINA_REVELADA).count(1) > 0
+        self.interrogadas = set(indices_marcados(self.estado, SOLO_INTERROGACION))
+
+    # Modo depuración: recuenta todo el tablero y lo compara con los contadores
+    def comprobar_contadores(self):
+        """Lanza AssertionError si los contadores no coinciden con el tablero."""
+        ocultas_seguras, banderas = self.contar()
+        if ocultas_seguras != self.ocultas_seguras:
+            raise AssertionError(f"Celdas seguras ocultas: contador {self.ocultas_seguras}, tablero {ocultas_seguras}")
+        if banderas != self.banderas_usadas:
+            raise AssertionError(f"Banderas: contador {self.banderas_usadas}, tablero {banderas}")
@@ -0,0 +1,158 @@
+# Almacén de récords: todas las partidas terminadas en una base de datos SQLite
+import getpass
+import json
+import os
+import sqlite3
+import time
+
+# Base de datos junto al juego, sin depender del directorio de trabajo
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+ARCHIVO_RECORDS = os.path.join(CARPETA, "records.db")
+
+# Archivos JSON de versiones anteriores que se importan la primera vez
+ARCHIVOS_JSON = [os.path.join(CARPETA, "records.json"), os.path.abspath("records.json")]
+
+# Segundos que se espera a que otra instancia del juego termine de escribir
+ESPERA = 5.0
+
+# Versión del esquema guardada en PRAGMA user_version
+VERSION = 2
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS partidas (
+    id INTEGER PRIMARY KEY,
+    jugador TEXT NOT NULL,
+    dificultad TEXT NOT NULL,
+    milisegundos INTEGER NOT NULL,
+    victoria INTEGER NOT NULL,
+    fecha REAL NOT NULL,
+    semilla INTEGER
+);
+CREATE INDEX IF NOT EXISTS partidas_dificultad_tiempo ON partidas (dificultad, milisegundos) WHERE victoria = 1;
+CREATE INDEX IF NOT EXISTS partidas_jugador_fecha ON partidas (jugador, fecha);
+"""
+
+# Versión 2: 3BV del tablero y 3BV por segundo, que sí se comparan entre tableros distintos
+ESQUEMA_3BV = """
+ALTER TABLE partidas ADD COLUMN tbv INTEGER;
+ALTER TABLE partidas ADD COLUMN tbv_por_segundo REAL;
+CREATE INDEX IF NOT EXISTS partidas_eficiencia ON partidas (tbv_por_segundo) WHERE victoria = 1 AND tbv_por_segundo IS NOT NULL;
+"""
+
+
+# Nombre del jugador por defecto: el usuario del sistema
+def jugador_actual():
+    """Devuelve el nombre del usuario que está jugando."""
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "Jugador"
+
+
+class AlmacenRecords:
+    """Guarda cada partida terminada y consulta las clasificaciones.
+
+    Las escrituras son transacciones cortas en modo WAL, así que varias
+    instancias del juego pueden guardar partidas a la vez sin corromper la
+    base de datos. Las clasificaciones usan un índice parcial sobre
+    (dificultad, milisegundos) de las victorias y no recorren la tabla.
+    """
+
+    def __init__(self, ruta=ARCHIVO_RECORDS, archivos_json=ARCHIVOS_JSON):
+        self.conexion = sqlite3.connect(ruta, timeout=ESPERA, isolation_level=None)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self._migrar(archivos_json)
+
+    # Crea las tablas e importa los récords JSON una sola vez
+    def _migrar(self, archivos_json):
+        """Crea o actualiza el esquema si hace falta e importa los archivos JSON antiguos."""
+        if self.conexion.execute("PRAGMA user_version").fetchone()[0] >= VERSION:
+            return
+        # BEGIN IMMEDIATE bloquea a otras instancias hasta terminar la migración
+        self.conexion.execute("BEGIN IMMEDIATE")
+        try:
+            version = self.conexion.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self._ejecutar(ESQUEMA)
+                self.conexion.executemany(
+                    "INSERT INTO partidas (jugador, dificultad, milisegundos, victoria, fecha) VALUES (?, ?, ?, 1, ?)",
+                    self._leer_json(archivos_json))
+            if version < 2:
+                self._ejecutar(ESQUEMA_3BV)  # Las partidas anteriores se quedan sin 3BV
+            if version < VERSION:
+                self.conexion.execute(f"PRAGMA user_version = {VERSION}")
+            self.conexion.execute("COMMIT")
+        except BaseException:
+            self.conexion.execute("ROLLBACK")
+            raise
+
+    def _ejecutar(self, esquema):
+        """Ejecuta una a una las sentencias de un esquema dentro de la transacción abierta."""
+        for sentencia in esquema.split(";"):
+            if sentencia.strip():
+                self.conexion.execute(sentencia)
+
+    def _leer_json(self, archivos_json):
+        """Devuelve las filas a importar con el mejor tiempo de cada dificultad."""
+        mejores = {}
+        for ruta in dict.fromkeys(archivos_json):
+            try:
+                with open(ruta, "r") as archivo:
+                    records = json.load(archivo)
+                fecha = os.path.getmtime(ruta)
+            except (OSError, ValueError):
+                continue
+            for dificultad, tiempo in records.items():
+                if isinstance(tiempo, (int, float)) and (dificultad not in mejores or tiempo * 1000 < mejores[dificultad][0]):
+                    mejores[dificultad] = (int(tiempo * 1000), fecha)
+        jugador = jugador_actual()
+        return [(jugador, dificultad, milisegundos, fecha) for dificultad, (milisegundos, fecha) in mejores.items()]
+
+    # Guarda una partida terminada
+    def registrar(self, dificultad, milisegundos, victoria, jugador=None, semilla=None, tbv=None):
+        """Añade una partida a la base de datos; tbv es el 3BV del tablero si se conoce."""
+        # En una derrota no se ha despejado el 3BV, así que no hay ritmo que guardar
+        tbv_por_segundo = tbv * 1000 / milisegundos if victoria and tbv is not None and milisegundos > 0 else None
+        self.conexion.execute(
+            "INSERT INTO partidas (jugador, dificultad, milisegundos, victoria, fecha, semilla, tbv, tbv_por_segundo) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (jugador or jugador_actual(), dificultad, milisegundos, int(victoria), time.time(), semilla,
+             tbv, tbv_por_segundo))
+
+    # Mejor tiempo de una dificultad
+    def mejor_tiempo(self, dificultad):
+        """Devuelve los milisegundos de la victoria más rápida o None."""
+        return self.conexion.execute(
+            "SELECT MIN(milisegundos) FROM partidas WHERE dificultad = ? AND victoria = 1", (dificultad,)).fetchone()[0]
+
+    # Mejor 3BV por segundo de todas las dificultades
+    def mejor_eficiencia(self):
+        """Devuelve el mayor 3BV por segundo de una victoria o None."""
+        return self.conexion.execute(
+            "SELECT MAX(tbv_por_segundo) FROM partidas WHERE victoria = 1 AND tbv_por_segundo IS NOT NULL").fetchone()[0]
+
+    # Clasificación de una dificultad
+    def mejores(self, dificultad, limite=10):
+        """Devuelve las limite victorias más rápidas como (jugador, milisegundos, fecha, tbv, tbv_por_segundo)."""
+        return self.conexion.execute(
+            "SELECT jugador, milisegundos, fecha, tbv, tbv_por_segundo FROM partidas WHERE dificultad = ? AND victoria = 1 "
+            "ORDER BY milisegundos LIMIT ?", (dificultad, limite)).fetchall()
+
+    # Clasificación por 3BV por segundo, que compara tableros de cualquier dificultad
+    def mejores_eficiencia(self, limite=10):
+        """Devuelve las limite mejores victorias como (jugador, dificultad, milisegundos, tbv, tbv_por_segundo)."""
+        return self.conexion.execute(
+            "SELECT jugador, dificultad, milisegundos, tbv, tbv_por_segundo FROM partidas "
+            "WHERE victoria = 1 AND tbv_por_segundo IS NOT NULL ORDER BY tbv_por_segundo DESC LIMIT ?", (limite,)).fetchall()
+
+    # Últimas partidas de un jugador
+    def historial(self, jugador=None, limite=20):
+        """Devuelve las últimas partidas como (dificultad, milisegundos, victoria, fecha)."""
+        return self.conexion.execute(
+            "SELECT dificultad, milisegundos, victoria, fecha FROM partidas WHERE jugador = ? "
+            "ORDER BY fecha DESC LIMIT ?", (jugador or jugador_actual(), limite)).fetchall()
+
+    def cerrar(self):
+        """Cierra la conexión con la base de datos."""
+        self.conexion.close()
@@ -0,0 +1,79 @@
+# Reloj de la partida: cuenta con un reloj monótono y solo despierta a Tk
+# cuando cambia el segundo que muestra la etiqueta
+import time
+
+# time.perf_counter es monótono (no le afectan los cambios de hora del sistema)
+# y tiene resolución de microsegundos también en Windows, donde time.monotonic
+# solo avanza cada ~16 ms
+AHORA = time.perf_counter
+
+
+class Reloj:
+    """Tiempo jugado de una partida, con pausa y milisegundos exactos.
+
+    El tiempo se calcula siempre restando instantes del reloj monótono, así
+    que no se acumula error por muchos segundos que pasen. Cada aviso a
+    al_cambiar(segundos) se programa para justo después del siguiente cambio
+    de segundo, y solo hay un aviso programado a la vez: pausar o detener el
+    reloj lo cancela, así que no quedan avisos de partidas anteriores.
+    """
+
+    def __init__(self, root, al_cambiar):
+        self.root = root  # Para programar los avisos con after
+        self.al_cambiar = al_cambiar  # Recibe los segundos enteros jugados
+        self.activo = False  # Hay una partida en marcha, aunque esté en pausa
+        self.inicio = None  # Instante de la última puesta en marcha, None en pausa
+        self.acumulado = 0.0  # Segundos jugados antes de la última puesta en marcha
+        self.programado = None  # Aviso pendiente de after
+
+    # Empieza a contar una partida, o la sigue desde los milisegundos guardados
+    def iniciar(self, milisegundos=0):
+        """Pone el reloj en marcha desde milisegundos."""
+        self.detener()
+        self.activo = True
+        self.acumulado = milisegundos / 1000
+        self.inicio = AHORA()
+        self._avisar()
+
+    def pausar(self):
+        """Para el reloj sin terminar la partida."""
+        if self.inicio is not None:
+            self.acumulado += AHORA() - self.inicio
+            self.inicio = None
+        self._cancelar()
+
+    def reanudar(self):
+        """Sigue contando después de una pausa."""
+        if self.activo and self.inicio is None:
+            self.inicio = AHORA()
+            self._avisar()
+
+    # Termina la partida y devuelve su duración
+    def detener(self):
+        """Para el reloj, cancela el aviso pendiente y devuelve los milisegundos jugados."""
+        milisegundos = self.milisegundos()
+        self.pausar()
+        self.activo = False
+        return milisegundos
+
+    def milisegundos(self):
+        """Devuelve los milisegundos jugados hasta ahora."""
+        segundos = self.acumulado
+        if self.inicio is not None:
+            segundos += AHORA() - self.inicio
+        return int(segundos * 1000)
+
+    # Avisa con los segundos actuales y programa el aviso del siguiente segundo
+    def _avisar(self):
+        """Llama a al_cambiar y vuelve a programarse para el próximo cambio de segundo."""
+        self.programado = None
+        milisegundos = self.milisegundos()
+        self.al_cambiar(milisegundos // 1000)
+        # after nunca se adelanta, así que el aviso llega ya en el segundo nuevo
+        self.programado = self.root.after(1000 - milisegundos % 1000, self._avisar)
+
+    def _cancelar(self):
+        """Cancela el aviso pendiente, si lo hay."""
+        if self.programado is not None:
+            self.root.after_cancel(self.programado)
+            self.programado = None
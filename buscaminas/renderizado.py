@@ -0,0 +1,425 @@
+# Renderizadores del tablero: una rejilla de botones, un único Canvas o un
+# Canvas virtualizado que solo dibuja las celdas visibles
+import tkinter as tk
+from array import array
+
+from instrumentacion import medido
+
+# Paleta de colores para el fondo de los números
+COLORES_FONDO = {
+    1: "#e7f3fe",  # Azul claro
+    2: "#c8e6c9",  # Verde claro
+    3: "#ffcdd2",  # Rojo claro
+    4: "#e1bee7",  # Púrpura claro
+    5: "#ffe0b2",  # Naranja claro
+    6: "#b2ebf2",  # Cian claro
+    7: "#d7ccc8",  # Gris claro
+    8: "#f5f5f5"   # Blanco grisáceo
+}
+
+# Tamaño en píxeles de una celda dibujada en el Canvas
+TAMANO_CELDA = 30
+
+# Número de celdas a partir del cual se usa el Canvas virtualizado en modo "auto"
+LIMITE_BOTONES = 400
+
+# Celdas extra que se dibujan alrededor de la zona visible
+MARGEN_VISIBLE = 2
+
+# Límites del zoom del Canvas virtualizado, en píxeles por celda
+ZOOM_MINIMO = 12
+ZOOM_MAXIMO = 60
+
+# Máximo de celdas que se pintan en una pasada del planificador
+LOTE_MAXIMO = 5000
+
+# Códigos de aspecto de una celda; una celda revelada sin mina usa NUMERO + adyacentes
+OCULTA = 0
+CON_BANDERA = 1
+CON_INTERROGACION = 2
+MINA_VISIBLE = 3
+NUMERO = 4
+
+
+# Calcula el código de aspecto de una celda a partir de su estado en el motor
+def codigo_celda(tablero, indice, destapar=False):
+    """Devuelve el código de aspecto (OCULTA, CON_BANDERA, ..., NUMERO + n) de una celda."""
+    if destapar or tablero.esta_revelada(indice):
+        if tablero.es_mina(indice):
+            return MINA_VISIBLE
+        return NUMERO + tablero.adyacentes[indice]
+    if tablero.tiene_bandera(indice):
+        return CON_BANDERA
+    if tablero.tiene_interrogacion(indice):
+        return CON_INTERROGACION
+    return OCULTA
+
+
+# Aspecto (texto, color de fondo, color del texto, hundida) de cada código
+ASPECTOS = [
+    ("", "#e0e0e0", "black", False),
+    ("🚩", "#f1c40f", "black", False),
+    ("❔", "#d3d3d3", "black", False),
+    ("💣", "#e74c3c", "black", True),
+] + [
+    (str(adyacentes) if adyacentes > 0 else "",
+     COLORES_FONDO.get(adyacentes, "#b0b0b0"),  # Color del fondo
+     COLORES_FONDO.get(adyacentes, "black"),  # Color del texto
+     True)
+    for adyacentes in range(9)
+]
+
+
+# Calcula cómo se ve una celda a partir de su estado en el motor
+def aspecto_celda(tablero, indice, destapar=False):
+    """Devuelve (texto, color de fondo, color del texto, hundida) de una celda."""
+    return ASPECTOS[codigo_celda(tablero, indice, destapar)]
+
+
+# Elige el renderizador según la configuración y el tamaño del tablero
+def crear_renderizador(tipo, padre, filas, columnas, al_clic_izquierdo, al_clic_derecho, aspecto):
+    """Crea un renderizador "botones", "canvas", "virtual" o "auto".
+
+    aspecto(indice) devuelve el aspecto actual de una celda; el renderizador
+    virtual lo usa para pintar las celdas que entran en la zona visible.
+    """
+    if tipo == "auto":
+        tipo = "botones" if filas * columnas <= LIMITE_BOTONES else "virtual"
+    if tipo == "virtual":
+        return RenderizadorVirtual(padre, filas, columnas, al_clic_izquierdo, al_clic_derecho, aspecto)
+    clase = RenderizadorBotones if tipo == "botones" else RenderizadorCanvas
+    return clase(padre, filas, columnas, al_clic_izquierdo, al_clic_derecho)
+
+
+class RenderizadorBotones:
+    """Dibuja cada celda como un tk.Button, como el tablero original."""
+
+    def __init__(self, padre, filas, columnas, al_clic_izquierdo, al_clic_derecho):
+        self.columnas = columnas
+        self.botones = []
+        for fila in range(filas):
+            for columna in range(columnas):
+                boton = tk.Button(padre, width=2, height=1,
+                                  bg="#e0e0e0", relief="raised", bd=2, font=("Arial", 10, "bold"))
+                boton.grid(row=fila, column=columna)
+                boton.bind("<Button-1>", lambda event, f=fila, c=columna: al_clic_izquierdo(f, c))  # Clic izquierdo
+                boton.bind("<Button-3>", lambda event, f=fila, c=columna: al_clic_derecho(f, c))  # Clic derecho
+                self.botones.append(boton)
+
+    # Aplica el aspecto de una celda a su botón
+    def pintar(self, indice, texto, fondo, color_texto, hundida):
+        """Actualiza el botón de una celda."""
+        if hundida:
+            self.botones[indice].config(text=texto, bg=fondo, fg=color_texto, relief="sunken", state="disabled")
+        else:
+            self.botones[indice].config(text=texto, bg=fondo, fg=color_texto, relief="raised", state="normal")
+
+    # Cambia el fondo de una celda para señalarla
+    def resaltar(self, indice, color):
+        """Resalta una celda con un color de fondo."""
+        self.botones[indice].config(bg=color)
+
+
+class RenderizadorCanvas:
+    """Dibuja todo el tablero en un único tk.Canvas.
+
+    Cada celda es un rectángulo y un texto del Canvas; los clics se traducen
+    a celdas dividiendo las coordenadas entre el tamaño de la celda, y pintar
+    una celda solo reconfigura sus dos elementos.
+    """
+
+    def __init__(self, padre, filas, columnas, al_clic_izquierdo, al_clic_derecho):
+        self.filas = filas
+        self.columnas = columnas
+        self.al_clic_izquierdo = al_clic_izquierdo
+        self.al_clic_derecho = al_clic_derecho
+        self.canvas = tk.Canvas(padre, width=columnas * TAMANO_CELDA, height=filas * TAMANO_CELDA,
+                                bg="#2c3e50", highlightthickness=0)
+        self.canvas.grid(row=0, column=0)
+
+        # Identificadores de los elementos de cada celda, por índice plano
+        self.rectangulos = array("L")
+        self.textos = array("L")
+        fuente = ("Arial", 10, "bold")
+        for fila in range(filas):
+            y = fila * TAMANO_CELDA
+            for columna in range(columnas):
+                x = columna * TAMANO_CELDA
+                self.rectangulos.append(self.canvas.create_rectangle(
+                    x + 1, y + 1, x + TAMANO_CELDA - 1, y + TAMANO_CELDA - 1,
+                    fill="#e0e0e0", outline="#7f8c8d", width=2))
+                self.textos.append(self.canvas.create_text(
+                    x + TAMANO_CELDA // 2, y + TAMANO_CELDA // 2, text="", font=fuente))
+
+        self.canvas.bind("<Button-1>", self._clic_izquierdo)
+        self.canvas.bind("<Button-3>", self._clic_derecho)
+
+    # Traduce las coordenadas de un evento a la celda pulsada
+    def _celda_en(self, evento):
+        """Devuelve (fila, columna) bajo el ratón o None si está fuera del tablero."""
+        fila = int(self.canvas.canvasy(evento.y)) // TAMANO_CELDA
+        columna = int(self.canvas.canvasx(evento.x)) // TAMANO_CELDA
+        if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+            return fila, columna
+        return None
+
+    def _clic_izquierdo(self, evento):
+        celda = self._celda_en(evento)
+        if celda:
+            self.al_clic_izquierdo(*celda)
+
+    def _clic_derecho(self, evento):
+        celda = self._celda_en(evento)
+        if celda:
+            self.al_clic_derecho(*celda)
+
+    # Aplica el aspecto de una celda a sus elementos del Canvas
+    def pintar(self, indice, texto, fondo, color_texto, hundida):
+        """Reconfigura el rectángulo y el texto de una celda."""
+        borde = "#95a5a6" if hundida else "#7f8c8d"
+        # Los botones desactivados muestran el texto en gris; el Canvas imita ese aspecto
+        color = "#6d6d6d" if hundida else color_texto
+        self.canvas.itemconfigure(self.rectangulos[indice], fill=fondo, outline=borde, width=1 if hundida else 2)
+        self.canvas.itemconfigure(self.textos[indice], text=texto, fill=color)
+
+    # Cambia el fondo de una celda para señalarla
+    def resaltar(self, indice, color):
+        """Resalta una celda con un color de fondo."""
+        self.canvas.itemconfigure(self.rectangulos[indice], fill=color)
+
+
+class RenderizadorVirtual:
+    """Canvas desplazable y con zoom que solo tiene elementos para las celdas visibles.
+
+    Los pares rectángulo/texto de las celdas que salen de la vista se ocultan
+    y se reutilizan para las que entran, así que redibujar cuesta lo mismo
+    sea cual sea el tamaño del tablero. El estado de las celdas se consulta
+    con aspecto(indice) cuando una celda entra en la vista.
+    """
+
+    def __init__(self, padre, filas, columnas, al_clic_izquierdo, al_clic_derecho, aspecto):
+        self.filas = filas
+        self.columnas = columnas
+        self.al_clic_izquierdo = al_clic_izquierdo
+        self.al_clic_derecho = al_clic_derecho
+        self.aspecto = aspecto
+        self.tamano = TAMANO_CELDA  # Píxeles por celda con el zoom actual
+        self.visibles = {}  # Índice de celda -> (rectángulo, texto)
+        self.libres = []  # Pares de elementos ocultos listos para reutilizar
+
+        # El marco ocupa todo el espacio libre de la ventana
+        padre.pack_configure(fill="both", expand=True)
+        padre.grid_rowconfigure(0, weight=1)
+        padre.grid_columnconfigure(0, weight=1)
+
+        self.canvas = tk.Canvas(padre, bg="#2c3e50", highlightthickness=0)
+        barra_vertical = tk.Scrollbar(padre, orient="vertical", command=self._desplazar_vertical)
+        barra_horizontal = tk.Scrollbar(padre, orient="horizontal", command=self._desplazar_horizontal)
+        self.canvas.configure(yscrollcommand=barra_vertical.set, xscrollcommand=barra_horizontal.set)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        barra_vertical.grid(row=0, column=1, sticky="ns")
+        barra_horizontal.grid(row=1, column=0, sticky="ew")
+        self._actualizar_region()
+
+        self.canvas.bind("<Configure>", lambda evento: self.redibujar())
+        self.canvas.bind("<Button-1>", self._clic_izquierdo)
+        self.canvas.bind("<Button-3>", self._clic_derecho)
+        self.canvas.bind("<MouseWheel>", self._rueda)  # Windows y macOS
+        self.canvas.bind("<Shift-MouseWheel>", self._rueda)
+        self.canvas.bind("<Control-MouseWheel>", self._rueda)
+        self.canvas.bind("<Button-4>", self._rueda)  # Linux: rueda hacia arriba
+        self.canvas.bind("<Button-5>", self._rueda)  # Linux: rueda hacia abajo
+
+    # Ajusta la zona desplazable y el paso de desplazamiento al zoom actual
+    def _actualizar_region(self):
+        """Actualiza la región desplazable del Canvas."""
+        self.fuente = ("Arial", max(6, self.tamano // 3), "bold")
+        self.canvas.configure(scrollregion=(0, 0, self.columnas * self.tamano, self.filas * self.tamano),
+                              xscrollincrement=self.tamano, yscrollincrement=self.tamano)
+
+    def _desplazar_vertical(self, *args):
+        self.canvas.yview(*args)
+        self.redibujar()
+
+    def _desplazar_horizontal(self, *args):
+        self.canvas.xview(*args)
+        self.redibujar()
+
+    # Rueda: desplaza en vertical, en horizontal con Mayúsculas y hace zoom con Control
+    def _rueda(self, evento):
+        """Desplaza o cambia el zoom según la rueda del ratón."""
+        pasos = -1 if evento.num == 4 or getattr(evento, "delta", 0) > 0 else 1
+        if evento.state & 0x0004:  # Control
+            self.cambiar_zoom(-pasos * 4)
+        elif evento.state & 0x0001:  # Mayúsculas
+            self.canvas.xview_scroll(pasos * 3, "units")
+        else:
+            self.canvas.yview_scroll(pasos * 3, "units")
+        self.redibujar()
+
+    # Cambia el tamaño de las celdas manteniendo la zona que se está viendo
+    def cambiar_zoom(self, incremento):
+        """Cambia los píxeles por celda dentro de los límites del zoom."""
+        tamano = min(ZOOM_MAXIMO, max(ZOOM_MINIMO, self.tamano + incremento))
+        if tamano == self.tamano:
+            return
+        izquierda, arriba = self.canvas.xview()[0], self.canvas.yview()[0]
+        self.tamano = tamano
+        self._actualizar_region()
+        # Con otro tamaño todas las posiciones cambian: se reciclan todos los elementos
+        for elementos in self.visibles.values():
+            self.canvas.itemconfigure(elementos[0], state="hidden")
+            self.canvas.itemconfigure(elementos[1], state="hidden")
+            self.libres.append(elementos)
+        self.visibles.clear()
+        self.canvas.xview_moveto(izquierda)
+        self.canvas.yview_moveto(arriba)
+
+    # Calcula el rango de filas y columnas visibles más el margen
+    def _ventana_visible(self):
+        """Devuelve (fila inicial, fila final, columna inicial, columna final)."""
+        x = int(self.canvas.canvasx(0))
+        y = int(self.canvas.canvasy(0))
+        ancho = self.canvas.winfo_width()
+        alto = self.canvas.winfo_height()
+        fila_inicial = max(0, y // self.tamano - MARGEN_VISIBLE)
+        fila_final = min(self.filas, (y + alto) // self.tamano + 1 + MARGEN_VISIBLE)
+        columna_inicial = max(0, x // self.tamano - MARGEN_VISIBLE)
+        columna_final = min(self.columnas, (x + ancho) // self.tamano + 1 + MARGEN_VISIBLE)
+        return fila_inicial, fila_final, columna_inicial, columna_final
+
+    # Recicla los elementos que han salido de la vista y dibuja los que han entrado
+    def redibujar(self):
+        """Dibuja las celdas de la zona visible reutilizando elementos."""
+        fila_inicial, fila_final, columna_inicial, columna_final = self._ventana_visible()
+        columnas = self.columnas
+
+        for indice in list(self.visibles):
+            fila, columna = divmod(indice, columnas)
+            if not (fila_inicial <= fila < fila_final and columna_inicial <= columna < columna_final):
+                self.libres.append(self.visibles.pop(indice))
+
+        tamano = self.tamano
+        for fila in range(fila_inicial, fila_final):
+            y = fila * tamano
+            for columna in range(columna_inicial, columna_final):
+                indice = fila * columnas + columna
+                if indice in self.visibles:
+                    continue
+                x = columna * tamano
+                if self.libres:
+                    rectangulo, texto = self.libres.pop()
+                    self.canvas.coords(rectangulo, x + 1, y + 1, x + tamano - 1, y + tamano - 1)
+                    self.canvas.coords(texto, x + tamano // 2, y + tamano // 2)
+                    self.canvas.itemconfigure(rectangulo, state="normal")
+                    self.canvas.itemconfigure(texto, state="normal", font=self.fuente)
+                else:
+                    rectangulo = self.canvas.create_rectangle(x + 1, y + 1, x + tamano - 1, y + tamano - 1)
+                    texto = self.canvas.create_text(x + tamano // 2, y + tamano // 2, font=self.fuente)
+                self.visibles[indice] = (rectangulo, texto)
+                self.pintar(indice, *self.aspecto(indice))
+
+        # Los elementos que no se han reutilizado se ocultan
+        for rectangulo, texto in self.libres:
+            self.canvas.itemconfigure(rectangulo, state="hidden")
+            self.canvas.itemconfigure(texto, state="hidden")
+
+    # Traduce las coordenadas de un evento a la celda pulsada
+    def _celda_en(self, evento):
+        """Devuelve (fila, columna) bajo el ratón o None si está fuera del tablero."""
+        fila = int(self.canvas.canvasy(evento.y)) // self.tamano
+        columna = int(self.canvas.canvasx(evento.x)) // self.tamano
+        if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+            return fila, columna
+        return None
+
+    def _clic_izquierdo(self, evento):
+        celda = self._celda_en(evento)
+        if celda:
+            self.al_clic_izquierdo(*celda)
+
+    def _clic_derecho(self, evento):
+        celda = self._celda_en(evento)
+        if celda:
+            self.al_clic_derecho(*celda)
+
+    # Solo las celdas visibles tienen elementos; el resto se pintará al entrar en la vista
+    def pintar(self, indice, texto, fondo, color_texto, hundida):
+        """Reconfigura la celda si está visible."""
+        elementos = self.visibles.get(indice)
+        if elementos is None:
+            return
+        borde = "#95a5a6" if hundida else "#7f8c8d"
+        color = "#6d6d6d" if hundida else color_texto
+        self.canvas.itemconfigure(elementos[0], fill=fondo, outline=borde, width=1 if hundida else 2)
+        self.canvas.itemconfigure(elementos[1], text=texto, fill=color)
+
+    # Centra la vista en una celda y cambia su fondo para señalarla
+    def resaltar(self, indice, color):
+        """Lleva una celda a la vista y la resalta con un color de fondo."""
+        fila, columna = divmod(indice, self.columnas)
+        ancho = self.canvas.winfo_width() / (self.columnas * self.tamano)
+        alto = self.canvas.winfo_height() / (self.filas * self.tamano)
+        self.canvas.xview_moveto(max(0.0, (columna + 0.5) / self.columnas - ancho / 2))
+        self.canvas.yview_moveto(max(0.0, (fila + 0.5) / self.filas - alto / 2))
+        self.redibujar()
+        if indice in self.visibles:
+            self.canvas.itemconfigure(self.visibles[indice][0], fill=color)
+
+
+class PlanificadorRender:
+    """Agrupa las celdas cambiadas y las pinta juntas cuando Tk queda libre.
+
+    Los manejadores de clic solo marcan celdas como sucias; la pintura se hace
+    en una pasada de after_idle por vuelta del bucle de eventos, como mucho
+    LOTE_MAXIMO celdas cada vez para que la entrada siga respondiendo. Se
+    guarda el código pintado en cada celda para no repetir actualizaciones
+    que no cambian nada.
+    """
+
+    def __init__(self, root, renderizador, codigo, total):
+        self.root = root
+        self.renderizador = renderizador
+        self.codigo = codigo  # codigo(indice) -> código de aspecto actual
+        self.pintados = bytearray(total)  # Código pintado en cada celda (todas empiezan ocultas)
+        self.sucias = set()  # Celdas pendientes de pintar
+        self.programado = None  # Identificador del after_idle pendiente
+
+    # Marca celdas para pintarlas en la próxima pasada
+    def marcar(self, indices):
+        """Añade celdas al conjunto de celdas sucias."""
+        self.sucias.update(indices)
+        if self.sucias and self.programado is None:
+            self.programado = self.root.after_idle(self.volcar)
+
+    # Pinta las celdas sucias cuyo aspecto ha cambiado
+    @medido
+    def volcar(self, todo=False):
+        """Pinta un lote de celdas sucias (o todas con todo=True)."""
+        self.programado = None
+        sucias = self.sucias
+        pintados = self.pintados
+        pendientes = len(sucias) if todo else min(len(sucias), LOTE_MAXIMO)
+        for _ in range(pendientes):
+            indice = sucias.pop()
+            codigo = self.codigo(indice)
+            if pintados[indice] == codigo:
+                continue
+            pintados[indice] = codigo
+            self.renderizador.pintar(indice, *ASPECTOS[codigo])
+        if sucias:
+            self.programado = self.root.after_idle(self.volcar)
+
+    # Fuerza a pintar de nuevo una celda aunque su código no haya cambiado
+    def repintar(self, indice):
+        """Marca una celda para repintarla con su aspecto actual."""
+        self.pintados[indice] = 255
+        self.marcar([indice])
+
+    # Descarta lo pendiente al cerrar el tablero
+    def cancelar(self):
+        """Cancela la pasada programada y vacía las celdas sucias."""
+        if self.programado is not None:
+            self.root.after_cancel(self.programado)
+            self.programado = None
+        self.sucias.clear()
\ No newline at end of file
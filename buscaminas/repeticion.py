@@ -0,0 +1,239 @@
+# Grabación y reproducción de partidas en un formato binario compacto
+import argparse
+import os
+import tempfile
+import time
+import zlib
+
+from generador import zona_inicial
+from historial import Historial
+from motor import SIN_PROTECCION, MotorBuscaminas
+
+# Cabecera de los archivos de repetición; BMR2 añade la protección del primer clic
+# y BMR3 guarda la acción en 3 bits para deshacer y rehacer
+MAGIA = b"BMR3"
+MAGIA_V2 = b"BMR2"
+MAGIA_V1 = b"BMR1"
+
+# Acciones que se graban
+REVELAR = 0
+BANDERA = 1
+INTERROGACION = 2
+ACORDE = 3
+DESHACER = 4
+REHACER = 5
+
+
+# Codifica un entero no negativo como varint (7 bits por byte)
+def escribir_varint(salida, valor):
+    """Añade un varint a un bytearray."""
+    while valor >= 0x80:
+        salida.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    salida.append(valor)
+
+
+# Lee un varint y devuelve (valor, siguiente posición)
+def leer_varint(datos, posicion):
+    """Lee un varint de datos a partir de posicion."""
+    valor = 0
+    desplazamiento = 0
+    while True:
+        byte = datos[posicion]
+        posicion += 1
+        valor |= (byte & 0x7F) << desplazamiento
+        if byte < 0x80:
+            return valor, posicion
+        desplazamiento += 7
+
+
+class Repeticion:
+    """Partida grabada: configuración del tablero y lista de jugadas.
+
+    Cada jugada es (celda, acción, milisegundos desde la jugada anterior).
+    En el archivo la celda se guarda como diferencia con la celda anterior
+    (en zigzag, para que las jugadas cercanas ocupen un solo byte) junto con
+    la acción en un varint (diferencia * 8 + acción), seguida de otro varint
+    con los milisegundos, y todo el flujo de jugadas se comprime con zlib.
+    """
+
+    def __init__(self, dificultad, filas, columnas, minas, semilla, sin_adivinar=False, proteccion=SIN_PROTECCION):
+        self.dificultad = dificultad
+        self.filas = filas
+        self.columnas = columnas
+        self.minas = minas
+        self.semilla = semilla
+        self.sin_adivinar = sin_adivinar  # Tablero con la zona inicial sin minas
+        self.proteccion = proteccion  # Protección del primer clic del motor
+        self.jugadas = []  # Lista de (celda, acción, milisegundos)
+        self._ultima = None  # Instante de la última jugada grabada
+
+    # Empieza a contar el tiempo de la partida
+    def empezar(self):
+        """Marca el instante de inicio de la partida."""
+        self._ultima = time.monotonic()
+
+    # Añade una jugada con el tiempo transcurrido desde la anterior
+    def grabar(self, indice, accion):
+        """Graba una jugada."""
+        ahora = time.monotonic()
+        if self._ultima is None:
+            self._ultima = ahora
+        self.jugadas.append((indice, accion, round((ahora - self._ultima) * 1000)))
+        self._ultima = ahora
+
+    # Duración total de la partida grabada
+    def milisegundos(self):
+        """Devuelve los milisegundos desde el inicio hasta la última jugada."""
+        return sum(jugada[2] for jugada in self.jugadas)
+
+    # Reconstruye el tablero exacto de la partida
+    def crear_tablero(self):
+        """Devuelve un motor con las mismas minas que la partida grabada."""
+        tablero = MotorBuscaminas(self.filas, self.columnas, self.minas, proteccion=self.proteccion)
+        excluidas = zona_inicial(self.filas, self.columnas)[1] if self.sin_adivinar else ()
+        tablero.colocar_minas(self.semilla, excluidas)
+        tablero.calcular_adyacencias()
+        if any(accion == DESHACER for _, accion, _ in self.jugadas):
+            tablero.historial = Historial()
+        return tablero
+
+    # Serializa la repetición
+    def a_bytes(self):
+        """Devuelve la repetición en formato binario."""
+        cabecera = bytearray(MAGIA)
+        nombre = self.dificultad.encode("utf-8")
+        escribir_varint(cabecera, len(nombre))
+        cabecera += nombre
+        for valor in (self.filas, self.columnas, self.minas, self.semilla, int(self.sin_adivinar), self.proteccion):
+            escribir_varint(cabecera, valor)
+
+        jugadas = bytearray()
+        anterior = 0
+        for indice, accion, milisegundos in self.jugadas:
+            diferencia = indice - anterior
+            zigzag = diferencia * 2 if diferencia >= 0 else -diferencia * 2 - 1
+            escribir_varint(jugadas, zigzag * 8 + accion)
+            escribir_varint(jugadas, milisegundos)
+            anterior = indice
+        return bytes(cabecera) + zlib.compress(bytes(jugadas), 9)
+
+    @classmethod
+    def desde_bytes(cls, datos):
+        """Lee una repetición en formato binario.
+
+        Lanza ValueError si los datos no son una repetición o están dañados.
+        """
+        try:
+            return cls._desde_bytes(datos)
+        except (IndexError, zlib.error, UnicodeDecodeError) as error:
+            raise ValueError(f"Repetición dañada: {error}") from error
+
+    @classmethod
+    def _desde_bytes(cls, datos):
+        magia = datos[:len(MAGIA)]
+        if magia not in (MAGIA, MAGIA_V2, MAGIA_V1):
+            raise ValueError("No es un archivo de repetición del Buscaminas")
+        posicion = len(MAGIA)
+        longitud, posicion = leer_varint(datos, posicion)
+        dificultad = datos[posicion:posicion + longitud].decode("utf-8")
+        posicion += longitud
+        valores = []
+        # Las repeticiones BMR1 no tienen protección del primer clic
+        for _ in range(5 if magia == MAGIA_V1 else 6):
+            valor, posicion = leer_varint(datos, posicion)
+            valores.append(valor)
+        repeticion = cls(dificultad, *valores[:4], sin_adivinar=bool(valores[4]),
+                         proteccion=SIN_PROTECCION if magia == MAGIA_V1 else valores[5])
+        bits_accion = 3 if magia == MAGIA else 2
+        total = repeticion.filas * repeticion.columnas
+
+        jugadas = zlib.decompress(datos[posicion:])
+        posicion = 0
+        indice = 0
+        while posicion < len(jugadas):
+            combinado, posicion = leer_varint(jugadas, posicion)
+            milisegundos, posicion = leer_varint(jugadas, posicion)
+            zigzag = combinado >> bits_accion
+            indice += zigzag // 2 if zigzag % 2 == 0 else -(zigzag + 1) // 2
+            accion = combinado & ((1 << bits_accion) - 1)
+            # Se comprueba aquí para que un archivo dañado no falle a mitad de la reproducción
+            if not 0 <= indice < total:
+                raise ValueError(f"Repetición dañada: celda {indice} fuera del tablero")
+            if accion > REHACER:
+                raise ValueError(f"Repetición dañada: acción {accion} desconocida")
+            repeticion.jugadas.append((indice, accion, milisegundos))
+        return repeticion
+
+    def guardar(self, ruta):
+        """Guarda la repetición en un archivo de forma atómica."""
+        # Como guardado.guardar_partida: un cierre a medias no deja un archivo cortado
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(self.a_bytes())
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, ruta)
+        except BaseException:
+            os.remove(temporal)
+            raise
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Carga una repetición desde un archivo."""
+        with open(ruta, "rb") as archivo:
+            return cls.desde_bytes(archivo.read())
+
+
+# Aplica una jugada grabada a un motor
+def aplicar_jugada(tablero, indice, accion):
+    """Aplica una jugada y devuelve las celdas reveladas."""
+    fila, columna = tablero.posicion(indice)
+    if accion == REVELAR:
+        return tablero.revelar(fila, columna)
+    if accion == ACORDE:
+        return tablero.acorde(fila, columna)
+    if accion == DESHACER:
+        return tablero.deshacer()
+    if accion == REHACER:
+        return tablero.rehacer()
+    if accion == BANDERA:
+        tablero.alternar_bandera(fila, columna)
+    else:
+        tablero.alternar_interrogacion(fila, columna)
+    return []
+
+
+# Reproduce la partida sin ventana a la máxima velocidad
+def verificar(repeticion):
+    """Devuelve (victoria, milisegundos) tras reproducir todas las jugadas."""
+    tablero = repeticion.crear_tablero()
+    for indice, accion, _ in repeticion.jugadas:
+        # En el modo práctica una mina se puede deshacer
+        if tablero.victoria() or tablero.perdido and accion != DESHACER:
+            break
+        aplicar_jugada(tablero, indice, accion)
+    return tablero.victoria(), repeticion.milisegundos()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica una repetición del Buscaminas")
+    parser.add_argument("archivo", help="Archivo .bmr")
+    args = parser.parse_args()
+
+    try:
+        repeticion = Repeticion.cargar(args.archivo)
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"No se pudo abrir la repetición: {error}\n")
+    inicio = time.perf_counter()
+    victoria, milisegundos = verificar(repeticion)
+    duracion = time.perf_counter() - inicio
+    print(f"{repeticion.dificultad} ({repeticion.filas}x{repeticion.columnas}, {repeticion.minas} minas): "
+          f"{len(repeticion.jugadas)} jugadas, {'victoria' if victoria else 'derrota'} en {milisegundos / 1000:.3f} s")
+    print(f"Verificada en {duracion * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
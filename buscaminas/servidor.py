@@ -0,0 +1,262 @@
+# Servidor de partidas sin ventana: muchas partidas a la vez sobre el motor,
+# con un protocolo de texto de una línea por petición
+#
+# Peticiones (campos separados por espacios):
+#   N filas columnas minas [semilla]   nueva partida      -> S sesion
+#   R sesion fila columna              revelar            -> D ...
+#   A sesion fila columna              acorde             -> D ...
+#   B sesion fila columna              bandera            -> D ...
+#   X sesion                           cerrar la partida  -> X
+# Cada D lleva solo las celdas que han cambiado:
+#   D estado n indice:valor ...
+# donde estado es J (jugando), P (perdida) o G (ganada) y valor es el número
+# de minas vecinas, * si es una mina, F si tiene bandera o . si vuelve a estar
+# oculta. Al perder o ganar la sesión se cierra. Los errores son "E codigo",
+# con un código fijo:
+#   peticion    orden desconocida o vacía
+#   argumentos  faltan campos o no son números
+#   tablero     tamaño o número de minas imposible, o tablero demasiado grande
+#   sesion      sesión desconocida o ya cerrada
+#   celda       celda fuera del tablero
+#   lleno       demasiadas sesiones o celdas en el servidor
+#   linea       línea demasiado larga (el servidor cierra la conexión)
+import argparse
+import asyncio
+import time
+from collections import OrderedDict
+
+from bitboard import MOTORES
+from motor import PROTEGER_CELDA
+
+# Solo se escucha en la interfaz local
+HOST = "127.0.0.1"
+PUERTO = 8765
+
+# Segundos sin jugadas tras los que se descarta una sesión
+ESPERA = 300.0
+
+# Límites para que una petición no bloquee el bucle ni agote la memoria. Un
+# relleno recorre unas 1M celdas por segundo y bloquea todas las sesiones
+# mientras dura, así que un tablero no pasa del tamaño del Enorme (90000
+# celdas, menos de 0.1 s); entre todas las sesiones caben unas 20M celdas,
+# unos 60 MB con el motor de bytes
+MAXIMO_SESIONES = 100000
+MAXIMO_CELDAS = 100000
+MAXIMO_CELDAS_TOTALES = 20000000
+
+# Segundos que se sigue leyendo (y descartando) tras rechazar una línea demasiado larga
+ESPERA_CIERRE = 1.0
+
+
+class ErrorPeticion(Exception):
+    """Petición rechazada; codigo es la palabra fija que recibe el cliente."""
+
+    def __init__(self, codigo):
+        super().__init__(codigo)
+        self.codigo = codigo
+
+
+class Sesion:
+    """Partida de un cliente: el tablero y la hora de su última jugada."""
+
+    __slots__ = ("tablero", "ultimo_uso")
+
+    def __init__(self, tablero):
+        self.tablero = tablero
+        self.ultimo_uso = time.monotonic()
+
+
+class ServidorBuscaminas:
+    """Aloja las partidas y responde a las peticiones de los clientes.
+
+    Las sesiones se guardan en un OrderedDict en orden de último uso: cada
+    jugada mueve su sesión al final, así que las inactivas están siempre al
+    principio y descartarlas no recorre las demás.
+    """
+
+    def __init__(self, motor="bytes", espera=ESPERA, maximo_sesiones=MAXIMO_SESIONES):
+        self.motor = MOTORES[motor]
+        self.espera = espera
+        self.maximo_sesiones = maximo_sesiones
+        self.sesiones = OrderedDict()
+        self.celdas = 0  # Celdas de todos los tableros abiertos
+        self.siguiente = 1  # Número de la próxima sesión
+        self.peticiones = 0
+        self.descartadas = 0
+
+    # Atiende una conexión: lee líneas y escribe una respuesta por cada una
+    async def atender(self, lector, escritor):
+        """Responde a las peticiones de un cliente hasta que cierra la conexión."""
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except ValueError:
+                    # readline convierte LimitOverrunError en ValueError cuando
+                    # una línea supera el límite del StreamReader (64 KiB); el
+                    # resto de la línea aún no ha llegado, así que se cierra
+                    escritor.write(b"E linea\n")
+                    escritor.write_eof()
+                    await self.descartar_entrada(lector)
+                    break
+                if not linea:
+                    break
+                escritor.write(self.responder(linea))
+                # Solo espera si el cliente no lee y el búfer de salida se llena
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    # Cerrar con datos sin leer manda un RST y el cliente podría perder la
+    # respuesta de error, así que antes se lee lo que quede durante un momento
+    async def descartar_entrada(self, lector):
+        """Lee y tira la entrada hasta que el cliente cierra o pasa ESPERA_CIERRE."""
+        try:
+            await asyncio.wait_for(self._leer_hasta_el_final(lector), ESPERA_CIERRE)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _leer_hasta_el_final(self, lector):
+        """Lee bloques hasta el final de la conexión."""
+        while await lector.read(65536):
+            pass
+
+    # Interpreta una línea y devuelve la respuesta ya codificada
+    def responder(self, linea):
+        """Devuelve los bytes de la respuesta a una petición."""
+        self.peticiones += 1
+        campos = linea.split()
+        try:
+            orden = campos[0] if campos else None
+            if orden == b"N":
+                return b"S %d\n" % self.nueva_partida(*map(int, campos[1:]))
+            if orden == b"X":
+                self.cerrar_sesion(int(campos[1]))
+                return b"X\n"
+            if orden in (b"R", b"A", b"B"):
+                if len(campos) != 4:
+                    raise ErrorPeticion("argumentos")
+                return self.jugar(orden, int(campos[1]), int(campos[2]), int(campos[3]))
+            raise ErrorPeticion("peticion")
+        except ErrorPeticion as error:
+            return b"E %s\n" % error.codigo.encode()
+        except (ValueError, TypeError, IndexError):
+            # El texto de las excepciones de Python no se envía al cliente
+            return b"E argumentos\n"
+
+    # Crea una partida con la protección del primer clic del juego
+    def nueva_partida(self, filas, columnas, minas, semilla=None):
+        """Crea una sesión y devuelve su número."""
+        if filas * columnas > MAXIMO_CELDAS:
+            raise ErrorPeticion("tablero")
+        self.descartar_inactivas()
+        if len(self.sesiones) >= self.maximo_sesiones or self.celdas + filas * columnas > MAXIMO_CELDAS_TOTALES:
+            raise ErrorPeticion("lleno")
+        try:
+            tablero = self.motor(filas, columnas, minas, proteccion=PROTEGER_CELDA)
+            tablero.colocar_minas(semilla)
+        except ValueError:
+            raise ErrorPeticion("tablero") from None
+        tablero.calcular_adyacencias()
+        numero = self.siguiente
+        self.siguiente += 1
+        self.sesiones[numero] = Sesion(tablero)
+        self.celdas += tablero.total
+        return numero
+
+    # Quita una sesión y descuenta sus celdas
+    def cerrar_sesion(self, numero):
+        """Cierra la sesión numero si sigue abierta."""
+        sesion = self.sesiones.pop(numero, None)
+        if sesion is not None:
+            self.celdas -= sesion.tablero.total
+
+    # Aplica una jugada y devuelve las celdas que ha cambiado
+    def jugar(self, orden, numero, fila, columna):
+        """Devuelve la respuesta D de una jugada sobre la sesión numero."""
+        sesion = self.sesiones.get(numero)
+        if sesion is None:
+            raise ErrorPeticion("sesion")
+        tablero = sesion.tablero
+        if not (0 <= fila < tablero.filas and 0 <= columna < tablero.columnas):
+            raise ErrorPeticion("celda")
+        sesion.ultimo_uso = time.monotonic()
+        self.sesiones.move_to_end(numero)
+
+        if orden == b"B":
+            indice = tablero.indice(fila, columna)
+            if tablero.esta_revelada(indice):
+                cambiadas = []
+            else:
+                tablero.alternar_bandera(fila, columna)
+                cambiadas = [b"%d:%s" % (indice, b"F" if tablero.tiene_bandera(indice) else b".")]
+        else:
+            reveladas = tablero.revelar(fila, columna) if orden == b"R" else tablero.acorde(fila, columna)
+            adyacentes = tablero.adyacentes
+            cambiadas = [b"%d:*" % indice if tablero.es_mina(indice) else b"%d:%d" % (indice, adyacentes[indice])
+                         for indice in reveladas]
+
+        if tablero.perdido:
+            estado = b"P"
+        elif tablero.victoria():
+            estado = b"G"
+        else:
+            estado = b"J"
+        if estado != b"J":
+            self.cerrar_sesion(numero)
+        return b"D %s %d %s\n" % (estado, len(cambiadas), b" ".join(cambiadas))
+
+    # Quita las sesiones sin jugadas desde hace más de espera segundos
+    def descartar_inactivas(self):
+        """Descarta las sesiones inactivas y devuelve cuántas se han quitado."""
+        limite = time.monotonic() - self.espera
+        descartadas = 0
+        while self.sesiones:
+            numero, sesion = next(iter(self.sesiones.items()))
+            if sesion.ultimo_uso > limite:
+                break
+            self.cerrar_sesion(numero)
+            descartadas += 1
+        self.descartadas += descartadas
+        return descartadas
+
+    # Descarta sesiones inactivas aunque no lleguen partidas nuevas
+    async def limpiar_periodicamente(self):
+        """Revisa las sesiones inactivas cada cuarto de la espera (como mucho cada 5 s)."""
+        while True:
+            await asyncio.sleep(min(self.espera / 4, 5.0))
+            self.descartar_inactivas()
+
+
+async def servir(puerto=PUERTO, motor="bytes", espera=ESPERA):
+    """Escucha en HOST:puerto hasta que se cancela la tarea."""
+    servidor = ServidorBuscaminas(motor, espera)
+    escucha = await asyncio.start_server(servidor.atender, HOST, puerto)
+    limpieza = asyncio.create_task(servidor.limpiar_periodicamente())
+    # El generador de carga espera a esta línea antes de conectarse
+    print(f"Escuchando en {HOST}:{puerto} (motor {motor}, sesiones inactivas {espera:.0f} s)", flush=True)
+    try:
+        async with escucha:
+            await escucha.serve_forever()
+    finally:
+        limpieza.cancel()
+        print(f"Peticiones: {servidor.peticiones}, sesiones abiertas: {len(servidor.sesiones)}, "
+              f"descartadas por inactividad: {servidor.descartadas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de partidas de Buscaminas")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="Puerto en 127.0.0.1")
+    parser.add_argument("--motor", choices=MOTORES, default="bytes", help="Representación del tablero")
+    parser.add_argument("--espera", type=float, default=ESPERA, help="Segundos de inactividad antes de descartar una sesión")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.puerto, args.motor, args.espera))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# Simulación de partidas sin ventana: tasas de victoria y benchmark del motor
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import MOTORES
+from metricas import calcular_metricas
+from motor import DIFICULTADES, PROTEGER_CELDA, PROTEGER_ZONA, SIN_PROTECCION
+from solucionador import Solucionador
+
+ESTRATEGIAS = ["aleatoria", "solucionador"]
+
+# Protección del primer clic; por defecto la misma que en el juego
+PROTECCIONES = {"ninguna": SIN_PROTECCION, "celda": PROTEGER_CELDA, "zona": PROTEGER_ZONA}
+
+
+# Elige una celda oculta sin bandera al azar
+def celda_aleatoria(tablero, rng):
+    """Devuelve el índice de una celda oculta sin bandera."""
+    for _ in range(64):
+        indice = rng.randrange(tablero.total)
+        if not tablero.esta_revelada(indice) and not tablero.tiene_bandera(indice):
+            return indice
+    # Quedan pocas celdas ocultas: elegir entre todas ellas
+    ocultas = [i for i in range(tablero.total) if not tablero.esta_revelada(i) and not tablero.tiene_bandera(i)]
+    return rng.choice(ocultas)
+
+
+# Juega una partida completa y mide cada fase
+def jugar_partida(filas, columnas, minas, estrategia, semilla, motor="bytes", proteccion="celda"):
+    """Juega una partida y devuelve (resultado, latencias de cada revelado)."""
+    rng = random.Random(semilla)
+
+    inicio = time.perf_counter()
+    tablero = MOTORES[motor](filas, columnas, minas, proteccion=PROTECCIONES[proteccion])
+    tablero.colocar_minas(semilla)
+    generacion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    tablero.calcular_adyacencias()
+    adyacencias = time.perf_counter() - inicio
+
+    solucionador = Solucionador(tablero) if estrategia == "solucionador" else None
+    latencias = []
+    while not tablero.victoria() and not tablero.perdido:
+        if solucionador:
+            pista = solucionador.pista()
+            if pista is None:
+                break
+            tipo, indice, _ = pista
+            if tipo == "mina":
+                tablero.alternar_bandera(*tablero.posicion(indice))
+                continue
+        else:
+            indice = celda_aleatoria(tablero, rng)
+
+        inicio = time.perf_counter()
+        reveladas = tablero.revelar(*tablero.posicion(indice))
+        latencias.append(time.perf_counter() - inicio)
+        if solucionador:
+            solucionador.actualizar(reveladas)
+
+    # Con protección el primer clic puede mover minas, así que el 3BV se mide
+    # con el tablero ya jugado
+    inicio = time.perf_counter()
+    metricas = calcular_metricas(tablero)
+    t_metricas = time.perf_counter() - inicio
+
+    resultado = {
+        "semilla": semilla,
+        "filas": filas,
+        "columnas": columnas,
+        "minas": minas,
+        "estrategia": estrategia,
+        "motor": motor,
+        "proteccion": proteccion,
+        "victoria": tablero.victoria(),
+        "clics": len(latencias),
+        "3bv": metricas["3bv"],
+        "aperturas": metricas["aperturas"],
+        "islas": metricas["islas"],
+        "t_generacion": generacion,
+        "t_adyacencias": adyacencias,
+        "t_metricas": t_metricas,
+        "t_revelado": sum(latencias),
+        "memoria": sys.getsizeof(tablero.estado) + sys.getsizeof(tablero.adyacentes),
+    }
+    return resultado, latencias
+
+
+# Adaptador para ProcessPoolExecutor.map
+def _jugar(argumentos):
+    return jugar_partida(*argumentos)
+
+
+# Tipo de argparse para contadores que no pueden ser cero
+def entero_positivo(texto):
+    """Devuelve texto como entero o rechaza valores menores que 1."""
+    valor = int(texto)
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"debe ser al menos 1: {texto}")
+    return valor
+
+
+# Percentil por rango más cercano
+def percentil(valores, p):
+    """Devuelve el percentil p (0-100) de una lista ordenada."""
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Juega partidas de Buscaminas sin ventana y mide el motor")
+    parser.add_argument("--partidas", type=entero_positivo, default=100, help="Número de partidas")
+    parser.add_argument("--dificultad", choices=[nombre for nombre, config in DIFICULTADES.items() if not config.get("infinito")],
+                        default="Difícil")
+    parser.add_argument("--filas", type=int, help="Filas de un tablero personalizado")
+    parser.add_argument("--columnas", type=int, help="Columnas de un tablero personalizado")
+    parser.add_argument("--minas", type=int, help="Minas de un tablero personalizado")
+    parser.add_argument("--estrategia", choices=ESTRATEGIAS, default="solucionador")
+    parser.add_argument("--motor", choices=MOTORES, default="bytes", help="Representación del tablero")
+    parser.add_argument("--proteccion", choices=PROTECCIONES, default="celda",
+                        help="Protección del primer clic (la del juego es celda)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto, uno por CPU)")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de la primera partida")
+    parser.add_argument("--salida", help="Archivo JSONL con el resultado de cada partida")
+    args = parser.parse_args()
+
+    config = dict(DIFICULTADES[args.dificultad])
+    for clave in ("filas", "columnas", "minas"):
+        if getattr(args, clave) is not None:
+            config[clave] = getattr(args, clave)
+    MOTORES[args.motor](config["filas"], config["columnas"], config["minas"])  # Valida la configuración
+
+    tareas = [(config["filas"], config["columnas"], config["minas"], args.estrategia, args.semilla + n, args.motor,
+               args.proteccion) for n in range(args.partidas)]
+    salida = open(args.salida, "w") if args.salida else None
+    victorias = 0
+    generacion, adyacencias, revelados, memoria = [], [], [], []
+    tiempos_metricas, tbv = [], []
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(args.procesos) as ejecutor:
+        for resultado, latencias in ejecutor.map(_jugar, tareas, chunksize=max(1, args.partidas // 64)):
+            victorias += resultado["victoria"]
+            generacion.append(resultado["t_generacion"])
+            adyacencias.append(resultado["t_adyacencias"])
+            tiempos_metricas.append(resultado["t_metricas"])
+            tbv.append(resultado["3bv"])
+            revelados.extend(latencias)
+            memoria.append(resultado["memoria"])
+            if salida:
+                salida.write(json.dumps(resultado) + "\n")
+    duracion = time.perf_counter() - inicio
+    if salida:
+        salida.close()
+
+    generacion.sort()
+    adyacencias.sort()
+    revelados.sort()
+    tiempos_metricas.sort()
+    tbv.sort()
+    print(f"Tablero: {config['filas']}x{config['columnas']} con {config['minas']} minas, "
+          f"estrategia {args.estrategia}, motor {args.motor}, protección del primer clic {args.proteccion}")
+    print(f"Partidas: {args.partidas} en {duracion:.2f} s ({args.partidas / duracion:.1f} partidas/s)")
+    print(f"Victorias: {victorias} ({victorias / args.partidas:.1%})")
+    print(f"3BV: media {sum(tbv) / len(tbv):.1f}, p50 {percentil(tbv, 50)}, mín {tbv[0]}, máx {tbv[-1]}")
+    for nombre, valores in (("Generación", generacion), ("Adyacencias", adyacencias), ("Métricas", tiempos_metricas),
+                            ("Revelado", revelados)):
+        print(f"{nombre:>12}: p50 {percentil(valores, 50) * 1000:.3f} ms, p99 {percentil(valores, 99) * 1000:.3f} ms")
+    print(f"Memoria por tablero: {sum(memoria) / len(memoria) / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+# Solucionador del Buscaminas: deducciones seguras, probabilidades de mina y pistas
+import math
+import random
+import time
+
+from motor import MINA, REVELADO, SOLO_REVELADO, indices_marcados
+
+# Tiempo máximo por defecto para calcular una pista, en segundos
+PRESUPUESTO = 0.1
+
+
+class Solucionador:
+    """Deduce celdas seguras y minas a partir de lo que ve el jugador.
+
+    Solo usa las celdas reveladas y sus números, nunca las minas ocultas del
+    motor. Las deducciones se guardan entre llamadas: tras cada jugada
+    actualizar() solo apunta las celdas reveladas, y no se miran hasta que
+    se pide una deducción, así que una partida sin pistas no paga nada.
+    Entonces se marcan como pendientes los números afectados y deducir()
+    revisa esos números con la regla de una celda y la de
+    subconjuntos entre números cercanos. Si no hay nada seguro,
+    probabilidades() parte la frontera en componentes independientes, las
+    enumera dentro del presupuesto de tiempo y combina los resultados con
+    el número total de minas.
+    """
+
+    def __init__(self, tablero):
+        self.tablero = tablero
+        self.seguras = set()  # Celdas ocultas que seguro no tienen mina
+        self.minas = set()  # Celdas ocultas que seguro tienen mina
+        self.frontera = set()  # Números revelados que aún tienen vecinos sin resolver
+        self.pendientes = set()  # Números cuyas restricciones hay que revisar
+        self.aproximado = False  # La última estimación no se pudo calcular de forma exacta
+        self.por_incorporar = []  # Listas de celdas cambiadas que aún no se han mirado
+        self.actualizar(indices_marcados(tablero.estado, SOLO_REVELADO))
+
+    # Apunta las celdas recién reveladas (o tapadas otra vez al deshacer) sin mirarlas todavía
+    def actualizar(self, cambiadas):
+        """Guarda las celdas cambiadas para la próxima deducción."""
+        self.por_incorporar.append(cambiadas)
+
+    # Incorpora las celdas apuntadas por actualizar()
+    def _incorporar(self):
+        """Marca como pendientes los números afectados por las celdas cambiadas.
+
+        Las minas no se mueven al deshacer, así que las celdas seguras y las
+        minas ya deducidas siguen valiendo: solo cambian los números de
+        alrededor de las celdas tocadas.
+        """
+        tablero = self.tablero
+        estado = tablero.estado
+        for cambiadas in self.por_incorporar:
+            for indice in cambiadas:
+                if not estado[indice] & REVELADO:
+                    # Tapada otra vez: ya no es un número de la frontera
+                    self.frontera.discard(indice)
+                    self.pendientes.discard(indice)
+                else:
+                    self.seguras.discard(indice)
+                    if estado[indice] & MINA:
+                        continue
+                for vecino in [indice] + tablero.vecinos(indice):
+                    if estado[vecino] & REVELADO and not estado[vecino] & MINA and tablero.adyacentes[vecino] > 0:
+                        self.frontera.add(vecino)
+                        self.pendientes.add(vecino)
+        self.por_incorporar = []
+
+    # Vecinos ocultos sin resolver de un número y minas que aún le faltan
+    def _restriccion(self, numero):
+        """Devuelve (celdas ocultas sin resolver, minas que faltan entre ellas)."""
+        tablero = self.tablero
+        estado = tablero.estado
+        ocultas = []
+        minas = 0
+        # Las tablas de vecinos del motor evitan comprobar los bordes
+        for d in tablero.desplazamientos[tablero.tipos[numero]]:
+            vecino = numero + d
+            if estado[vecino] & REVELADO:
+                continue
+            if vecino in self.minas:
+                minas += 1
+            elif vecino not in self.seguras:
+                ocultas.append(vecino)
+        return ocultas, tablero.adyacentes[numero] - minas
+
+    # Apunta celdas resueltas y vuelve a revisar los números que las rodean
+    def _marcar(self, celdas, mina):
+        """Añade celdas a las seguras o a las minas y encola sus números vecinos."""
+        (self.minas if mina else self.seguras).update(celdas)
+        estado = self.tablero.estado
+        for celda in celdas:
+            for vecino in self.tablero.vecinos(celda):
+                if estado[vecino] & REVELADO and self.tablero.adyacentes[vecino] > 0:
+                    self.pendientes.add(vecino)
+
+    # Regla de subconjuntos con los números a distancia 2 o menos
+    def _comparar_vecinas(self, numero, ocultas, faltan):
+        """Aplica la regla de subconjuntos entre un número y los números cercanos."""
+        tablero = self.tablero
+        estado = tablero.estado
+        fila, columna = tablero.posicion(numero)
+        for f in range(max(0, fila - 2), min(tablero.filas, fila + 3)):
+            for c in range(max(0, columna - 2), min(tablero.columnas, columna + 3)):
+                otro = f * tablero.columnas + c
+                if otro == numero or not estado[otro] & REVELADO or tablero.adyacentes[otro] == 0:
+                    continue
+                otras, faltan_otro = self._restriccion(otro)
+                otras = set(otras)
+                if not otras:
+                    continue
+                if ocultas < otras:
+                    diferencia, resto = otras - ocultas, faltan_otro - faltan
+                elif otras < ocultas:
+                    diferencia, resto = ocultas - otras, faltan - faltan_otro
+                else:
+                    continue
+                if resto == 0:
+                    self._marcar(diferencia, False)
+                    return
+                if resto == len(diferencia):
+                    self._marcar(diferencia, True)
+                    return
+
+    # Deducciones seguras sobre los números pendientes
+    def deducir(self, limite=PRESUPUESTO, hasta_segura=False):
+        """Revisa los números pendientes y devuelve (seguras, minas).
+
+        Con hasta_segura=True se detiene en cuanto conoce una celda segura.
+        """
+        self._incorporar()
+        fin = time.perf_counter() + limite
+        while self.pendientes and time.perf_counter() < fin:
+            if hasta_segura and self.seguras:
+                break
+            numero = self.pendientes.pop()
+            ocultas, faltan = self._restriccion(numero)
+            if not ocultas:
+                self.frontera.discard(numero)
+            elif faltan == 0:
+                self._marcar(ocultas, False)
+            elif faltan == len(ocultas):
+                self._marcar(ocultas, True)
+            else:
+                self._comparar_vecinas(numero, set(ocultas), faltan)
+        return self.seguras, self.minas
+
+    # Agrupa las restricciones de la frontera en componentes independientes
+    def _componentes(self):
+        """Devuelve una lista de (variables, restricciones) por componente."""
+        restricciones = []
+        for numero in list(self.frontera):
+            ocultas, faltan = self._restriccion(numero)
+            if ocultas:
+                restricciones.append((ocultas, faltan))
+            else:
+                self.frontera.discard(numero)
+
+        # Unión-búsqueda sobre las celdas ocultas que comparten restricción
+        padre = {}
+
+        def raiz(celda):
+            while padre[celda] != celda:
+                padre[celda] = padre[padre[celda]]
+                celda = padre[celda]
+            return celda
+
+        for ocultas, _ in restricciones:
+            for celda in ocultas:
+                padre.setdefault(celda, celda)
+            primera = raiz(ocultas[0])
+            for celda in ocultas[1:]:
+                padre[raiz(celda)] = primera
+
+        grupos = {}
+        for celda in padre:
+            grupos.setdefault(raiz(celda), ([], []))[0].append(celda)
+        for restriccion in restricciones:
+            grupos[raiz(restriccion[0][0])][1].append(restriccion)
+        return list(grupos.values())
+
+    # Enumera las soluciones de una componente con vuelta atrás iterativa
+    def _enumerar(self, variables, restricciones, fin):
+        """Devuelve {minas: [soluciones, cuentas por variable]} y si se ha cortado por tiempo."""
+        posiciones = {celda: i for i, celda in enumerate(variables)}
+        por_variable = [[] for _ in variables]
+        faltan = []
+        libres = []
+        for r, (ocultas, minas) in enumerate(restricciones):
+            faltan.append(minas)
+            libres.append(len(ocultas))
+            for celda in ocultas:
+                por_variable[posiciones[celda]].append(r)
+        asignadas = [0] * len(restricciones)
+
+        n = len(variables)
+        valores = [-1] * n
+        resultados = {}
+        minas = 0
+        i = 0
+        pasos = 0
+        while i >= 0:
+            if i == n:
+                resultado = resultados.setdefault(minas, [0, [0] * n])
+                resultado[0] += 1
+                cuentas = resultado[1]
+                for j in range(n):
+                    if valores[j]:
+                        cuentas[j] += 1
+                i -= 1
+                continue
+            pasos += 1
+            if pasos & 1023 == 0 and time.perf_counter() > fin:
+                return resultados, True
+            # Deshacer el valor anterior de esta variable
+            if valores[i] >= 0:
+                for r in por_variable[i]:
+                    asignadas[r] -= valores[i]
+                    libres[r] += 1
+                minas -= valores[i]
+            valores[i] += 1
+            if valores[i] > 1:
+                valores[i] = -1
+                i -= 1
+                continue
+            valido = True
+            for r in por_variable[i]:
+                asignadas[r] += valores[i]
+                libres[r] -= 1
+                if asignadas[r] > faltan[r] or asignadas[r] + libres[r] < faltan[r]:
+                    valido = False
+            minas += valores[i]
+            if valido:
+                i += 1
+        return resultados, False
+
+    # Probabilidad de mina de cada celda de la frontera y del interior
+    def probabilidades(self, limite=PRESUPUESTO):
+        """Devuelve ({celda: probabilidad}, probabilidad de una celda del interior, celdas del interior)."""
+        inicio = time.perf_counter()
+        self.deducir(limite)
+        tablero = self.tablero
+        componentes = self._componentes()
+        self.aproximado = False
+
+        variables_frontera = sum(len(variables) for variables, _ in componentes)
+        ocultas = tablero.ocultas_seguras + tablero.minas  # Las reveladas nunca son minas
+        interior = ocultas - len(self.seguras) - len(self.minas) - variables_frontera
+        minas_restantes = tablero.minas - len(self.minas)
+
+        # Enumerar cada componente repartiendo el tiempo que queda entre las que faltan
+        probabilidades = {}
+        distribuciones = []
+        for numero, (variables, restricciones) in enumerate(componentes):
+            restante = limite - (time.perf_counter() - inicio)
+            fin = time.perf_counter() + max(restante, 0) / (len(componentes) - numero)
+            resultados, cortado = self._enumerar(variables, restricciones, fin)
+            self.aproximado |= cortado
+            if resultados:
+                distribuciones.append((variables, resultados))
+            else:
+                # Sin ninguna solución a tiempo: densidad local de cada restricción
+                for ocultas_r, faltan in restricciones:
+                    for celda in ocultas_r:
+                        probabilidades[celda] = max(probabilidades.get(celda, 0.0), faltan / len(ocultas_r))
+
+        # Peso relativo de dejar r minas en el interior: C(interior, r)
+        def log_combinaciones(r):
+            if r < 0 or r > interior:
+                return None
+            return math.lgamma(interior + 1) - math.lgamma(r + 1) - math.lgamma(interior - r + 1)
+
+        maximo_minas = sum(max(resultados) for _, resultados in distribuciones)
+        logaritmos = [log_combinaciones(minas_restantes - s) for s in range(maximo_minas + 1)]
+        referencia = max((l for l in logaritmos if l is not None), default=0.0)
+        pesos = [0.0 if l is None else math.exp(l - referencia) for l in logaritmos]
+
+        # Convoluciones de prefijos y sufijos para excluir cada componente
+        def convolucionar(a, resultados):
+            c = {}
+            for s, peso in a.items():
+                for k, (soluciones, _) in resultados.items():
+                    c[s + k] = c.get(s + k, 0.0) + peso * soluciones
+            escala = max(c.values())
+            return {s: peso / escala for s, peso in c.items()}
+
+        prefijos = [{0: 1.0}]
+        for _, resultados in distribuciones:
+            prefijos.append(convolucionar(prefijos[-1], resultados))
+        sufijos = [{0: 1.0}]
+        for _, resultados in reversed(distribuciones):
+            sufijos.append(convolucionar(sufijos[-1], resultados))
+        sufijos.reverse()
+
+        for i, (variables, resultados) in enumerate(distribuciones):
+            otras = {}
+            for s1, p1 in prefijos[i].items():
+                for s2, p2 in sufijos[i + 1].items():
+                    otras[s1 + s2] = otras.get(s1 + s2, 0.0) + p1 * p2
+            total = 0.0
+            por_variable = [0.0] * len(variables)
+            for k, (soluciones, cuentas) in resultados.items():
+                peso = sum(p * pesos[k + s] for s, p in otras.items())
+                total += soluciones * peso
+                for j, cuenta in enumerate(cuentas):
+                    por_variable[j] += cuenta * peso
+            for j, celda in enumerate(variables):
+                probabilidades[celda] = por_variable[j] / total if total else 0.5
+
+        probabilidad_interior = None
+        if interior > 0:
+            total = sum(p * pesos[s] for s, p in prefijos[-1].items())
+            esperadas = sum(p * pesos[s] * (minas_restantes - s) for s, p in prefijos[-1].items())
+            probabilidad_interior = esperadas / total / interior if total else minas_restantes / (interior + variables_frontera)
+
+        # Las probabilidades exactas 0 y 1 también son deducciones
+        if not self.aproximado:
+            nuevas_seguras = [celda for celda, p in probabilidades.items() if p == 0.0]
+            nuevas_minas = [celda for celda, p in probabilidades.items() if p == 1.0]
+            if nuevas_seguras:
+                self._marcar(nuevas_seguras, False)
+            if nuevas_minas:
+                self._marcar(nuevas_minas, True)
+        return probabilidades, probabilidad_interior, interior
+
+    # Busca una celda oculta que no esté en la frontera ni resuelta
+    def celda_interior(self, excluidas):
+        """Devuelve una celda oculta del interior o None."""
+        tablero = self.tablero
+        estado = tablero.estado
+
+        def libre(celda):
+            return not estado[celda] & REVELADO and celda not in excluidas \
+                and celda not in self.seguras and celda not in self.minas
+
+        for _ in range(100):
+            celda = random.randrange(tablero.total)
+            if libre(celda):
+                return celda
+        return next((celda for celda in range(tablero.total) if libre(celda)), None)
+
+    # Pista para el jugador: la jugada más segura que se conoce
+    def pista(self, limite=PRESUPUESTO):
+        """Devuelve (tipo, celda, probabilidad de mina) o None si no quedan celdas ocultas.
+
+        tipo es "segura" o "mina" si la deducción es cierta y "probable" si
+        solo es la celda con menor probabilidad de mina.
+        """
+        estado = self.tablero.estado
+        self.deducir(limite, hasta_segura=True)
+        if self.seguras:
+            return "segura", next(iter(self.seguras)), 0.0
+        sin_bandera = [celda for celda in self.minas if not self.tablero.tiene_bandera(celda)]
+        if sin_bandera:
+            return "mina", sin_bandera[0], 1.0
+
+        probabilidades, probabilidad_interior, interior = self.probabilidades(limite)
+        if self.seguras:
+            return "segura", next(iter(self.seguras)), 0.0
+        candidata, probabilidad = None, 2.0
+        for celda, p in probabilidades.items():
+            if p < probabilidad and not estado[celda] & REVELADO:
+                candidata, probabilidad = celda, p
+        if probabilidad_interior is not None and probabilidad_interior < probabilidad:
+            celda = self.celda_interior(probabilidades)
+            if celda is not None:
+                candidata, probabilidad = celda, probabilidad_interior
+        if candidata is None:
+            return None
+        return "probable", candidata, probabilidad